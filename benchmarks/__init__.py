@@ -0,0 +1,7 @@
+"""
+Benchmark Initialization
+"""
+
+import sys
+
+sys.path.append('./src')
@@ -0,0 +1,166 @@
+"""
+Cold import time of the loader scripts, measured with python -X importtime in fresh processes.
+Fails when a deferred dependency is imported eagerly or an import regressed against a baseline.
+
+    python -m benchmarks.import_benchmark --save imports.json
+    python -m benchmarks.import_benchmark --compare imports.json
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+from typing import NamedTuple
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+SOURCE_DIR = './src'
+DEFAULT_MODULES = ['stats_loader', 'matchup_loader', 'schedule_loader', 'backfill']
+# Dependencies only needed on rarely used paths, which must not be loaded at import time.
+DEFERRED_MODULES = ('selenium', 'pyquery')
+DEFAULT_REPEAT = 5
+DEFAULT_TOP = 10
+DEFAULT_THRESHOLD = 0.2
+
+
+class ImportTiming(NamedTuple):
+    """
+    Import time of a module in microseconds.
+    """
+    name: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(report: str) -> list[ImportTiming]:
+    """
+    Parses the -X importtime report written to stderr.
+    Args:
+        report: Report Text
+
+    Returns: Import Timings in import order
+    """
+    timings = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def measure_import(module: str) -> list[ImportTiming]:
+    """
+    Imports the module in a fresh interpreter.
+    Args:
+        module: Module Name
+
+    Returns: Import Timings
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=SOURCE_DIR, capture_output=True, text=True, check=True)
+    return parse_importtime(result.stderr)
+
+
+def report_module(module: str, repeat: int, top: int) -> tuple[int, list[str]]:
+    """
+    Measures and logs the import of a module.
+    Args:
+        module: Module Name
+        repeat: Fresh interpreters, the fastest is reported
+        top: Slowest imports listed
+
+    Returns: Cumulative microseconds and the deferred modules imported
+    """
+    # The fastest run is the least disturbed by the rest of the machine.
+    runs = [measure_import(module) for _ in range(repeat)]
+    timings = min(runs, key=lambda run: run[-1].cumulative_us)
+    total = timings[-1].cumulative_us
+    logging.info('%-24s %10.1f ms', module, total / 1000)
+    for timing in sorted(timings, key=lambda item: item.self_us, reverse=True)[:top]:
+        logging.info('    %-40s %10.1f ms self', timing.name, timing.self_us / 1000)
+
+    eager = sorted({timing.name for timing in timings
+                    if timing.name.split('.')[0] in DEFERRED_MODULES})
+    if eager:
+        logging.info('    DEFERRED MODULES IMPORTED: %s', ', '.join(eager))
+    return total, eager
+
+
+def compare(results: dict[str, int], baseline: dict, threshold: float) -> list[str]:
+    """
+    Compares import times with a saved baseline.
+    Args:
+        results: Cumulative microseconds by module
+        baseline: Saved results by module
+        threshold: Allowed fractional slowdown
+
+    Returns: Names of regressed modules
+    """
+    regressions = []
+    for module, total in results.items():
+        if module not in baseline:
+            logging.info('%-24s NO BASELINE', module)
+            continue
+        change = total / max(baseline[module], 1) - 1
+        regressed = change > threshold
+        logging.info('%-24s %+8.1f%%%s', module, change * 100, '  REGRESSION' if regressed else '')
+        if regressed:
+            regressions.append(module)
+    return regressions
+
+
+def main(arguments: dict) -> int:
+    """
+    Main Function
+
+    Args:
+        arguments (dict): Argument Dictionary.
+
+    Returns:
+        int: Exit code, 1 when a deferred dependency was imported or an import regressed
+    """
+    results = {}
+    failed = False
+    for module in arguments.get('modules') or DEFAULT_MODULES:
+        results[module], eager = report_module(module,
+                                               int(arguments.get('repeat') or DEFAULT_REPEAT),
+                                               int(arguments.get('top') or DEFAULT_TOP))
+        failed = failed or bool(eager)
+
+    if arguments.get('save'):
+        with open(arguments['save'], 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if arguments.get('compare'):
+        with open(arguments['compare'], 'r', encoding='utf-8') as input_file:
+            baseline = json.load(input_file)
+        if compare(results, baseline, float(arguments.get('threshold') or DEFAULT_THRESHOLD)):
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description='Import Time Benchmarks')
+    argparser.add_argument('--modules', type=str, nargs='+',
+                           help='Modules to import, the loader scripts by default')
+    argparser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                           help='Fresh interpreters per module, the fastest is reported')
+    argparser.add_argument('--top', type=int, default=DEFAULT_TOP,
+                           help='Slowest imports listed per module')
+    argparser.add_argument('--save', type=str, help='Save the results as a baseline file')
+    argparser.add_argument('--compare', type=str, help='Baseline file to compare against')
+    argparser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                           help='Allowed fractional regression against the baseline')
+
+    args = argparser.parse_args()
+
+    sys.exit(main({
+        'modules': args.modules,
+        'repeat': args.repeat,
+        'top': args.top,
+        'save': args.save,
+        'compare': args.compare,
+        'threshold': args.threshold
+    }))
@@ -0,0 +1,282 @@
+"""
+Micro benchmarks of the payload parsers over the recorded payloads in tests/test_files.
+Runs offline against an in memory SQLite database.
+
+    python -m benchmarks.parser_benchmark --save baseline.json
+    python -m benchmarks.parser_benchmark --compare baseline.json
+"""
+
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+from football_data.models import Player, Schedule, Statistic, StatisticCategory, StatisticCode, \
+    Team
+from football_data.repositories import StatisticCodeRepository
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from helpers.box_score import COMPOUND_COLUMNS, BoxScoreHelper
+from helpers.schedule import ScheduleHelper
+from helpers.team import TEAM_GROUPING, MatchUpHelper
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+TEST_FILES = './tests/test_files'
+DEFAULT_DURATION = 1.0
+DEFAULT_THRESHOLD = 0.1
+
+
+class BenchmarkResult(NamedTuple):
+    """
+    Measurements of a benchmark case.
+    """
+    name: str
+    ops_per_sec: float
+    retained_blocks: int
+    peak_bytes: int
+
+
+def load_file(name: str) -> dict:
+    """
+    Loads a recorded payload.
+    Args:
+        name: File Name
+
+    Returns: Payload
+    """
+    with open(f'{TEST_FILES}/{name}', 'r', encoding='utf-8') as input_file:
+        return json.load(input_file)
+
+
+def build_maker() -> sessionmaker:
+    """
+    Creates an in memory Session Maker with every table.
+
+    Returns: Session Maker
+    """
+    engine = create_engine('sqlite://')
+    for model in (Player, Schedule, Statistic, StatisticCategory, StatisticCode, Team):
+        model.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def seed_box_score(maker: sessionmaker, box_score: dict) -> None:
+    """
+    Stores the Statistic Codes, Categories and Players referenced by the box score.
+    Args:
+        maker: Session Maker
+        box_score: Box Score payload
+    """
+    repo = StatisticCodeRepository(maker)
+    for code in ('O', 'D', 'S'):
+        repo.save(StatisticCategory(code=code, description=code))
+
+    helper_sections = BoxScoreHelper(maker, []).sections
+    codes = set()
+    urls = set()
+    for team_box_score in box_score['page']['content']['gamepackage']['bxscr']:
+        for section in team_box_score.get('stats', []):
+            group = helper_sections.get(section.get('type'), (None,))[0]
+            for label in section.get('lbls', []):
+                codes.update((group, code) for code in COMPOUND_COLUMNS.get((group, label),
+                                                                            (label,)))
+            urls.update(athlete['athlt']['lnk'] for athlete in section.get('athlts', []))
+
+    for group, code in sorted(codes):
+        repo.save(StatisticCode(code=code, description=code, grouping=group))
+    for url in sorted(urls):
+        repo.save(Player(name=url, url=url))
+
+
+def seed_team_codes(maker: sessionmaker) -> None:
+    """
+    Stores the Team Statistic Codes and Category.
+    Args:
+        maker: Session Maker
+    """
+    repo = StatisticCodeRepository(maker)
+    repo.save(StatisticCategory(code='T', description='Team'))
+    with open(f'{TEST_FILES}/team_statistic_codes.csv', 'r', encoding='utf-8') as input_file:
+        for item in csv.DictReader(input_file):
+            repo.save(StatisticCode(code=item.get('code', ''),
+                                    description=item.get('description', ''),
+                                    grouping=item.get('grouping', TEAM_GROUPING)))
+
+
+def build_cases(maker: sessionmaker) -> dict[str, Callable[[], object]]:
+    """
+    Builds the benchmark cases over the recorded payloads.
+    Args:
+        maker: Session Maker
+
+    Returns: Callables by case name
+    """
+    box_score = load_file('boxscore.json')
+    seed_box_score(maker, box_score)
+    seed_team_codes(maker)
+
+    box_score_helper = BoxScoreHelper(maker, StatisticCodeRepository(maker).get_statistic_codes())
+    sections: dict[str, list[dict]] = {}
+    for team_box_score in box_score['page']['content']['gamepackage']['bxscr']:
+        for section in team_box_score.get('stats', []):
+            sections.setdefault(section.get('type'), []).append(section)
+
+    def build_section(section_type: str) -> Callable[[], object]:
+        group, category = box_score_helper.sections[section_type]
+        return lambda: [box_score_helper.build_general_statistics(section, 1, group, category)
+                        for section in sections[section_type]]
+
+    cases = {f'boxscore.{section_type}': build_section(section_type)
+             for section_type in box_score_helper.sections if section_type in sections}
+    cases['boxscore.build_statistics'] = lambda: box_score_helper.build_statistics(box_score, 1, 2)
+
+    match_up_helper = MatchUpHelper(maker)
+    team_stats = load_file('matchup.json')['page']['content']['gamepackage']['tmStats']
+    cases['matchup.generate_stats'] = lambda: (
+        match_up_helper.generate_stats(1, 1, team_stats['home']['s']),
+        match_up_helper.generate_stats(2, 2, team_stats['away']['s']))
+
+    schedule_helper = ScheduleHelper(maker)
+    events = [event for day in load_file('schedule.json')['page']['content']['events'].values()
+              for event in day]
+    cases['schedule.convert_event'] = lambda: [
+        schedule_helper.convert_event(event, 2, 1, 2022) for event in events]
+    return cases
+
+
+def measure(name: str, case: Callable[[], object], duration: float) -> BenchmarkResult:
+    """
+    Measures a case. Retained blocks are the memory blocks still held by the result of a
+    single run. The peak is the highest traced memory in bytes during that run, temporary
+    allocations included.
+    Args:
+        name: Case Name
+        case: Benchmark Callable
+        duration: Seconds to run the timing loop
+
+    Returns: Benchmark Result
+    """
+    # Warm up caches and compiled plans before measuring.
+    case()
+
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < duration:
+        case()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = case()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    return BenchmarkResult(name, iterations / elapsed, retained_blocks, peak)
+
+
+def growth(value: int, saved: int | None) -> float:
+    """
+    Returns the fractional growth of a measurement over its baseline.
+    Args:
+        value: Measurement
+        saved: Baseline Measurement, None for baselines saved before it was recorded
+
+    Returns: Fractional Growth, zero without a baseline
+    """
+    if saved is None:
+        return 0.0
+    return (value - saved) / max(saved, 1)
+
+
+def compare(results: list[BenchmarkResult], baseline: dict,
+            threshold: float) -> list[str]:
+    """
+    Compares results with a saved baseline.
+    Args:
+        results: Benchmark Results
+        baseline: Saved results by case name
+        threshold: Allowed fractional slowdown or memory growth
+
+    Returns: Names of regressed cases
+    """
+    regressions = []
+    for result in results:
+        saved = baseline.get(result.name)
+        if not saved:
+            logging.info('%-32s NO BASELINE', result.name)
+            continue
+        speed = result.ops_per_sec / saved['ops_per_sec'] - 1
+        retained = growth(result.retained_blocks, saved.get('retained_blocks'))
+        peak = growth(result.peak_bytes, saved.get('peak_bytes'))
+        regressed = speed < -threshold or retained > threshold or peak > threshold
+        logging.info('%-32s %+8.1f%% ops/sec %+8.1f%% retained %+8.1f%% peak%s', result.name,
+                     speed * 100, retained * 100, peak * 100, '  REGRESSION' if regressed else '')
+        if regressed:
+            regressions.append(result.name)
+    return regressions
+
+
+def main(arguments: dict) -> int:
+    """
+    Main Function
+
+    Args:
+        arguments (dict): Argument Dictionary.
+
+    Returns:
+        int: Exit code, 1 when a case regressed against the baseline
+    """
+    cases = build_cases(build_maker())
+    selected = arguments.get('cases') or list(cases)
+
+    results = []
+    logging.info('%-32s %12s %16s %12s', 'CASE', 'OPS/SEC', 'RETAINED BLOCKS', 'PEAK BYTES')
+    for name in selected:
+        result = measure(name, cases[name], float(arguments.get('duration') or DEFAULT_DURATION))
+        logging.info('%-32s %12.1f %16d %12d', *result)
+        results.append(result)
+
+    if arguments.get('save'):
+        with open(arguments['save'], 'w', encoding='utf-8') as output_file:
+            json.dump({result.name: result._asdict() for result in results}, output_file,
+                      indent=2)
+
+    if arguments.get('compare'):
+        with open(arguments['compare'], 'r', encoding='utf-8') as input_file:
+            baseline = json.load(input_file)
+        if compare(results, baseline, float(arguments.get('threshold') or DEFAULT_THRESHOLD)):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description='Parser Benchmarks')
+    argparser.add_argument('--cases', type=str, nargs='+', help='Cases to run, all by default')
+    argparser.add_argument('--duration', type=float, default=DEFAULT_DURATION,
+                           help='Seconds to time each case')
+    argparser.add_argument('--save', type=str, help='Save the results as a baseline file')
+    argparser.add_argument('--compare', type=str, help='Baseline file to compare against')
+    argparser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                           help='Allowed fractional regression against the baseline')
+
+    args = argparser.parse_args()
+
+    sys.exit(main({
+        'cases': args.cases,
+        'duration': args.duration,
+        'save': args.save,
+        'compare': args.compare,
+        'threshold': args.threshold
+    }))
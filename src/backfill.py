@@ -0,0 +1,425 @@
+"""
+Script for backfilling schedules and statistics across seasons with a process pool.
+"""
+
+import argparse
+import logging
+from multiprocessing.util import Finalize
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable
+
+from football_data.models import Schedule
+from football_data.repositories import StatisticCodeRepository, TypeCodeRepository
+from sqlalchemy.orm import sessionmaker
+
+from helpers.box_score import BoxScoreHelper
+from helpers.cache import PayloadCache
+from helpers.database import DEFAULT_POOL_SIZE, DbHelper
+from helpers.driver import set_driver_pool
+from helpers.fetch_engine import BOX_SCORE, MATCHUP, hash_payload
+from helpers.journal import LoadJournal, build_week_key
+from helpers.metrics import Metrics, get_metrics, set_metrics
+from helpers.payload import PayloadFetcher, set_payload_fetcher
+from helpers.rate_limit import AdaptiveRateLimiter, set_rate_limiter
+from helpers.player import PlayerCache
+from helpers.schedule import ScheduleHelper
+from helpers.statistic_writer import StatisticWriter
+from helpers.team import MatchUpHelper
+from matchup_loader import load_matchup
+from stats_loader import load_box_score
+
+logging.basicConfig(level=logging.INFO)
+
+SCHEDULE = 'schedule'
+GAME_STAGES = (BOX_SCORE, MATCHUP)
+
+
+class Worker:
+    """
+    Per process state created once by the pool initializer.
+    """
+
+    maker: sessionmaker
+    journal: LoadJournal | None
+    refresh: bool
+    games: dict[tuple[int, int, str], dict[int, tuple[Schedule, Schedule | None]]]
+
+    def __init__(self, maker: sessionmaker, journal: LoadJournal | None = None, *,
+                 refresh: bool = False) -> None:
+        """
+        Constructor.
+        Args:
+            maker: Session Maker
+            journal: Load Journal of completed stages
+            refresh: Reload completed games, skipping those with unchanged payloads
+        """
+        self.maker = maker
+        self.journal = journal
+        self.refresh = refresh
+        self.games = {}
+        self._box_score_helper: BoxScoreHelper | None = None
+        self._matchup_helper: MatchUpHelper | None = None
+        self.writer = StatisticWriter(maker)
+
+    @property
+    def box_score_helper(self) -> BoxScoreHelper:
+        """
+        Box Score Helper sharing a Player Cache across every game in the worker.
+        """
+        if self._box_score_helper is None:
+            codes = StatisticCodeRepository(self.maker).get_statistic_codes()
+            self._box_score_helper = BoxScoreHelper(self.maker, codes, PlayerCache())
+        return self._box_score_helper
+
+    @property
+    def matchup_helper(self) -> MatchUpHelper:
+        """
+        Match Up Helper.
+        """
+        if self._matchup_helper is None:
+            self._matchup_helper = MatchUpHelper(self.maker)
+        return self._matchup_helper
+
+    def get_game(self, year: int, week: int, type_code: str,
+                 game_id: int) -> tuple[Schedule, Schedule | None] | None:
+        """
+        Returns the home and away Schedule for a game, loading the week once per worker.
+        """
+        key = (year, week, type_code)
+        if key not in self.games:
+            self.games[key] = ScheduleHelper(self.maker).get_games(year, week, type_code)
+        return self.games[key].get(game_id)
+
+
+_WORKER: Worker | None = None
+
+
+def build_maker(arguments: dict, *, bootstrap: bool = True) -> sessionmaker:
+    """
+    Creates the Session Maker of the database in the arguments.
+
+    Args:
+        arguments (dict): Argument Dictionary.
+        bootstrap (bool): Bootstrap the schema and migrate the Statistics.
+
+    Returns:
+        sessionmaker: Session Maker
+    """
+    return DbHelper.create_session_maker(arguments.get('server', ''),
+                                         arguments.get('database', ''),
+                                         arguments.get('user_name', ''),
+                                         arguments.get('password', ''),
+                                         pool_size=int(arguments.get('pool_size')
+                                                       or DEFAULT_POOL_SIZE),
+                                         bootstrap=bootstrap)
+
+
+def init_worker(arguments: dict) -> None:
+    """
+    Pool initializer creating the Session Maker and Payload Fetcher once per process.
+
+    Args:
+        arguments (dict): Argument Dictionary.
+    """
+    global _WORKER  # pylint: disable=global-statement
+    # The schema was bootstrapped by the parent, so workers never race each other's DDL.
+    maker = build_maker(arguments, bootstrap=False)
+    # Pool workers exit without running atexit hooks, which would leak the browsers.
+    Finalize(None, set_driver_pool, args=(None,), exitpriority=10)
+    cache_dir = arguments.get('cache_dir')
+    set_payload_fetcher(PayloadFetcher(cache=PayloadCache(cache_dir) if cache_dir else None))
+    # Each worker paces its own requests, so the rates are split between the workers.
+    workers = int(arguments.get('workers') or 1)
+    set_rate_limiter(AdaptiveRateLimiter(float(arguments.get('rate') or 2) / workers,
+                                         max_rate=float(arguments.get('max_rate') or 20) / workers))
+    journal_path = arguments.get('journal')
+    _WORKER = Worker(maker, LoadJournal(journal_path) if journal_path else None,
+                     refresh=bool(arguments.get('refresh')))
+
+
+def get_worker() -> Worker:
+    """
+    Returns the worker state of the current process.
+    """
+    if _WORKER is None:
+        raise RuntimeError('Worker has not been initialized')
+    return _WORKER
+
+
+def run_job(job: Callable[..., Any], *job_args) -> tuple[Any, dict]:
+    """
+    Runs a job with its own Metrics so the timings can be returned to the main process.
+
+    Args:
+        job (Callable): Job Function
+        job_args: Job Arguments
+
+    Returns:
+        tuple: Job result and Metrics summary
+    """
+    metrics = Metrics()
+    set_metrics(metrics)
+    return job(*job_args), metrics.summary()
+
+
+def run_schedule_job(year: int, week: int, type_code: str) -> list[int]:
+    """
+    Loads the Schedule for a week.
+
+    Args:
+        year (int): Year Value
+        week (int): Week Value
+        type_code (str): Type Code
+
+    Returns:
+        list: Game IDs of the week
+    """
+    worker = get_worker()
+    week_key = build_week_key(year, week, type_code)
+    if worker.journal and worker.journal.is_complete(SCHEDULE, week_key):
+        return list_games(year, week, type_code)
+
+    type_item = TypeCodeRepository(worker.maker).get_type_code(code=type_code)
+    payload = ScheduleHelper.get_schedule(week, year, type_code)
+    if not type_item or not payload:
+        logging.warning('NO SCHEDULE FOUND FOR %s WEEK %s TYPE %s', year, week, type_code)
+        return []
+
+    schedules = ScheduleHelper(worker.maker).convert_schedule(payload, type_item.id, week, year)
+    worker.games.pop((year, week, type_code), None)
+    if worker.journal and schedules:
+        worker.journal.mark_complete(SCHEDULE, week_key, len(schedules))
+    return sorted({schedule.game_id for schedule in schedules})
+
+
+def run_game_job(stage: str, year: int, week: int, type_code: str, game_id: int) -> int:
+    """
+    Loads the box score or match up statistics for a game.
+
+    Args:
+        stage (str): boxscore or matchup
+        year (int): Year Value
+        week (int): Week Value
+        type_code (str): Type Code
+        game_id (int): Game ID
+
+    Returns:
+        int: Number of statistics written
+    """
+    worker = get_worker()
+    if worker.journal and not worker.refresh and worker.journal.is_complete(stage, game_id):
+        logging.info('SKIPPING COMPLETED %s FOR GAME: %s', stage.upper(), game_id)
+        return 0
+
+    game = worker.get_game(year, week, type_code, game_id)
+    if not game:
+        logging.warning('NO SCHEDULE FOUND FOR GAME: %s', game_id)
+        return 0
+
+    schedule, opponent_schedule = game
+    count = 0
+    unresolved: list[str] = []
+    with Metrics.game(game_id):
+        if stage == BOX_SCORE:
+            payload = BoxScoreHelper.get_box_score(str(game_id), refresh=worker.refresh)
+        else:
+            payload = MatchUpHelper.get_match_up(str(game_id), refresh=worker.refresh)
+        digest = hash_payload(payload, stage) if payload else ''
+        if payload and worker.journal and worker.journal.is_unchanged(stage, game_id, digest):
+            logging.info('SKIPPING UNCHANGED %s FOR GAME: %s', stage.upper(), game_id)
+            get_metrics().increment('games.unchanged')
+            return 0
+        if payload and stage == BOX_SCORE:
+            count = load_box_score(worker.box_score_helper, worker.writer, payload, schedule,
+                                   opponent_schedule)
+            unresolved = worker.box_score_helper.unresolved
+        elif payload:
+            count = load_matchup(worker.matchup_helper, worker.writer, payload, schedule,
+                                 opponent_schedule)
+
+    if not count:
+        logging.warning('NO %s FOUND FOR GAME: %s', stage.upper(), game_id)
+    elif unresolved:
+        # The game is retried by the next run once its athletes can be resolved.
+        logging.warning('%s ATHLETES UNRESOLVED, NOT COMPLETING %s FOR GAME: %s',
+                        len(unresolved), stage.upper(), game_id)
+    elif worker.journal:
+        worker.journal.mark_complete(stage, game_id, count)
+        worker.journal.record_hash(stage, game_id, digest)
+    return count
+
+
+def list_games(year: int, week: int, type_code: str) -> list[int]:
+    """
+    Lists the Game IDs already scheduled for a week.
+
+    Args:
+        year (int): Year Value
+        week (int): Week Value
+        type_code (str): Type Code
+
+    Returns:
+        list: Game IDs
+    """
+    return sorted(ScheduleHelper(get_worker().maker).get_games(year, week, type_code))
+
+
+def parse_range(value: str) -> list[int]:
+    """
+    Parses a list of values and inclusive ranges such as 2018-2020,2022.
+
+    Args:
+        value (str): Range Value
+
+    Returns:
+        list: Values
+
+    Raises:
+        ValueError: A value is not a number or a range ends before it starts
+    """
+    values: list[int] = []
+    for part in value.split(','):
+        if '-' in part:
+            start, end = part.split('-', 1)
+            if int(end) < int(start):
+                raise ValueError(f'Range ends before it starts: {part}')
+            values.extend(range(int(start), int(end) + 1))
+        elif part.strip():
+            values.append(int(part))
+    return values
+
+
+def build_weeks(years: list[int], weeks: list[int],
+                types: list[str]) -> list[tuple[int, int, str]]:
+    """
+    Builds the week level jobs in load order.
+
+    Args:
+        years (list): Year Values
+        weeks (list): Week Values
+        types (list): Type Codes
+
+    Returns:
+        list: Year, Week and Type Code entries
+    """
+    return [(year, week, type_code) for year in years for type_code in types for week in weeks]
+
+
+def submit_games(executor: ProcessPoolExecutor, pending: dict[Future, tuple], week: tuple,
+                 game_ids: list[int], stages: list[str]) -> None:
+    """
+    Submits the game level jobs for a week whose schedule has been stored.
+
+    Args:
+        executor (ProcessPoolExecutor): Process Pool
+        pending (dict): Pending Jobs by Future
+        week (tuple): Year, Week and Type Code
+        game_ids (list): Game IDs
+        stages (list): Stages to run
+    """
+    for game_id in game_ids:
+        for stage in GAME_STAGES:
+            if stage in stages:
+                job = (stage, *week, game_id)
+                pending[executor.submit(run_job, run_game_job, *job)] = job
+
+
+def main(arguments: dict) -> None:
+    """
+    Main Function. Schedules are loaded first and each week's games are submitted as soon as
+    its schedule is stored.
+
+    Args:
+        arguments (dict): Argument Dictionary.
+    """
+    weeks = build_weeks(parse_range(str(arguments.get('years', ''))),
+                        parse_range(str(arguments.get('weeks', ''))),
+                        [code for code in str(arguments.get('types', '')).split(',') if code])
+    stages = arguments.get('stages') or [SCHEDULE, *GAME_STAGES]
+    failures = 0
+    metrics = Metrics()
+
+    # Bootstrap the schema once before forking, the workers only open connections.
+    build_maker(arguments)
+    DbHelper.dispose()
+    with ProcessPoolExecutor(max_workers=arguments.get('workers'), initializer=init_worker,
+                             initargs=(arguments,)) as executor:
+        pending: dict[Future, tuple] = {}
+        week_job = run_schedule_job if SCHEDULE in stages else list_games
+        for week in weeks:
+            pending[executor.submit(run_job, week_job, *week)] = (SCHEDULE, *week)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                try:
+                    result, summary = future.result()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    failures += 1
+                    logging.exception('JOB FAILED: %s', job)
+                    continue
+
+                metrics.merge(summary)
+                if job[0] == SCHEDULE:
+                    logging.info('SCHEDULED %s GAMES FOR %s WEEK %s TYPE %s', len(result),
+                                 *job[1:])
+                    submit_games(executor, pending, job[1:], result, stages)
+                else:
+                    logging.info('LOADED %s %s STATS FOR GAME: %s', result, job[0], job[4])
+
+    metrics.increment('jobs.failed', failures)
+    if arguments.get('metrics_dir'):
+        metrics.export(arguments['metrics_dir'])
+    logging.info('DONE WITH %s FAILED JOBS', failures)
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description='Script Arguments')
+    argparser.add_argument('-y', '--years', type=str, required=True,
+                           help='Year Values and Ranges (2018-2020,2022)')
+    argparser.add_argument('-w', '--weeks', type=str, required=True,
+                           help='Week Values and Ranges (1-18)')
+    argparser.add_argument('-t', '--types', type=str, default='2',
+                           help='Schedule Types (1,2,3)')
+    argparser.add_argument('--stages', type=str, nargs='+',
+                           choices=[SCHEDULE, *GAME_STAGES], help='Stages to run')
+    argparser.add_argument('--workers', type=int, default=4, help='Worker Processes')
+    argparser.add_argument('-s', '--server', type=str, help='DB Server')
+    argparser.add_argument('-d', '--database', type=str, help='Database Name')
+    argparser.add_argument('-u', '--user', type=str, help='Username')
+    argparser.add_argument('-p', '--password', type=str, help='Password')
+    argparser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                           help='Database connections kept open')
+    argparser.add_argument('-c', '--cache-dir', type=str, help='Payload Cache Directory')
+    argparser.add_argument('-j', '--journal', type=str,
+                           help='Load Journal File used to resume interrupted loads')
+    argparser.add_argument('--refresh', action='store_true',
+                           help='Reload completed games, skipping those with unchanged payloads')
+    argparser.add_argument('--rate', type=float, default=2,
+                           help='Initial requests per second across all workers')
+    argparser.add_argument('--max-rate', type=float, default=20,
+                           help='Maximum requests per second across all workers')
+    argparser.add_argument('-m', '--metrics-dir', type=str,
+                           help='Directory for the metrics.json and metrics.prom summaries')
+
+    args = argparser.parse_args()
+
+    main({
+        'years': args.years,
+        'weeks': args.weeks,
+        'types': args.types,
+        'stages': args.stages,
+        'workers': args.workers,
+        'user_name': args.user,
+        'password': args.password,
+        'pool_size': args.pool_size,
+        'server': args.server,
+        'database': args.database,
+        'cache_dir': args.cache_dir,
+        'journal': args.journal,
+        'refresh': args.refresh,
+        'metrics_dir': args.metrics_dir,
+        'rate': args.rate,
+        'max_rate': args.max_rate
+    })
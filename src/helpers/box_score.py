@@ -1,56 +1,183 @@
 """
 Box score Helper Class
 """
-from football_data.models import Statistic, StatisticCode, StatisticCategory
+import logging
+from typing import Iterator
+
+from football_data.models import StatisticCode, StatisticCategory
 from football_data.repositories import StatisticCategoryRepository
-from selenium import webdriver
 from sqlalchemy.orm import sessionmaker
 
-from helpers.player import PlayerHelper
+from helpers.codes import StatisticCodeIndex
+from helpers.payload import get_payload_fetcher
+from helpers.player import PlayerCache, PlayerHelper
+from helpers.stat_batch import StatBatch
+
+# Columns holding made/attempted pairs, mapped to the code for each part of the value.
+COMPOUND_COLUMNS = {
+    ('passing', 'C/ATT'): ('PC', 'PA'),
+    ('kicking', 'FG'): ('FGM', 'FGA'),
+    ('kicking', 'XP'): ('XPM', 'XPA'),
+}
+
+
+def get_team_box_scores(box_score: dict) -> list[dict]:
+    """
+    Returns the box score entry of each team.
+    Args:
+        box_score: Box Score payload
+
+    Returns: Team Box Score entries
+    """
+    return box_score.get('page', {}).get('content', {}).get('gamepackage', {}).get('bxscr', [])
+
+
+class SectionPlan:
+    """
+    Compiled mapping of a section's columns to Statistic Codes.
+    Each column entry holds the column index, the part of a compound value or None and the
+    Statistic Code ID.
+    """
+
+    columns: list[tuple[int, int | None, int]]
+    category_id: int
+
+    def __init__(self, columns: list[tuple[int, int | None, int]], category_id: int) -> None:
+        """
+        Constructor.
+        Args:
+            columns: Column Index, Compound Part and Statistic Code ID entries
+            category_id: Statistic Category ID
+        """
+        self.columns = columns
+        self.category_id = category_id
+
+    @staticmethod
+    def compile(code_index: StatisticCodeIndex, group: str, labels: list[str],
+                category_id: int, keys: list[str] | None = None) -> 'SectionPlan':
+        """
+        Compiles the plan for a section's labels. A Statistic is keyed by its code, so a column
+        whose label maps to the code of an earlier column is mapped by its stat key instead.
+        When the key has no distinct code either, the column is dropped and logged, keeping
+        the earlier value.
+        Args:
+            code_index: Statistic Code Index
+            group: Stat Code Group
+            labels: Section Labels
+            category_id: Statistic Category ID
+            keys: Section Stat Keys, such as rushingYards, in label order
 
+        Returns: Section Plan
+        """
+        keys = keys or []
+        columns: list[tuple[int, int | None, int]] = []
+        mapped: dict[int, int] = {}
+        for index, label in enumerate(labels):
+            compound = COMPOUND_COLUMNS.get((group, label))
+            parts = enumerate(compound) if compound else ((None, label),)
+            for part, code in parts:
+                stat_code = code_index.get(group, code)
+                if not stat_code:
+                    continue
+                if stat_code.id in mapped:
+                    alternate = code_index.get(group, keys[index]) if index < len(keys) else None
+                    if alternate is None or alternate.id in mapped:
+                        logging.warning('%s COLUMN %s (%s) DUPLICATES COLUMN %s, KEEPING THE FIRST',
+                                        group.upper(), index, label, mapped[stat_code.id])
+                        continue
+                    stat_code = alternate
+                mapped[stat_code.id] = index
+                columns.append((index, part, stat_code.id))
+        return SectionPlan(columns, category_id)
+
+    def apply(self, batch: StatBatch, stat_values: list[str], schedule_id: int,
+              player_id: int) -> None:
+        """
+        Maps an athlete's stat values into the Stat Batch.
+        Args:
+            batch: Stat Batch
+            stat_values: Athlete Stat Values
+            schedule_id: Schedule ID
+            player_id: Player ID
+        """
+        count = len(stat_values)
+        for index, part, code_id in self.columns:
+            if index >= count:
+                continue
+            value = stat_values[index]
+            if part is not None:
+                parts = str(value).split('/')
+                value = parts[part] if part < len(parts) else ''
+            batch.append(code_id, schedule_id, BoxScoreHelper.convert_value(value),
+                         self.category_id, player_id=player_id)
+
+
+class BoxScoreHelper:  # pylint: disable=too-many-instance-attributes
+    """
+    Helper Class for building Player Statistics from the Box Score.
+    """
 
-class BoxScoreHelper:
     maker: sessionmaker
+    player_helper: PlayerHelper
     codes: list[StatisticCode]
+    code_index: StatisticCodeIndex
+    plans: dict[tuple[str, tuple[str, ...], tuple[str, ...], int], SectionPlan]
     offense_category: StatisticCategory
     defense_category: StatisticCategory
     special_category: StatisticCategory
+    sections: dict[str, tuple[str, StatisticCategory]]
+    unresolved: list[str]
 
-    def __init__(self, maker: sessionmaker, codes: list[StatisticCode]) -> None:
+    def __init__(self, maker: sessionmaker, codes: list[StatisticCode],
+                 player_cache: PlayerCache | None = None) -> None:
         """
         Constructor.
         Args:
             maker: Sql Alchemy Session Maker
             codes: List of Statistic Codes
+            player_cache: Player Cache shared across games, one is created when not provided
         """
         self.maker = maker
         self.codes = codes
+        self.code_index = StatisticCodeIndex(codes)
+        self.plans = {}
+        # Athlete Urls of the last box score skipped because their Player could not be built
+        # yet, athletes without a page or athlete are skipped without being listed.
+        self.unresolved = []
+        self.player_helper = PlayerHelper(
+            maker, player_cache if player_cache is not None else PlayerCache())
         repo = StatisticCategoryRepository(maker)
         self.offense_category = repo.get_statistic_category(code='O')
         self.defense_category = repo.get_statistic_category(code='D')
         self.special_category = repo.get_statistic_category(code='S')
+        # Stat Code Group and Statistic Category of each box score section type.
+        self.sections = {
+            'passing': ('passing', self.offense_category),
+            'rushing': ('rushing', self.offense_category),
+            'receiving': ('receiving', self.offense_category),
+            'fumbles': ('general', self.offense_category),
+            'defensive': ('defensive', self.defense_category),
+            'interceptions': ('general', self.defense_category),
+            'kickReturns': ('kickReturns', self.special_category),
+            'puntReturns': ('puntReturns', self.special_category),
+            'kicking': ('kicking', self.special_category),
+            'punting': ('punting', self.special_category)
+        }
 
     @staticmethod
-    def get_box_score(game_id: str) -> dict | None:
+    def get_box_score(game_id: str, *, refresh: bool = False) -> dict | None:
         """
         Returns the box score data.
         Args:
             game_id: Game ID
+            refresh: Retrieve the page instead of reading the cached payload
 
         Returns: Dictionary or None
 
         """
 
         box_score_url = f"https://www.espn.com/nfl/boxscore/_/gameId/{game_id}"
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--ignore-certificate-errors')
-
-        browser = webdriver.Chrome(options=options)
-        browser.get(box_score_url)
-        box_score_result: dict = browser.execute_script('return window.__espnfitt__')
-        browser.quit()
-        return box_score_result
+        return get_payload_fetcher().fetch(box_score_url, refresh=refresh)
 
     def get_statistic_code(self, group: str, code: str) -> StatisticCode | None:
         """
@@ -61,14 +188,7 @@ class BoxScoreHelper:
 
         Returns: Statistic Code
         """
-
-        result = list(
-            filter(lambda x:
-                   str(x.code).upper() == code.replace(' ', '').upper()
-                   and x.grouping == group, self.codes))
-        if result:
-            return result[0]
-        return None
+        return self.code_index.get(group, code)
 
     @staticmethod
     def convert_value(value: str) -> float:
@@ -81,9 +201,28 @@ class BoxScoreHelper:
         except ValueError:
             return 0
 
+    def get_section_plan(self, group: str, labels: list[str], category: StatisticCategory,
+                         keys: list[str] | None = None) -> SectionPlan:
+        """
+        Returns the compiled plan for a section's labels, compiling it on first use.
+        Args:
+            group: Stat Code Group
+            labels: Section Labels
+            category: Statistic Category
+            keys: Section Stat Keys
+
+        Returns: Section Plan
+        """
+        key = (group, tuple(labels), tuple(keys or ()), category.id)
+        plan = self.plans.get(key)
+        if plan is None:
+            plan = SectionPlan.compile(self.code_index, group, labels, category.id, keys)
+            self.plans[key] = plan
+        return plan
+
     def build_general_statistics(self, section: dict,
                                  schedule_id: int, group: str,
-                                 category: StatisticCategory) -> list[Statistic]:
+                                 category: StatisticCategory) -> StatBatch:
         """
         Builds General Statistic Entries based on the Section provided
         Args:
@@ -91,132 +230,124 @@ class BoxScoreHelper:
             schedule_id: Schedule Id
             group: Stat Code Group
             category: Statistic Category
-        Returns: List of Statistics
+        Returns: Stat Batch
 
         """
-        stats = []
-        helper = PlayerHelper(self.maker)
-        athletes: list[dict] = section.get('athlts', [])
+        self.player_helper.resolve_players(athlete.get('athlt', {}).get('lnk', '')
+                                           for athlete in section.get('athlts', []))
+        batch = StatBatch()
+        for athlete_batch in self.iter_general_statistics(section, schedule_id, group, category):
+            batch.extend(athlete_batch)
+        return batch
+
+    def iter_general_statistics(self, section: dict, schedule_id: int, group: str,
+                                category: StatisticCategory) -> Iterator[StatBatch]:
+        """
+        Yields the Statistics of each athlete in the Section as it is processed. Players are
+        only looked up, never built, so no page is fetched while the Statistics stream.
+        Args:
+            section: Section
+            schedule_id: Schedule Id
+            group: Stat Code Group
+            category: Statistic Category
 
-        if athletes:
-            labels = section.get('lbls', [])
-            for athlete in athletes:
-                player = helper.resolve_player(athlete.get('athlt', {}).get('lnk', ''))
-                stat_values = athlete.get('stats', [])
-                for label in labels:
-                    index = labels.index(label)
-                    stat_code = self.get_statistic_code(group, label)
-                    if stat_code:
-                        stats.append(Statistic(statistic_code_id=stat_code.id,
-                                               schedule_id=schedule_id,
-                                               value=self.convert_value(stat_values[index]),
-                                               category_id=category.id,
-                                               player_id=player.id))
-
-        return stats
-
-    def build_passing_stats(self, passing_section: dict, schedule_id: int) -> list[Statistic]:
+        Returns: Stat Batch per athlete
+        """
+        athletes: list[dict] = section.get('athlts', [])
+        if not athletes:
+            return
+
+        plan = self.get_section_plan(group, section.get('lbls', []), category,
+                                     section.get('keys'))
+        for athlete in athletes:
+            url = athlete.get('athlt', {}).get('lnk', '')
+            player = self.player_helper.resolve_player(url, build=False)
+            if not player:
+                if not url or self.player_helper.is_unresolvable(url):
+                    logging.info('SKIPPING ATHLETE WITHOUT A PLAYER PAGE: %s', url)
+                else:
+                    logging.warning('SKIPPING UNRESOLVED ATHLETE: %s', url)
+                    self.unresolved.append(url)
+                continue
+            batch = StatBatch()
+            plan.apply(batch, athlete.get('stats', []), schedule_id, player.id)
+            yield batch
+
+    def build_passing_stats(self, passing_section: dict, schedule_id: int) -> StatBatch:
         """
         Maps the Passing Statistics to Statistic Items
         Args:
             passing_section: Passing Section
             schedule_id: Schedule Id
 
-        Returns: List of Statistics
+        Returns: Stat Batch
         """
-        stats = self.build_general_statistics(passing_section, schedule_id, 'passing',
-                                              self.offense_category)
-
-        helper = PlayerHelper(self.maker)
-        athletes: list[dict] = passing_section.get('athlts', [])
-
-        if athletes:
-            labels = passing_section.get('lbls', [])
-            for athlete in athletes:
-                player = helper.resolve_player(athlete.get('athlt', {}).get('lnk', ''))
-                stat_values = athlete.get('stats', [])
-                label_index = labels.index('C/ATT')
-                attempt_code = self.get_statistic_code('passing', 'PA')
-                complete_code = self.get_statistic_code('passing', 'PC')
-                values = str(stat_values[label_index]).split('/')
-
-                # Add the Passing Attempts and Completions
-                stats.append(Statistic(statistic_code_id=attempt_code.id,
-                                       schedule_id=schedule_id,
-                                       value=self.convert_value(values[1]),
-                                       category_id=self.offense_category.id,
-                                       player_id=player.id))
-                stats.append(Statistic(statistic_code_id=complete_code.id,
-                                       schedule_id=schedule_id,
-                                       value=self.convert_value(values[0]),
-                                       category_id=self.offense_category.id,
-                                       player_id=player.id))
-
-        return stats
+        return self.build_general_statistics(passing_section, schedule_id, 'passing',
+                                             self.offense_category)
 
-    def build_rushing_stats(self, rushing_section: dict, schedule_id: int) -> list[Statistic]:
+    def build_rushing_stats(self, rushing_section: dict, schedule_id: int) -> StatBatch:
         """
         Maps the Rushing Statistics to Statistic Items
         Args:
             rushing_section: Rushing Section
             schedule_id: Schedule Id
 
-        Returns: List of Statistics
+        Returns: Stat Batch
 
         """
 
         return self.build_general_statistics(rushing_section, schedule_id, 'rushing',
                                              self.offense_category)
 
-    def build_receiving_stats(self, receiving_section: dict, schedule_id: int) -> list[Statistic]:
+    def build_receiving_stats(self, receiving_section: dict, schedule_id: int) -> StatBatch:
         """
         Maps the Receiving Statistics to Statistic Items
         Args:
             receiving_section: Statistic Section
             schedule_id: Schedule ID
 
-        Returns: List of Statistics
+        Returns: Stat Batch
 
         """
 
         return self.build_general_statistics(receiving_section, schedule_id, 'receiving',
                                              self.offense_category)
 
-    def build_fumbles_stats(self, fumble_section: dict, schedule_id: int) -> list[Statistic]:
+    def build_fumbles_stats(self, fumble_section: dict, schedule_id: int) -> StatBatch:
         """
         Maps the Fumbles statistics to Statistic Items.
         Args:
             fumble_section: Fumbles Section
             schedule_id: Schedule ID
 
-        Returns: List of Statistics
+        Returns: Stat Batch
 
         """
         return self.build_general_statistics(fumble_section, schedule_id, 'general',
                                              self.offense_category)
 
-    def build_defensive_stats(self, defense_section: dict, schedule_id: int) -> list[Statistic]:
+    def build_defensive_stats(self, defense_section: dict, schedule_id: int) -> StatBatch:
         """
         Maps the Defensive statistics to Statistic Items
         Args:
             defense_section: Defensive Section
             schedule_id: Schedule ID
 
-        Returns: List of Defensive Statistics
+        Returns: Stat Batch
 
         """
         return self.build_general_statistics(defense_section, schedule_id, 'defensive',
                                              self.defense_category)
 
     def build_interception_stats(self, interception_section: dict,
-                                 schedule_id: int) -> list[Statistic]:
+                                 schedule_id: int) -> StatBatch:
         """
         Maps the Interception statistics to Statistic Items.
         Args:
             interception_section: Interception Section
             schedule_id: Schedule ID
 
-        Returns: List of Interception Statistics
+        Returns: Stat Batch
 
         """
 
@@ -224,98 +355,121 @@ class BoxScoreHelper:
                                              self.defense_category)
 
     def build_kick_returns_stats(self, kick_return_section: dict,
-                                 schedule_id: int) -> list[Statistic]:
+                                 schedule_id: int) -> StatBatch:
         """
         Maps the Kick Return statistics to Statistics Items.
         Args:
             kick_return_section: Kick Return Section
             schedule_id: Schedule ID
 
-        Returns: List of Statistics
+        Returns: Stat Batch
 
         """
         return self.build_general_statistics(kick_return_section, schedule_id, 'kickReturns',
                                              self.special_category)
 
     def build_punt_returns_stats(self, punt_return_section: dict,
-                                 schedule_id: int) -> list[Statistic]:
+                                 schedule_id: int) -> StatBatch:
         """
         Maps the Punt Return statistics to Statistics Items.
         Args:
             punt_return_section: Punt Return Section
             schedule_id: Schedule ID
 
-        Returns: List of Statistics
+        Returns: Stat Batch
 
         """
         return self.build_general_statistics(punt_return_section, schedule_id, 'puntReturns',
                                              self.special_category)
 
-    def build_kicking_stats(self, kicking_section: dict, schedule_id: int) -> list[Statistic]:
+    def build_kicking_stats(self, kicking_section: dict, schedule_id: int) -> StatBatch:
         """
         Maps the Kicking statistics to Statistics Items.
         Args:
             kicking_section: Kicking Section
             schedule_id: Schedule ID
 
-        Returns: List of Statistics
-
-        """
-        stats = self.build_general_statistics(kicking_section, schedule_id, 'kicking',
-                                              self.special_category)
-
-        fg_attempt = self.get_statistic_code('kicking', 'FGA')
-        fg_made = self.get_statistic_code('kicking', 'FGM')
-        xp_attempt = self.get_statistic_code('kicking', 'XPA')
-        xp_made = self.get_statistic_code('kicking', 'XPM')
-
-        helper = PlayerHelper(self.maker)
-        athletes: list[dict] = kicking_section.get('athlts', [])
-
-        if athletes:
-            labels = kicking_section.get('lbls', [])
-            for athlete in athletes:
-                player = helper.resolve_player(athlete.get('athlt', {}).get('lnk', ''))
-                stat_values = athlete.get('stats', [])
-                fg_index = labels.index('FG')
-                xp_index = labels.index('XP')
-
-                fg_values = str(stat_values[fg_index]).split('/')
-                xp_values = str(stat_values[xp_index]).split('/')
-
-                # Add the Passing Attempts and Completions
-                stats.append(Statistic(statistic_code_id=fg_attempt.id,
-                                       schedule_id=schedule_id,
-                                       value=self.convert_value(fg_values[1]),
-                                       category_id=self.special_category.id,
-                                       player_id=player.id))
-                stats.append(Statistic(statistic_code_id=fg_made.id,
-                                       schedule_id=schedule_id,
-                                       value=self.convert_value(fg_values[0]),
-                                       category_id=self.special_category.id,
-                                       player_id=player.id))
-                stats.append(Statistic(statistic_code_id=xp_attempt.id,
-                                       schedule_id=schedule_id,
-                                       value=self.convert_value(xp_values[1]),
-                                       category_id=self.special_category.id,
-                                       player_id=player.id))
-                stats.append(Statistic(statistic_code_id=xp_made.id,
-                                       schedule_id=schedule_id,
-                                       value=self.convert_value(xp_values[0]),
-                                       category_id=self.special_category.id,
-                                       player_id=player.id))
-
-        return stats
-
-    def build_punting_stats(self, punting_section: dict, schedule_id: int) -> list[Statistic]:
+        Returns: Stat Batch
+
+        """
+        return self.build_general_statistics(kicking_section, schedule_id, 'kicking',
+                                             self.special_category)
+
+    def build_punting_stats(self, punting_section: dict, schedule_id: int) -> StatBatch:
         """
         Maps the Punting statistics to Statistics Items.
         Args:
             punting_section: Punting Section
             schedule_id: Schedule ID
 
-        Returns: List of Statistics
+        Returns: Stat Batch
 
         """
         return self.build_general_statistics(punting_section, schedule_id, 'punting',
                                              self.special_category)
+
+    def preload_players(self, box_score: dict) -> None:
+        """
+        Resolves every athlete in the box score into the Player Cache in one batch, building
+        the missing Players from their pages. Call before streaming the Statistics.
+        Args:
+            box_score: Box Score payload
+        """
+        urls = [athlete.get('athlt', {}).get('lnk', '')
+                for team_box_score in get_team_box_scores(box_score)
+                for section in team_box_score.get('stats', [])
+                for athlete in section.get('athlts', [])]
+        self.player_helper.resolve_players(urls)
+
+    def iter_team_statistics(self, team_box_score: dict,
+                             schedule_id: int) -> Iterator[StatBatch]:
+        """
+        Yields the Statistics of every athlete in a team's box score.
+        Args:
+            team_box_score: Team Box Score entry
+            schedule_id: Schedule ID
+
+        Returns: Stat Batch per athlete
+        """
+        for section in team_box_score.get('stats', []):
+            entry = self.sections.get(section.get('type'))
+            if entry:
+                group, category = entry
+                yield from self.iter_general_statistics(section, schedule_id, group, category)
+
+    def build_statistics(self, box_score: dict, home_schedule_id: int,
+                         away_schedule_id: int) -> StatBatch:
+        """
+        Maps the box score payload for both teams to Statistic Items.
+        Args:
+            box_score: Box Score payload
+            home_schedule_id: Schedule ID of the home team
+            away_schedule_id: Schedule ID of the away team
+
+        Returns: Stat Batch
+        """
+        self.preload_players(box_score)
+        batch = StatBatch()
+        for athlete_batch in self.iter_statistics(box_score, home_schedule_id, away_schedule_id):
+            batch.extend(athlete_batch)
+        return batch
+
+    def iter_statistics(self, box_score: dict, home_schedule_id: int,
+                        away_schedule_id: int) -> Iterator[StatBatch]:
+        """
+        Yields the Statistics of every athlete in the box score for both teams, so they can be
+        streamed to a Statistic Writer without holding the game in memory. Athletes without a
+        Player are skipped, those whose page could not be retrieved are listed in unresolved, so
+        preload_players must run first.
+        Args:
+            box_score: Box Score payload
+            home_schedule_id: Schedule ID of the home team
+            away_schedule_id: Schedule ID of the away team
+
+        Returns: Stat Batch per athlete
+        """
+        self.unresolved = []
+        for team_box_score in get_team_box_scores(box_score):
+            is_home = team_box_score.get('tm', {}).get('hm', False) is True
+            schedule_id = home_schedule_id if is_home else away_schedule_id
+            yield from self.iter_team_statistics(team_box_score, schedule_id)
@@ -0,0 +1,171 @@
+"""
+On disk Payload Cache with expirations based on the state of the game.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+LIVE_TTL = 60
+PENDING_TTL = 15 * 60
+PLAYER_TTL = 7 * 24 * 60 * 60
+
+KEY_PATTERNS = [
+    (re.compile(r'/(boxscore|matchup)/_/gameId/(\d+)'), '{0}-{1}'),
+    (re.compile(r'/player/_/id/(\d+)'), 'player-{0}'),
+    (re.compile(r'/schedule/_/week/(\d+)/year/(\d+)/seasontype/(\d+)'), 'schedule-{1}-{0}-{2}'),
+]
+
+
+def build_cache_key(url: str) -> str:
+    """
+    Builds the cache key for a page url from the game id, player id or week, year and type.
+    Urls not matching a known page are keyed by their hash.
+    Args:
+        url: Page Url
+
+    Returns: Cache Key
+    """
+    for pattern, template in KEY_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return template.format(*match.groups())
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def get_game_state(payload: dict) -> str | None:
+    """
+    Returns the state of the game(s) in the payload.
+    Args:
+        payload: Page Payload
+
+    Returns: post when final, in when live, pre when upcoming or None for non game pages
+    """
+    content = payload.get('page', {}).get('content', {})
+    game_strip = content.get('gamepackage', {}).get('gmStrp')
+    if game_strip:
+        return game_strip.get('status', {}).get('state')
+
+    events = content.get('events')
+    if isinstance(events, dict):
+        states = [event.get('status', {}).get('state', 'pre')
+                  for day in events.values() for event in day]
+        if not states or all(state == 'post' for state in states):
+            return 'post'
+        if 'in' in states:
+            return 'in'
+        return 'pre'
+    return None
+
+
+class PayloadCache:
+    """
+    Stores page payloads on disk keyed by the page url.
+    Completed games are kept indefinitely, live and upcoming games expire quickly.
+    """
+
+    directory: str
+    live_ttl: float
+    pending_ttl: float
+    player_ttl: float
+
+    def __init__(self, directory: str, live_ttl: float = LIVE_TTL,
+                 pending_ttl: float = PENDING_TTL, player_ttl: float = PLAYER_TTL) -> None:
+        """
+        Constructor.
+        Args:
+            directory: Cache Directory
+            live_ttl: Seconds to keep pages for games in progress
+            pending_ttl: Seconds to keep pages for upcoming games
+            player_ttl: Seconds to keep pages without a game state such as players
+        """
+        self.directory = directory
+        self.live_ttl = live_ttl
+        self.pending_ttl = pending_ttl
+        self.player_ttl = player_ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def get_ttl(self, payload: dict) -> float | None:
+        """
+        Returns the number of seconds the payload may be cached.
+        Args:
+            payload: Page Payload
+
+        Returns: Seconds or None to cache indefinitely
+        """
+        state = get_game_state(payload)
+        if state == 'post':
+            return None
+        if state == 'in':
+            return self.live_ttl
+        if state == 'pre':
+            return self.pending_ttl
+        return self.player_ttl
+
+    def get_path(self, url: str) -> str:
+        """
+        Returns the cache file path for the url.
+        Args:
+            url: Page Url
+
+        Returns: File Path
+        """
+        return os.path.join(self.directory, f"{build_cache_key(url)}.json")
+
+    def get(self, url: str) -> dict | None:
+        """
+        Retrieves a cached payload that has not expired.
+        Args:
+            url: Page Url
+
+        Returns: Payload Dictionary or None
+        """
+        path = self.get_path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        expires = entry.get('expires')
+        if expires is not None and expires < time.time():
+            return None
+        return entry.get('payload')
+
+    def put(self, url: str, payload: dict) -> None:
+        """
+        Stores the payload, replacing any previous entry atomically.
+        Args:
+            url: Page Url
+            payload: Page Payload
+        """
+        ttl = self.get_ttl(payload)
+        entry = {
+            'url': url,
+            'stored': time.time(),
+            'expires': None if ttl is None else time.time() + ttl,
+            'payload': payload
+        }
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as cache_file:
+                json.dump(entry, cache_file)
+            os.replace(temp_path, self.get_path(url))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def invalidate(self, url: str) -> None:
+        """
+        Removes the cached payload for the url.
+        Args:
+            url: Page Url
+        """
+        try:
+            os.remove(self.get_path(url))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,47 @@
+"""
+Statistic Code Index for constant time code lookups.
+"""
+
+from football_data.models import StatisticCode
+
+
+def normalize_code(value: str | None) -> str:
+    """
+    Normalizes a code or label for comparison by removing spaces and upper casing it.
+    Args:
+        value: Code Value
+
+    Returns: Normalized Code
+    """
+    return str(value).replace(' ', '').upper()
+
+
+class StatisticCodeIndex:
+    """
+    Dictionary index of Statistic Codes keyed by grouping and normalized code.
+    """
+
+    def __init__(self, codes: list[StatisticCode]) -> None:
+        """
+        Constructor.
+        Args:
+            codes: List of Statistic Codes
+        """
+        self._index: dict[tuple[str | None, str], StatisticCode] = {}
+        for code in codes:
+            # The first code wins to match the previous list lookups.
+            self._index.setdefault((code.grouping, normalize_code(code.code)), code)
+
+    def get(self, group: str | None, code: str) -> StatisticCode | None:
+        """
+        Retrieves a Statistic Code.
+        Args:
+            group: Grouping
+            code: Code or Label Value
+
+        Returns: Statistic Code or None
+        """
+        return self._index.get((group, normalize_code(code)))
+
+    def __len__(self) -> int:
+        return len(self._index)
@@ -2,17 +2,52 @@
 Database Helper Classes
 """
 
-from sqlalchemy import create_engine, URL
+import hashlib
+import logging
+import os
+import threading
+
+from sqlalchemy import URL, Column, Engine, MetaData, String, Table, create_engine, select
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker
-from football_data.models import Team, TeamLeague, TeamStaff, TypeCode, StatisticCode, Statistic, StatisticCategory, Schedule, Player, Position, League
+from football_data.models import Base
+
+from helpers.statistic_writer import migrate_statistics
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+
+SCHEMA_VERSION_TABLE = Table('schema_version', MetaData(),
+                             Column('version', String(64), primary_key=True))
+
+
+def get_schema_version() -> str:
+    """
+    Fingerprints the tables, columns and indexes of the models.
+
+    Returns: Schema Version
+    """
+    parts = [f'{table.name}.{column.name}:{column.type!r}'
+             for table in Base.metadata.sorted_tables for column in table.columns]
+    parts.extend(f'{table.name}#{index.name}' for table in Base.metadata.sorted_tables
+                 for index in sorted(table.indexes, key=lambda item: item.name))
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
 
 class DbHelper:
     """
     Helps generating items for interacting with the database.
+    Session Makers are kept per database for the life of the process, so each database is
+    bootstrapped and pooled once however many loaders and helpers ask for it.
     """
 
+    _makers: dict[str, sessionmaker] = {}
+    _lock = threading.Lock()
+
     @staticmethod
-    def create_session_maker(server:str, database:str, user_name:str, password:str) -> sessionmaker:
+    def create_session_maker(server: str, database: str, user_name: str, password: str, *,
+                             pool_size: int = DEFAULT_POOL_SIZE,
+                             bootstrap: bool = True) -> sessionmaker:
         """
         Creates a Session Maker for the Database with all Models loaded
         Args:
@@ -20,23 +55,106 @@ class DbHelper:
             database: Database name
             user_name: UserName
             password: Password
+            pool_size: Connections kept open
+            bootstrap: Bootstrap the schema, False when another process already has
+
+        Returns: Session Maker
+
+        """
+        url = URL.create('postgresql', username=user_name, password=password, host=server,
+                         database=database)
+        return DbHelper.get_session_maker(url, pool_size=pool_size, bootstrap=bootstrap)
+
+    @staticmethod
+    def get_session_maker(url: URL | str, *, pool_size: int = DEFAULT_POOL_SIZE,
+                          pre_ping: bool = True, bootstrap: bool = True) -> sessionmaker:
+        """
+        Returns the Session Maker of the database, creating the engine and bootstrapping the
+        schema on first use.
+        Args:
+            url: Database Url
+            pool_size: Connections kept open
+            pre_ping: Test pooled connections before use
+            bootstrap: Bootstrap the schema, False when another process already has
 
         Returns: Session Maker
+        """
+        key = url.render_as_string(hide_password=False) if isinstance(url, URL) else url
+        with DbHelper._lock:
+            maker = DbHelper._makers.get(key)
+            if maker is None:
+                engine = DbHelper.create_engine(url, pool_size=pool_size, pre_ping=pre_ping)
+                if bootstrap:
+                    DbHelper.bootstrap_schema(engine)
+                maker = sessionmaker(bind=engine, expire_on_commit=False)
+                DbHelper._makers[key] = maker
+            return maker
 
+    @staticmethod
+    def create_engine(url: URL | str, *, pool_size: int = DEFAULT_POOL_SIZE,
+                      pre_ping: bool = True) -> Engine:
+        """
+        Creates an Engine with a connection pool.
+        Args:
+            url: Database Url
+            pool_size: Connections kept open
+            pre_ping: Test pooled connections before use
+
+        Returns: Engine
+        """
+        options = {'pool_pre_ping': pre_ping}
+        if not str(url).startswith('sqlite'):
+            options.update(pool_size=pool_size, max_overflow=DEFAULT_MAX_OVERFLOW)
+        return create_engine(url, **options)
+
+    @staticmethod
+    def bootstrap_schema(engine: Engine) -> bool:
+        """
+        Creates the tables and migrates the Statistics unless the stored schema version matches
+        the models.
+        Args:
+            engine: Engine
+
+        Returns: True when the tables were created
         """
-        url = URL.create('postgres', username=user_name, password=password, host=server, database=database)
-        engine = create_engine(url)
-        Team.metadata.create_all(bind=engine)
-        TeamLeague.metadata.create_all(bind=engine)
-        TeamStaff.metadata.create_all(bind=engine)
-        TypeCode.metadata.create_all(bind=engine)
-        StatisticCode.metadata.create_all(bind=engine)
-        Statistic.metadata.create_all(bind=engine)
-        StatisticCategory.metadata.create_all(bind=engine)
-        Schedule.metadata.create_all(bind=engine)
-        Player.metadata.create_all(bind=engine)
-        Position.metadata.create_all(bind=engine)
-        League.metadata.create_all(bind=engine)
-        return sessionmaker(bind=engine, expire_on_commit=False)
+        version = get_schema_version()
+        try:
+            with engine.connect() as connection:
+                stored = connection.execute(select(SCHEMA_VERSION_TABLE.c.version)).scalar()
+        except DBAPIError:
+            stored = None
+        if stored == version:
+            return False
+
+        logging.info('CREATING DATABASE SCHEMA %s', version[:12])
+        with engine.begin() as connection:
+            Base.metadata.create_all(bind=connection)
+            migrate_statistics(connection)
+            SCHEMA_VERSION_TABLE.create(bind=connection, checkfirst=True)
+            connection.execute(SCHEMA_VERSION_TABLE.delete())
+            connection.execute(SCHEMA_VERSION_TABLE.insert().values(version=version))
+        return True
+
+    @staticmethod
+    def dispose(close: bool = True) -> None:
+        """
+        Disposes the engines and forgets the Session Makers.
+        Args:
+            close: Close the pooled connections, False in a forked child sharing the parent's
+        """
+        with DbHelper._lock:
+            for maker in DbHelper._makers.values():
+                maker.kw['bind'].dispose(close=close)
+            DbHelper._makers.clear()
+
+
+def reset_after_fork() -> None:
+    """
+    Drops the parent's engines in a forked worker so it opens its own connections.
+    """
+    DbHelper._lock = threading.Lock()  # pylint: disable=protected-access
+    DbHelper.dispose(close=False)
 
 
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_after_fork)
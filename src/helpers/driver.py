@@ -0,0 +1,270 @@
+"""
+Driver Pool for sharing warm headless Chrome browsers across page fetches.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_PAGES = 50
+DEFAULT_MAX_RSS_MB = 1024
+
+PAYLOAD_SCRIPT = 'return window.__espnfitt__'
+
+
+def create_chrome_driver() -> Any:
+    """
+    Creates a new headless Chrome Driver.
+    Selenium is imported here so processes that never fall back to a browser do not load it.
+
+    Returns: Chrome Web Driver
+    """
+    from selenium import webdriver  # pylint: disable=import-outside-toplevel
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--ignore-certificate-errors')
+    return webdriver.Chrome(options=options)
+
+
+def get_process_tree_rss(pid: int) -> int:
+    """
+    Returns the resident memory in bytes of a process and all of its descendants.
+    Only supported where /proc is available, returns 0 otherwise.
+    Args:
+        pid: Root Process ID
+
+    Returns: Resident Set Size in bytes
+    """
+    if not os.path.isdir('/proc'):
+        return 0
+
+    children: dict[int, list[int]] = {}
+    rss_pages: dict[int, int] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", 'r', encoding='utf-8') as stat_file:
+                fields = stat_file.read().rsplit(')', 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        # Fields after the command name start at state (3), so ppid is 0 and rss is 21.
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss_pages[int(entry)] = int(fields[21])
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        total += rss_pages.get(current, 0)
+        pending.extend(children.get(current, []))
+    return total * os.sysconf('SC_PAGE_SIZE')
+
+
+class PooledDriver:
+    """
+    Web Driver tracked by the pool with the number of pages it has served.
+    """
+
+    driver: Any
+    pages: int
+
+    def __init__(self, driver: Any) -> None:
+        """
+        Constructor.
+        Args:
+            driver: Web Driver
+        """
+        self.driver = driver
+        self.pages = 0
+
+    def rss(self) -> int:
+        """
+        Returns the resident memory of the driver and the browser processes it launched.
+        Returns: Resident Set Size in bytes
+        """
+        service = getattr(self.driver, 'service', None)
+        process = getattr(service, 'process', None)
+        pid = getattr(process, 'pid', None)
+        if not pid:
+            return 0
+        return get_process_tree_rss(pid)
+
+
+class DriverPool:
+    """
+    Pool of warm headless browsers handed out with a context manager.
+    Browsers are recycled after serving max_pages pages or growing past max_rss_mb.
+    """
+
+    size: int
+    max_pages: int
+    max_rss_mb: int
+    factory: Callable[[], Any]
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, max_pages: int = DEFAULT_MAX_PAGES,
+                 max_rss_mb: int = DEFAULT_MAX_RSS_MB,
+                 factory: Callable[[], Any] = create_chrome_driver) -> None:
+        """
+        Constructor.
+        Args:
+            size: Maximum number of browsers
+            max_pages: Pages served before a browser is recycled
+            max_rss_mb: Resident memory ceiling in MB before a browser is recycled (0 disables)
+            factory: Callable creating a new Web Driver
+        """
+        self.size = size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.factory = factory
+        self._idle: list[PooledDriver] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def warm(self) -> None:
+        """
+        Launches browsers until the pool holds size idle browsers.
+        """
+        with self._lock:
+            missing = self.size - len(self._idle)
+        for _ in range(missing):
+            with self._slots:
+                item = PooledDriver(self.factory())
+                with self._lock:
+                    self._idle.append(item)
+
+    def _checkout(self) -> PooledDriver:
+        """
+        Takes an idle browser from the pool or launches a new one.
+        Returns: Pooled Driver
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Driver Pool is closed')
+            if self._idle:
+                return self._idle.pop()
+        return PooledDriver(self.factory())
+
+    def _should_recycle(self, item: PooledDriver) -> bool:
+        """
+        Determines if a browser has reached its page count or memory ceiling.
+        Args:
+            item: Pooled Driver
+
+        Returns: True when the browser should be discarded
+        """
+        if self.max_pages and item.pages >= self.max_pages:
+            return True
+        if self.max_rss_mb and item.rss() > self.max_rss_mb * 1024 * 1024:
+            return True
+        return False
+
+    @staticmethod
+    def _discard(item: PooledDriver) -> None:
+        """
+        Quits the browser, ignoring failures from an already dead process.
+        Args:
+            item: Pooled Driver
+        """
+        try:
+            item.driver.quit()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.warning('FAILED TO QUIT BROWSER', exc_info=True)
+
+    @contextmanager
+    def driver(self) -> Iterator[Any]:
+        """
+        Checks a browser out of the pool for the duration of the context.
+        Browsers that raise while checked out are discarded rather than reused.
+
+        Returns: Web Driver
+        """
+        self._slots.acquire()
+        try:
+            item = self._checkout()
+            try:
+                yield item.driver
+            except BaseException:
+                self._discard(item)
+                raise
+            item.pages += 1
+            with self._lock:
+                closed = self._closed
+            if closed or self._should_recycle(item):
+                self._discard(item)
+            else:
+                with self._lock:
+                    self._idle.append(item)
+        finally:
+            self._slots.release()
+
+    def fetch_payload(self, url: str) -> dict | None:
+        """
+        Loads the page and returns the window.__espnfitt__ payload.
+        Args:
+            url: Page Url
+
+        Returns: Payload Dictionary or None
+        """
+        with self.driver() as browser:
+            browser.get(url)
+            return browser.execute_script(PAYLOAD_SCRIPT)
+
+    def close(self) -> None:
+        """
+        Quits all idle browsers and stops handing out new ones.
+        """
+        with self._lock:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+        for item in idle:
+            self._discard(item)
+
+    def __enter__(self) -> 'DriverPool':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+_DEFAULT_POOL: DriverPool | None = None
+_DEFAULT_POOL_LOCK = threading.Lock()
+
+
+def get_driver_pool() -> DriverPool:
+    """
+    Returns the process wide Driver Pool, creating it on first use.
+    Returns: Driver Pool
+    """
+    global _DEFAULT_POOL  # pylint: disable=global-statement
+    with _DEFAULT_POOL_LOCK:
+        if _DEFAULT_POOL is None:
+            _DEFAULT_POOL = DriverPool()
+        return _DEFAULT_POOL
+
+
+def set_driver_pool(pool: DriverPool | None) -> None:
+    """
+    Replaces the process wide Driver Pool, closing the previous one.
+    Args:
+        pool: Driver Pool or None to reset
+    """
+    global _DEFAULT_POOL  # pylint: disable=global-statement
+    with _DEFAULT_POOL_LOCK:
+        previous = _DEFAULT_POOL
+        _DEFAULT_POOL = pool
+    if previous is not None and previous is not pool:
+        previous.close()
+
+
+@atexit.register
+def _close_default_pool() -> None:
+    if _DEFAULT_POOL is not None:
+        _DEFAULT_POOL.close()
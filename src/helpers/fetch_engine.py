@@ -0,0 +1,212 @@
+"""
+Fetch Engine for concurrently retrieving the game pages for a week.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import AsyncIterator, Callable, Iterable, NamedTuple
+from urllib.parse import urlparse
+
+from helpers.metrics import Metrics, get_metrics
+from helpers.payload import PayloadFetcher, get_payload_fetcher
+
+BOX_SCORE = 'boxscore'
+MATCHUP = 'matchup'
+SCHEDULE = 'schedule'
+
+PAGE_URLS = {
+    BOX_SCORE: 'https://www.espn.com/nfl/boxscore/_/gameId/{game_id}',
+    MATCHUP: 'https://www.espn.com/nfl/matchup/_/gameId/{game_id}',
+}
+
+# Parts of each payload the statistics and schedules are built from, hashed to detect changes.
+PAYLOAD_SUBTREES = {
+    BOX_SCORE: ('page', 'content', 'gamepackage', 'bxscr'),
+    MATCHUP: ('page', 'content', 'gamepackage', 'tmStats'),
+    SCHEDULE: ('page', 'content', 'events'),
+}
+
+DEFAULT_MAX_PER_HOST = 4
+DEFAULT_TIMEOUT = 90
+
+
+def hash_payload(payload: dict, page_type: str) -> str:
+    """
+    Hashes the part of a game page payload the statistics are built from. Keys are sorted so
+    the hash does not depend on the order ESPN serializes them in.
+    Args:
+        payload: Page Payload
+        page_type: boxscore, matchup or schedule
+
+    Returns: SHA-256 Hex Digest
+    """
+    subtree = payload
+    for key in PAYLOAD_SUBTREES[page_type]:
+        subtree = subtree.get(key, {}) if isinstance(subtree, dict) else {}
+    content = json.dumps(subtree, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def release_slot(limit: asyncio.Semaphore, task: asyncio.Future) -> None:
+    """
+    Releases a host slot once its request finished, retrieving the outcome of abandoned
+    requests so their failures are not reported as unhandled.
+    Args:
+        limit: Host Semaphore
+        task: Finished Request
+    """
+    limit.release()
+    if not task.cancelled():
+        task.exception()
+
+
+class FetchResult(NamedTuple):
+    """
+    Payload retrieved for a game page.
+    """
+    game_id: int
+    page_type: str
+    payload: dict | None
+
+
+class FetchEngine:
+    """
+    Retrieves game page payloads concurrently with a per host concurrency cap and timeout.
+    """
+
+    fetcher: PayloadFetcher | None
+    max_per_host: int
+    timeout: float
+    refresh: bool
+
+    def __init__(self, fetcher: PayloadFetcher | None = None,
+                 max_per_host: int = DEFAULT_MAX_PER_HOST,
+                 timeout: float = DEFAULT_TIMEOUT, *, refresh: bool = False) -> None:
+        """
+        Constructor.
+        Args:
+            fetcher: Payload Fetcher, defaults to the process wide fetcher
+            max_per_host: Maximum concurrent requests per host
+            timeout: Seconds allowed per page
+            refresh: Retrieve the pages instead of reading cached payloads
+        """
+        self.fetcher = fetcher
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.refresh = refresh
+
+    async def fetch_page(self, game_id: int, page_type: str,
+                         limits: dict[str, asyncio.Semaphore]) -> FetchResult:
+        """
+        Retrieves a single game page.
+        Args:
+            game_id: Game ID
+            page_type: Page Type (boxscore, matchup)
+            limits: Semaphores by host
+
+        Returns: Fetch Result, with no payload when the page failed or timed out
+        """
+        url = PAGE_URLS[page_type].format(game_id=game_id)
+        host = urlparse(url).netloc
+        limit = limits.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        fetcher = self.fetcher if self.fetcher is not None else get_payload_fetcher()
+
+        # The fetcher thread inherits the game, attributing its timings to it.
+        with Metrics.game(game_id):
+            await limit.acquire()
+            fetch = asyncio.ensure_future(
+                asyncio.to_thread(fetcher.fetch, url, refresh=self.refresh))
+        # A thread cannot be stopped, so a timed out request keeps its slot until it finishes
+        # and abandoned requests still count against the cap.
+        fetch.add_done_callback(lambda task: release_slot(limit, task))
+        done, _ = await asyncio.wait({fetch}, timeout=self.timeout)
+        payload = None
+        if not done:
+            logging.warning('TIMED OUT RETRIEVING %s FOR GAME: %s', page_type, game_id)
+        elif fetch.exception() is not None:
+            logging.warning('FAILED RETRIEVING %s FOR GAME: %s', page_type, game_id,
+                            exc_info=fetch.exception())
+        else:
+            payload = fetch.result()
+        return FetchResult(game_id, page_type, payload)
+
+    async def fetch_games(self, game_ids: Iterable[int],
+                          page_types: Iterable[str] = (BOX_SCORE, MATCHUP)
+                          ) -> AsyncIterator[FetchResult]:
+        """
+        Retrieves the pages for all games, yielding results as they complete.
+        Args:
+            game_ids: Game IDs
+            page_types: Page Types to retrieve per game
+
+        Returns: Fetch Results in completion order
+        """
+        limits: dict[str, asyncio.Semaphore] = {}
+        page_types = list(page_types)
+        tasks = [asyncio.create_task(self.fetch_page(game_id, page_type, limits))
+                 for game_id in game_ids for page_type in page_types]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def handle(callback: Callable[[FetchResult], None], result: FetchResult) -> None:
+        """
+        Hands a result to the callback, logging a failure instead of raising it so one game
+        cannot stop the others.
+        Args:
+            callback: Function processing a Fetch Result
+            result: Fetch Result
+        """
+        try:
+            callback(result)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.error('FAILED PROCESSING %s FOR GAME: %s', result.page_type, result.game_id,
+                          exc_info=True)
+            get_metrics().increment('games.failed')
+
+    async def consume(self, queue: asyncio.Queue, callback: Callable[[FetchResult], None]) -> None:
+        """
+        Runs the callback for each queued result in a worker thread, one at a time, until the
+        queue yields None.
+        Args:
+            queue: Fetch Results
+            callback: Function processing a Fetch Result
+        """
+        while True:
+            result = await queue.get()
+            if result is None:
+                return
+            await asyncio.to_thread(self.handle, callback, result)
+
+    async def _run(self, game_ids: Iterable[int], page_types: Iterable[str],
+                   callback: Callable[[FetchResult], None]) -> None:
+        # Results are handed off to a single consumer, so slow callbacks never hold up the
+        # event loop and the fetches queued behind them.
+        queue: asyncio.Queue = asyncio.Queue()
+        consumer = asyncio.create_task(self.consume(queue, callback))
+        try:
+            async for result in self.fetch_games(game_ids, page_types):
+                queue.put_nowait(result)
+            queue.put_nowait(None)
+            await consumer
+        finally:
+            consumer.cancel()
+
+    def run(self, game_ids: Iterable[int], page_types: Iterable[str],
+            callback: Callable[[FetchResult], None]) -> None:
+        """
+        Retrieves the pages for all games, handing each result to the callback as it arrives.
+        Callbacks run one at a time in a worker thread and a failing callback is logged and
+        skipped.
+        Args:
+            game_ids: Game IDs
+            page_types: Page Types to retrieve per game
+            callback: Function processing a Fetch Result
+        """
+        asyncio.run(self._run(game_ids, page_types, callback))
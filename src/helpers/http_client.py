@@ -0,0 +1,256 @@
+"""
+HTTP Client sharing pooled keep-alive connections with timeouts and budgeted retries.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from helpers.metrics import get_metrics
+from helpers.rate_limit import THROTTLE_STATUS_CODES, AdaptiveRateLimiter
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30
+DEFAULT_POOL_SIZE = 16
+DEFAULT_BUDGET_RATIO = 0.2
+DEFAULT_MIN_RETRIES = 10
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of the requests sent so a failing service is not flooded.
+    Every request deposits `ratio` of a retry, every retry withdraws one. A reserve of
+    `min_retries` keeps retries available when there is little traffic.
+    """
+
+    ratio: float
+    min_retries: int
+
+    def __init__(self, ratio: float = DEFAULT_BUDGET_RATIO,
+                 min_retries: int = DEFAULT_MIN_RETRIES) -> None:
+        """
+        Constructor.
+        Args:
+            ratio: Retries allowed per request
+            min_retries: Retries available before any request is made
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._balance = float(min_retries)
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """
+        Records a request.
+        """
+        with self._lock:
+            # Cap the balance so a long healthy run cannot save up a retry storm.
+            self._balance = min(self._balance + self.ratio, self.min_retries + 100 * self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Takes a retry from the budget.
+
+        Returns: True when a retry is available
+        """
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+class HttpClient:
+    """
+    Pooled requests Session reusing connections per host.
+    Requests time out by default and idempotent requests are retried on connection errors,
+    timeouts and retryable status codes with exponential backoff and full jitter.
+    """
+
+    timeout: tuple[float, float]
+    max_retries: int
+    backoff: float
+    max_backoff: float
+    budget: RetryBudget
+    session: requests.Session
+
+    def __init__(self, timeout: tuple[float, float] = (DEFAULT_CONNECT_TIMEOUT,
+                                                       DEFAULT_READ_TIMEOUT), *,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF, pool_size: int = DEFAULT_POOL_SIZE,
+                 budget: RetryBudget | None = None,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Constructor.
+        Args:
+            timeout: Connect and Read Timeouts in seconds
+            max_retries: Retries per request
+            backoff: Base delay in seconds, doubled on every retry
+            max_backoff: Longest delay in seconds
+            pool_size: Connections kept alive per host
+            budget: Retry Budget shared by every request of the client
+            sleep: Sleep function
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget = budget if budget is not None else RetryBudget()
+        self._sleep = sleep
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get_delay(self, attempt: int, response: requests.Response | None) -> float:
+        """
+        Returns the delay before a retry, honoring a Retry-After header.
+        Args:
+            attempt: Retry number starting at 0
+            response: Failed Response or None on an error
+
+        Returns: Seconds to wait
+        """
+        retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+        if retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method: str, url: str, retry: bool | None = None,
+                limiter: AdaptiveRateLimiter | None = None, **kwargs) -> requests.Response:
+        """
+        Sends a request, retrying it when it failed and the budget allows.
+        Args:
+            method: HTTP Method
+            url: Url
+            retry: Retry the request, defaults to retrying idempotent methods
+            limiter: Rate Limiter pacing and adapting to every attempt
+            kwargs: requests arguments
+
+        Returns: Response of the last attempt
+
+        Raises: requests.RequestException when the last attempt failed to connect
+        """
+        method = method.upper()
+        retry = method in IDEMPOTENT_METHODS if retry is None else retry
+        kwargs.setdefault('timeout', self.timeout)
+        self.budget.deposit()
+
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire()
+            response = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                record_attempt(limiter, None)
+                if not self.can_retry(retry, attempt):
+                    raise
+            else:
+                record_attempt(limiter, response)
+                if response.status_code not in RETRY_STATUS_CODES \
+                        or not self.can_retry(retry, attempt):
+                    return response
+
+            delay = self.get_delay(attempt, response)
+            logging.info('RETRYING %s %s IN %.2f SECONDS', method, url, delay)
+            get_metrics().increment('http.retries')
+            self._sleep(delay)
+            attempt += 1
+
+    def can_retry(self, retry: bool, attempt: int) -> bool:
+        """
+        Determines if another attempt is allowed.
+        Args:
+            retry: Request may be retried
+            attempt: Retries made so far
+
+        Returns: True when the request should be retried
+        """
+        return retry and attempt < self.max_retries and self.budget.withdraw()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request.
+        Args:
+            url: Url
+            kwargs: Request arguments
+
+        Returns: Response
+        """
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a POST request, only retried when retry=True is passed.
+        Args:
+            url: Url
+            kwargs: Request arguments
+
+        Returns: Response
+        """
+        return self.request('POST', url, **kwargs)
+
+    def close(self) -> None:
+        """
+        Closes the pooled connections.
+        """
+        self.session.close()
+
+
+def record_attempt(limiter: AdaptiveRateLimiter | None,
+                   response: requests.Response | None) -> None:
+    """
+    Adapts the Rate Limiter to the outcome of an attempt.
+    Args:
+        limiter: Rate Limiter or None
+        response: Response or None when the attempt failed
+    """
+    if limiter is None:
+        return
+    if response is not None and response.status_code not in THROTTLE_STATUS_CODES:
+        limiter.record_success()
+        return
+    retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+    if limiter.record_failure(float(retry_after) if retry_after.isdigit() else None):
+        get_metrics().increment('rate.decreases')
+        logging.warning('REDUCED REQUEST RATE TO %.2f PER SECOND', limiter.rate)
+
+
+_DEFAULT_CLIENT: HttpClient | None = None
+_DEFAULT_CLIENT_LOCK = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Returns the process wide HTTP Client, creating it on first use.
+    Returns: HTTP Client
+    """
+    global _DEFAULT_CLIENT  # pylint: disable=global-statement
+    with _DEFAULT_CLIENT_LOCK:
+        if _DEFAULT_CLIENT is None:
+            _DEFAULT_CLIENT = HttpClient()
+        return _DEFAULT_CLIENT
+
+
+def set_http_client(client: HttpClient | None) -> None:
+    """
+    Replaces the process wide HTTP Client.
+    Args:
+        client: HTTP Client or None to reset
+    """
+    global _DEFAULT_CLIENT  # pylint: disable=global-statement
+    with _DEFAULT_CLIENT_LOCK:
+        _DEFAULT_CLIENT = client
@@ -0,0 +1,198 @@
+"""
+Load Journal recording completed load stages so interrupted loads can resume.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+BUSY_TIMEOUT = 30
+QUERY_CHUNK_SIZE = 500
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS journal (
+    stage TEXT NOT NULL,
+    item TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    completed REAL NOT NULL,
+    PRIMARY KEY (stage, item)
+)
+"""
+
+CREATE_HASH_TABLE = """
+CREATE TABLE IF NOT EXISTS payload_hash (
+    stage TEXT NOT NULL,
+    item TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    recorded REAL NOT NULL,
+    PRIMARY KEY (stage, item)
+)
+"""
+
+
+def build_week_key(year: int, week: int, type_code: str) -> str:
+    """
+    Builds the journal key of a week.
+    Args:
+        year: Year Value
+        week: Week Value
+        type_code: Type Code
+
+    Returns: Week Key
+    """
+    return f'{year}-{week}-{type_code}'
+
+
+class LoadJournal:
+    """
+    Durable local journal of completed stages backed by SQLite.
+    Items are keyed by stage and the game id or week key, so a restarted load skips
+    everything completed before it stopped. The payload hash of each loaded game is kept apart
+    from the completions, so a reload can skip games whose payload has not changed.
+    Safe to share between threads and processes.
+    """
+
+    path: str
+
+    def __init__(self, path: str) -> None:
+        """
+        Constructor.
+        Args:
+            path: Journal File
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                           check_same_thread=False)
+        # WAL lets worker processes record completions while others read.
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(CREATE_TABLE)
+        self._connection.execute(CREATE_HASH_TABLE)
+
+    def is_complete(self, stage: str, item: str | int) -> bool:
+        """
+        Determines if the stage has been completed for the item.
+        Args:
+            stage: Stage Name
+            item: Game ID or Week Key
+
+        Returns: True when completed
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT 1 FROM journal WHERE stage = ? AND item = ?',
+                                           (stage, str(item))).fetchone()
+        return row is not None
+
+    def get_completed(self, stage: str, items: Iterable[str | int]) -> set[str]:
+        """
+        Returns the items that have completed the stage.
+        Args:
+            stage: Stage Name
+            items: Game IDs or Week Keys
+
+        Returns: Completed Items as strings
+        """
+        keys = [str(item) for item in items]
+        completed = set()
+        with self._lock:
+            for index in range(0, len(keys), QUERY_CHUNK_SIZE):
+                chunk = keys[index:index + QUERY_CHUNK_SIZE]
+                rows = self._connection.execute(
+                    f"SELECT item FROM journal WHERE stage = ? AND item IN "
+                    f"({', '.join('?' * len(chunk))})", (stage, *chunk))
+                completed.update(row[0] for row in rows)
+        return completed
+
+    def get_pending(self, stage: str, items: Iterable[int]) -> list[int]:
+        """
+        Returns the items that have not completed the stage, in order.
+        Args:
+            stage: Stage Name
+            items: Game IDs
+
+        Returns: Pending Game IDs
+        """
+        items = list(items)
+        completed = self.get_completed(stage, items)
+        return [item for item in items if str(item) not in completed]
+
+    def mark_complete(self, stage: str, item: str | int, count: int = 0) -> None:
+        """
+        Records the stage as completed for the item.
+        Args:
+            stage: Stage Name
+            item: Game ID or Week Key
+            count: Number of rows stored
+        """
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO journal (stage, item, count, completed) '
+                'VALUES (?, ?, ?, ?)', (stage, str(item), count, time.time()))
+
+    def get_hash(self, stage: str, item: str | int) -> str | None:
+        """
+        Returns the payload hash of the last successful load of the item.
+        Args:
+            stage: Stage Name
+            item: Game ID
+
+        Returns: Payload Hash or None
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT hash FROM payload_hash WHERE stage = ? AND item = ?',
+                (stage, str(item))).fetchone()
+        return row[0] if row else None
+
+    def is_unchanged(self, stage: str, item: str | int, digest: str) -> bool:
+        """
+        Determines if the payload hash matches the last successful load of the item.
+        Args:
+            stage: Stage Name
+            item: Game ID
+            digest: Payload Hash
+
+        Returns: True when the payload has not changed
+        """
+        return self.get_hash(stage, item) == digest
+
+    def record_hash(self, stage: str, item: str | int, digest: str) -> None:
+        """
+        Records the payload hash of a successful load.
+        Args:
+            stage: Stage Name
+            item: Game ID
+            digest: Payload Hash
+        """
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO payload_hash (stage, item, hash, recorded) '
+                'VALUES (?, ?, ?, ?)', (stage, str(item), digest, time.time()))
+
+    def reset(self, stage: str | None = None) -> None:
+        """
+        Removes the completed items of a stage, or of every stage.
+        Payload hashes are kept so the reload still skips unchanged games.
+        Args:
+            stage: Stage Name
+        """
+        with self._lock:
+            if stage is None:
+                self._connection.execute('DELETE FROM journal')
+            else:
+                self._connection.execute('DELETE FROM journal WHERE stage = ?', (stage,))
+
+    def close(self) -> None:
+        """
+        Closes the journal.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> 'LoadJournal':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
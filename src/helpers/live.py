@@ -0,0 +1,235 @@
+"""
+Live polling of in progress games writing only the statistics that changed since the last poll.
+"""
+
+import logging
+import time
+from typing import Callable
+
+from football_data.models import Schedule
+
+from helpers.box_score import BoxScoreHelper
+from helpers.fetch_engine import BOX_SCORE, FetchEngine, FetchResult
+from helpers.journal import LoadJournal
+from helpers.metrics import BUILD, get_metrics
+from helpers.poll_scheduler import PHASE_HALFTIME, PHASE_IN, PHASE_POST, PHASE_PRE, \
+    PollScheduler
+from helpers.stat_batch import StatBatch
+from helpers.statistic_writer import StatisticStream, StatisticWriter, get_natural_key, iter_rows
+
+
+def get_game_phase(payload: dict) -> str:
+    """
+    Returns the phase of the game from a game page payload.
+    Args:
+        payload: Box Score payload
+
+    Returns: pre, in, halftime or post, empty when unknown
+    """
+    strip = payload.get('page', {}).get('content', {}).get('gamepackage', {}).get('gmStrp', {})
+    status = strip.get('status', {})
+    state = strip.get('statusState') or status.get('state', '')
+    if state == PHASE_IN and str(status.get('det', '')).lower() == PHASE_HALFTIME:
+        return PHASE_HALFTIME
+    return state
+
+
+class StatisticSnapshot:
+    """
+    Last written value of every Statistic by natural key.
+    """
+
+    values: dict[tuple, float]
+
+    def __init__(self) -> None:
+        """
+        Constructor.
+        """
+        self.values = {}
+
+    def diff(self, stats: StatisticStream) -> StatBatch:
+        """
+        Returns the Statistics that are new or whose value changed since the snapshot.
+        The snapshot is left untouched until the changes are applied.
+        Args:
+            stats: Statistics or Stat Batches
+
+        Returns: Changed Statistics
+        """
+        # Later rows replace earlier ones with the same key, as they do when upserted.
+        latest = {get_natural_key(row): row for row in iter_rows(stats)}
+        changed = StatBatch()
+        for key, row in latest.items():
+            if self.values.get(key) == row['value']:
+                continue
+            changed.append(row['statistic_code_id'], row['schedule_id'], row['value'],
+                           row['category_id'], player_id=row['player_id'],
+                           team_id=row['team_id'])
+        return changed
+
+    def apply(self, stats: StatBatch) -> None:
+        """
+        Records written Statistics in the snapshot.
+        Args:
+            stats: Written Statistics
+        """
+        for row in stats.rows():
+            self.values[get_natural_key(row)] = row['value']
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class LivePoller:  # pylint: disable=too-many-instance-attributes
+    """
+    Polls the box scores of a week's games until every game is final.
+    The Poll Scheduler wakes each game shortly before kickoff and sets how often it is polled
+    from its phase. Each wake builds the statistics of the due games that have started, diffs
+    them against the snapshot and writes the changes of all of them in one transaction.
+    Pages are always retrieved rather than read from the payload cache, which keeps upcoming
+    games until well after kickoff and final games forever.
+    With a journal, games it lists as complete are not polled and games that finish with every
+    athlete resolved are marked complete. A failed write is rolled back and its games polled
+    again, leaving the snapshot as it was so the next poll writes the same changes.
+    """
+
+    helper: BoxScoreHelper
+    writer: StatisticWriter
+    games: dict[int, tuple[Schedule, Schedule | None]]
+    engine: FetchEngine
+    scheduler: PollScheduler
+    snapshot: StatisticSnapshot
+    journal: LoadJournal | None
+    written: dict[int, int]
+    unresolved: set[int]
+
+    def __init__(self, helper: BoxScoreHelper,  # pylint: disable=too-many-arguments
+                 writer: StatisticWriter, games: dict[int, tuple[Schedule, Schedule | None]], *,
+                 engine: FetchEngine | None = None, scheduler: PollScheduler | None = None,
+                 sleep: Callable[[float], None] = time.sleep,
+                 clock: Callable[[], float] = time.time,
+                 journal: LoadJournal | None = None) -> None:
+        """
+        Constructor.
+        Args:
+            helper: Box Score Helper
+            writer: Statistic Writer
+            games: Home and Away Schedules by Game ID
+            engine: Fetch Engine, which should bypass the payload cache
+            scheduler: Poll Scheduler holding the kickoff times
+            sleep: Sleep function
+            clock: Clock in epoch seconds
+            journal: Load Journal of the completed games
+        """
+        self.helper = helper
+        self.writer = writer
+        self.games = games
+        self.engine = engine if engine is not None else FetchEngine(refresh=True)
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
+        self._sleep = sleep
+        self._clock = clock
+        self.snapshot = StatisticSnapshot()
+        self.journal = journal
+        self.written = {}
+        self.unresolved = set()
+        now = clock()
+        for game_id in games:
+            if journal and journal.is_complete(BOX_SCORE, game_id):
+                logging.info('SKIPPING COMPLETED GAME: %s', game_id)
+                continue
+            self.scheduler.add(game_id, now)
+
+    def poll(self) -> int:
+        """
+        Fetches the games that are due and writes the changed statistics.
+
+        Returns: Number of statistics written
+        """
+        now = self._clock()
+        due = self.scheduler.pop_due(now)
+        if not due:
+            return 0
+        changes = StatBatch()
+        phases: dict[int, str] = {}
+        changed = set()
+        counts: dict[int, int] = {}
+
+        def process(result: FetchResult) -> None:
+            if not result.payload:
+                logging.warning('NO BOX SCORE FOUND FOR GAME: %s', result.game_id)
+                return
+            phases[result.game_id] = phase = get_game_phase(result.payload)
+            if phase == PHASE_PRE:
+                return
+            schedule, opponent_schedule = self.games[result.game_id]
+            away_schedule_id = opponent_schedule.id if opponent_schedule else schedule.id
+            self.helper.preload_players(result.payload)
+            stats = self.helper.iter_statistics(result.payload, schedule.id, away_schedule_id)
+            game_changes = self.snapshot.diff(get_metrics().time_iter(BUILD, stats))
+            if self.helper.unresolved:
+                self.unresolved.add(result.game_id)
+            else:
+                self.unresolved.discard(result.game_id)
+            if len(game_changes):
+                changed.add(result.game_id)
+                changes.extend(game_changes)
+                counts[result.game_id] = len(game_changes)
+
+        self.engine.run(due, [BOX_SCORE], process)
+        get_metrics().increment('live.polls', len(due))
+        try:
+            count = self.writer.upsert(changes) if len(changes) else 0
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.error('FAILED TO WRITE %s CHANGED STATS FOR GAMES: %s', len(changes), due,
+                          exc_info=True)
+            get_metrics().increment('live.failed_writes')
+            for game_id in due:
+                # Reported as changed so a final game is kept until its changes are written.
+                self.scheduler.reschedule(game_id, phases.get(game_id, PHASE_IN), now, True)
+            return 0
+        self.snapshot.apply(changes)
+        for game_id, game_count in counts.items():
+            self.written[game_id] = self.written.get(game_id, 0) + game_count
+        for game_id in due:
+            # A failed fetch is retried at the live cadence.
+            phase = phases.get(game_id, PHASE_IN)
+            if not self.scheduler.reschedule(game_id, phase, now, game_id in changed):
+                logging.info('FINISHED POLLING GAME: %s', game_id)
+                self.complete(game_id, phase)
+        return count
+
+    def complete(self, game_id: int, phase: str) -> None:
+        """
+        Marks a game that finished polling complete in the journal, unless it is not final or
+        some of its athletes could not be resolved.
+        Args:
+            game_id: Game ID
+            phase: Phase seen by the last poll
+        """
+        if self.journal is None or phase != PHASE_POST:
+            return
+        if game_id in self.unresolved:
+            logging.warning('ATHLETES UNRESOLVED, NOT COMPLETING GAMEID: %s', game_id)
+            return
+        self.journal.mark_complete(BOX_SCORE, game_id, self.written.get(game_id, 0))
+
+    def run(self, max_polls: int | None = None) -> int:
+        """
+        Sleeps until the next game is due and polls until every game is final.
+        Args:
+            max_polls: Stop after this many wakes
+
+        Returns: Number of statistics written
+        """
+        total = 0
+        polls = 0
+        while len(self.scheduler) and (max_polls is None or polls < max_polls):
+            delay = self.scheduler.next_due() - self._clock()
+            if delay > 0:
+                self._sleep(delay)
+            count = self.poll()
+            polls += 1
+            total += count
+            logging.info('POLL %s WROTE %s CHANGED STATS, %s GAMES SCHEDULED', polls, count,
+                         len(self.scheduler))
+        return total
@@ -0,0 +1,227 @@
+"""
+Stage timers and counters aggregated per game and per run, exported as JSON or Prometheus text.
+"""
+
+import contextvars
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, TypeVar
+
+METRIC_PREFIX = 'nfl_scrape'
+
+# Stage names used by the loaders and helpers.
+FETCH_HTTP = 'fetch.http'
+FETCH_BROWSER = 'fetch.browser'
+EXTRACT = 'extract'
+PLAYERS = 'players'
+PLAYER_BUILD = 'players.build'
+BUILD = 'build'
+PERSIST = 'persist'
+SCHEDULE = 'schedule'
+
+_GAME: contextvars.ContextVar[int | None] = contextvars.ContextVar('metrics_game', default=None)
+
+T = TypeVar('T')
+
+
+def format_name(name: str) -> str:
+    """
+    Converts a stage or counter name to a Prometheus metric name component.
+    Args:
+        name: Stage or Counter Name
+
+    Returns: Metric Name
+    """
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+class Metrics:
+    """
+    Thread safe collection of stage timers and counters.
+    Timers record their count, total and maximum seconds for the run and their total seconds
+    for the game set with game(). Asyncio tasks and asyncio.to_thread inherit the game.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor.
+        """
+        self._lock = threading.Lock()
+        self.timers: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, float] = {}
+        self.games: dict[str, dict[str, float]] = {}
+
+    @staticmethod
+    @contextmanager
+    def game(game_id: int) -> Iterator[None]:
+        """
+        Attributes the timers recorded inside the block to a game.
+        Args:
+            game_id: Game ID
+        """
+        token = _GAME.set(game_id)
+        try:
+            yield
+        finally:
+            _GAME.reset(token)
+
+    def record(self, stage: str, seconds: float, game_id: int | None = None) -> None:
+        """
+        Records a timing for a stage.
+        Args:
+            stage: Stage Name
+            seconds: Elapsed Seconds
+            game_id: Game ID, defaults to the current game
+        """
+        game_id = game_id if game_id is not None else _GAME.get()
+        with self._lock:
+            timer = self.timers.setdefault(stage, {'count': 0, 'total': 0.0, 'max': 0.0})
+            timer['count'] += 1
+            timer['total'] += seconds
+            timer['max'] = max(timer['max'], seconds)
+            if game_id is not None:
+                game = self.games.setdefault(str(game_id), {})
+                game[stage] = game.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """
+        Times the block as a stage.
+        Args:
+            stage: Stage Name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def time_iter(self, stage: str, items: Iterable[T]) -> Iterator[T]:
+        """
+        Times the production of each item of a lazy iterable as a stage, leaving out the time
+        spent by the consumer.
+        Args:
+            stage: Stage Name
+            items: Iterable
+
+        Returns: The items
+        """
+        iterator = iter(items)
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            self.record(stage, elapsed)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Increments a counter.
+        Args:
+            name: Counter Name
+            value: Amount
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> dict:
+        """
+        Returns a copy of the timers, counters and per game timings.
+
+        Returns: Summary Dictionary
+        """
+        with self._lock:
+            return {
+                'timers': {name: dict(timer) for name, timer in self.timers.items()},
+                'counters': dict(self.counters),
+                'games': {game_id: dict(stages) for game_id, stages in self.games.items()}
+            }
+
+    def merge(self, summary: dict) -> None:
+        """
+        Adds the summary of another collection, such as one returned by a worker process.
+        Args:
+            summary: Summary Dictionary
+        """
+        with self._lock:
+            for name, other in summary.get('timers', {}).items():
+                timer = self.timers.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+                timer['count'] += other['count']
+                timer['total'] += other['total']
+                timer['max'] = max(timer['max'], other['max'])
+            for name, value in summary.get('counters', {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for game_id, stages in summary.get('games', {}).items():
+                game = self.games.setdefault(game_id, {})
+                for stage, seconds in stages.items():
+                    game[stage] = game.get(stage, 0.0) + seconds
+
+    def to_prometheus(self) -> str:
+        """
+        Formats the metrics in the Prometheus text exposition format.
+
+        Returns: Metrics Text
+        """
+        summary = self.summary()
+        lines = [f'# TYPE {METRIC_PREFIX}_stage_seconds_total counter',
+                 f'# TYPE {METRIC_PREFIX}_stage_calls_total counter',
+                 f'# TYPE {METRIC_PREFIX}_stage_seconds_max gauge']
+        for name, timer in sorted(summary['timers'].items()):
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_total{{stage="{name}"}} {timer["total"]}')
+            lines.append(f'{METRIC_PREFIX}_stage_calls_total{{stage="{name}"}} {timer["count"]}')
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_max{{stage="{name}"}} {timer["max"]}')
+        for name, value in sorted(summary['counters'].items()):
+            metric = f'{METRIC_PREFIX}_{format_name(name)}_total'
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric} {value}')
+        lines.append(f'# TYPE {METRIC_PREFIX}_game_stage_seconds gauge')
+        for game_id, stages in sorted(summary['games'].items()):
+            for stage, seconds in sorted(stages.items()):
+                lines.append(f'{METRIC_PREFIX}_game_stage_seconds'
+                             f'{{game_id="{game_id}",stage="{stage}"}} {seconds}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, directory: str) -> None:
+        """
+        Writes metrics.json and metrics.prom to the directory.
+        Args:
+            directory: Output Directory
+        """
+        with open(f'{directory}/metrics.json', 'w', encoding='utf-8') as output_file:
+            json.dump(self.summary(), output_file, indent=2)
+        with open(f'{directory}/metrics.prom', 'w', encoding='utf-8') as output_file:
+            output_file.write(self.to_prometheus())
+
+
+_DEFAULT_METRICS = Metrics()
+_DEFAULT_METRICS_LOCK = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """
+    Returns the process wide Metrics.
+    Returns: Metrics
+    """
+    with _DEFAULT_METRICS_LOCK:
+        return _DEFAULT_METRICS
+
+
+def set_metrics(metrics: Metrics) -> None:
+    """
+    Replaces the process wide Metrics.
+    Args:
+        metrics: Metrics
+    """
+    global _DEFAULT_METRICS  # pylint: disable=global-statement
+    with _DEFAULT_METRICS_LOCK:
+        _DEFAULT_METRICS = metrics
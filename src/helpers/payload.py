@@ -0,0 +1,198 @@
+"""
+Payload Helper for extracting the window.__espnfitt__ data from ESPN pages.
+"""
+
+import json
+import logging
+import re
+import threading
+
+import requests
+
+from helpers.cache import PayloadCache
+from helpers.driver import DriverPool, get_driver_pool
+from helpers.http_client import HttpClient, get_http_client, record_attempt
+from helpers.metrics import EXTRACT, FETCH_BROWSER, FETCH_HTTP, get_metrics
+from helpers.rate_limit import AdaptiveRateLimiter, get_rate_limiter
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  + 'Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml',
+}
+
+PAYLOAD_PATTERN = re.compile(r"window(?:\[['\"]__espnfitt__['\"]\]|\.__espnfitt__)\s*=\s*")
+
+
+def extract_payload(html: str) -> dict | None:
+    """
+    Extracts the window.__espnfitt__ object serialized into the page source.
+    Args:
+        html: Page HTML
+
+    Returns: Payload Dictionary or None
+    """
+    match = PAYLOAD_PATTERN.search(html)
+    if not match:
+        return None
+    try:
+        payload, _ = json.JSONDecoder().raw_decode(html, match.end())
+    except ValueError:
+        return None
+    if isinstance(payload, dict):
+        return payload
+    return None
+
+
+class PayloadFetcher:
+    """
+    Retrieves page payloads over plain HTTP, falling back to a browser when extraction fails.
+    Payloads are served from the cache when one is configured. Requests are paced by the
+    Rate Limiter, which adapts to the throttled and failed responses.
+    """
+
+    pool: DriverPool | None
+    cache: PayloadCache | None
+    limiter: AdaptiveRateLimiter | None
+    client: HttpClient | None
+    timeout: float
+    headers: dict
+
+    def __init__(self, pool: DriverPool | None = None, cache: PayloadCache | None = None,
+                 timeout: float = DEFAULT_TIMEOUT, headers: dict | None = None, *,
+                 limiter: AdaptiveRateLimiter | None = None,
+                 client: HttpClient | None = None) -> None:
+        """
+        Constructor.
+        Args:
+            pool: Driver Pool for the browser fallback, defaults to the process wide pool
+            cache: Payload Cache
+            timeout: HTTP Timeout in seconds
+            headers: HTTP Headers
+            limiter: Rate Limiter, defaults to the process wide limiter
+            client: HTTP Client, defaults to the process wide client
+        """
+        self.pool = pool
+        self.cache = cache
+        self.timeout = timeout
+        self.headers = headers if headers is not None else dict(DEFAULT_HEADERS)
+        self.limiter = limiter
+        self.client = client
+
+    def get_limiter(self) -> AdaptiveRateLimiter:
+        """
+        Returns the Rate Limiter pacing this fetcher.
+        Returns: Adaptive Rate Limiter
+        """
+        return self.limiter if self.limiter is not None else get_rate_limiter()
+
+    def fetch_html(self, url: str) -> str | None:
+        """
+        Retrieves the raw page HTML.
+        Args:
+            url: Page Url
+
+        Returns: HTML or None
+        """
+        client = self.client if self.client is not None else get_http_client()
+        try:
+            with get_metrics().timer(FETCH_HTTP):
+                response = client.get(url, headers=self.headers, timeout=self.timeout,
+                                      limiter=self.get_limiter())
+        except requests.RequestException:
+            logging.warning('FAILED TO RETRIEVE PAGE: %s', url, exc_info=True)
+            return None
+        if response.status_code == 200:
+            return response.text
+        logging.warning('PAGE RETURNED STATUS %s: %s', response.status_code, url)
+        return None
+
+    def fetch_browser(self, url: str) -> dict | None:
+        """
+        Retrieves the payload by rendering the page in a pooled browser.
+        Args:
+            url: Page Url
+
+        Returns: Payload Dictionary or None
+        """
+        pool = self.pool if self.pool is not None else get_driver_pool()
+        limiter = self.get_limiter()
+        limiter.acquire()
+        get_metrics().increment('pages.browser')
+        try:
+            with get_metrics().timer(FETCH_BROWSER):
+                payload = pool.fetch_payload(url)
+        except Exception:
+            record_attempt(limiter, None)
+            raise
+        limiter.record_success()
+        return payload
+
+    def fetch_page(self, url: str) -> dict | None:
+        """
+        Retrieves the page payload, using the browser only when the HTML was retrieved but
+        the payload cannot be extracted from it. Error statuses and failed connections are not
+        retried in the browser, which would bypass the Rate Limiter and retry budget.
+        Args:
+            url: Page Url
+
+        Returns: Payload Dictionary or None when the page could not be retrieved
+        """
+        html = self.fetch_html(url)
+        if html is None:
+            return None
+        with get_metrics().timer(EXTRACT):
+            payload = extract_payload(html)
+        if payload is not None:
+            return payload
+        logging.info('FALLING BACK TO BROWSER FOR: %s', url)
+        return self.fetch_browser(url)
+
+    def fetch(self, url: str, *, refresh: bool = False) -> dict | None:
+        """
+        Retrieves the page payload from the cache or the page.
+        Args:
+            url: Page Url
+            refresh: Skip the cached payload, storing the fresh one in its place
+
+        Returns: Payload Dictionary or None
+        """
+        if self.cache is not None and not refresh:
+            payload = self.cache.get(url)
+            if payload is not None:
+                get_metrics().increment('cache.hits')
+                return payload
+            get_metrics().increment('cache.misses')
+
+        payload = self.fetch_page(url)
+        if payload is not None and self.cache is not None:
+            self.cache.put(url, payload)
+        return payload
+
+
+_DEFAULT_FETCHER: PayloadFetcher | None = None
+_DEFAULT_FETCHER_LOCK = threading.Lock()
+
+
+def get_payload_fetcher() -> PayloadFetcher:
+    """
+    Returns the process wide Payload Fetcher, creating it on first use.
+    Returns: Payload Fetcher
+    """
+    global _DEFAULT_FETCHER  # pylint: disable=global-statement
+    with _DEFAULT_FETCHER_LOCK:
+        if _DEFAULT_FETCHER is None:
+            _DEFAULT_FETCHER = PayloadFetcher()
+        return _DEFAULT_FETCHER
+
+
+def set_payload_fetcher(fetcher: PayloadFetcher | None) -> None:
+    """
+    Replaces the process wide Payload Fetcher.
+    Args:
+        fetcher: Payload Fetcher or None to reset
+    """
+    global _DEFAULT_FETCHER  # pylint: disable=global-statement
+    with _DEFAULT_FETCHER_LOCK:
+        _DEFAULT_FETCHER = fetcher
@@ -2,55 +2,235 @@
 Player Helper Class to build and submit Players to the API.
 """
 
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
 from football_data.models import Player, Position
 from football_data.repositories import PlayerRepository, PositionCodeRepository
-from selenium import webdriver
+
+from helpers.metrics import PLAYER_BUILD, PLAYERS, get_metrics
+from helpers.payload import get_payload_fetcher
+
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_BUILD_WORKERS = 4
+QUERY_CHUNK_SIZE = 500
+
+
+class PlayerCache:
+    """
+    Bounded least recently used cache of resolved Players by Url.
+    Urls whose page has no athlete are cached as None so they are not retried.
+    """
+
+    max_size: int
+    hits: int
+    misses: int
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        """
+        Constructor.
+        Args:
+            max_size: Maximum number of entries
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Player | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, url: str) -> tuple[bool, Player | None]:
+        """
+        Looks up a Player by Url.
+        Args:
+            url: Player Url
+
+        Returns: Tuple of whether the Url was cached and the cached Player
+        """
+        with self._lock:
+            if url in self._entries:
+                self._entries.move_to_end(url)
+                self.hits += 1
+                return True, self._entries[url]
+            self.misses += 1
+            return False, None
+
+    def put(self, url: str, player: Player | None) -> None:
+        """
+        Caches the Player for the Url, evicting the least recently used entry when full.
+        Args:
+            url: Player Url
+            player: Player or None when the page has no athlete
+        """
+        with self._lock:
+            self._entries[url] = player
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class PlayerHelper:
+    """
+    Helper Class for resolving Players.
+    """
+
     maker: sessionmaker
+    cache: PlayerCache | None
+    build_workers: int
 
-    def __init__(self, maker: sessionmaker) -> None:
+    def __init__(self, maker: sessionmaker, cache: PlayerCache | None = None,
+                 build_workers: int = DEFAULT_BUILD_WORKERS) -> None:
         """
         Constructor.
         Args:
             maker: Session Maker
+            cache: Player Cache shared across helpers
+            build_workers: Maximum Players built from their pages in parallel
         """
         self.maker = maker
+        self.cache = cache
+        self.build_workers = build_workers
 
-    def resolve_player(self, url: str) -> Player:
+    def resolve_player(self, url: str, *, build: bool = True) -> Player | None:
         """
         Resolves the Player against the Database. Adds the player if they do not exist.
         Args:
             url: Player Url
+            build: Build a missing Player from their page, otherwise None is returned
 
         Returns: Player
         """
+        if self.cache is not None:
+            found, player = self.cache.lookup(url)
+            if found:
+                return player
+
         repo = PlayerRepository(self.maker)
         player = repo.get_player(url=url)
-        if player:
-            return player
-        return self.build_player(url)
+        if not player:
+            if not build:
+                return None
+            fetched, player = self.try_build_player(url)
+            if not fetched:
+                return None
+        if self.cache is not None:
+            self.cache.put(url, player)
+        return player
 
-    def build_player(self, url: str) -> Player | None:
+    def is_unresolvable(self, url: str) -> bool:
         """
-        Builds a Player from the Url Site
+        Determines if the Url is known to have no athlete, as opposed to a page that could not
+        be retrieved yet.
+        Args:
+            url: Player Url
+
+        Returns: True when the Url is cached without a Player
+        """
+        if self.cache is None:
+            return False
+        found, player = self.cache.lookup(url)
+        return found and player is None
+
+    def get_players(self, urls: list[str]) -> dict[str, Player]:
+        """
+        Retrieves the Players matching the Urls from the Database.
+        Args:
+            urls: Player Urls
+
+        Returns: Players by Url
+        """
+        players = {}
+        with self.maker() as session:
+            for index in range(0, len(urls), QUERY_CHUNK_SIZE):
+                chunk = urls[index:index + QUERY_CHUNK_SIZE]
+                for player in session.scalars(select(Player).where(Player.url.in_(chunk))):
+                    players[player.url] = player
+        return players
+
+    def resolve_players(self, urls: Iterable[str]) -> dict[str, Player | None]:
+        """
+        Resolves a set of Players with a single Database lookup, building the missing Players
+        from their pages in parallel.
+        Args:
+            urls: Player Urls
+
+        Returns: Players by Url, None for Urls that could not be resolved. Urls whose Player
+        failed to build are left out of the cache so they are retried.
+        """
+        resolved: dict[str, Player | None] = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            if not url:
+                continue
+            if self.cache is not None:
+                found, player = self.cache.lookup(url)
+                if found:
+                    resolved[url] = player
+                    continue
+            pending.append(url)
+
+        if not pending:
+            return resolved
+
+        failed = set()
+        with get_metrics().timer(PLAYERS):
+            known = self.get_players(pending)
+            missing = [url for url in pending if url not in known]
+            resolved.update(known)
+            if missing:
+                with ThreadPoolExecutor(max_workers=self.build_workers) as executor:
+                    built = executor.map(self.try_build_player, missing)
+                    for url, (fetched, player) in zip(missing, built):
+                        resolved[url] = player
+                        if not fetched:
+                            failed.add(url)
+
+        if self.cache is not None:
+            for url in pending:
+                if url not in failed:
+                    self.cache.put(url, resolved.get(url))
+        return resolved
+
+    def try_build_player(self, url: str) -> tuple[bool, Player | None]:
+        """
+        Builds a Player, logging a failure instead of raising so one Player cannot abort the
+        box score or the others built alongside it.
         Args:
             url: Site Url
 
-        Returns: Player
+        Returns: Tuple of whether the Player was built, None or not, and the Player
         """
+        try:
+            return True, self.build_player(url)
+        except ConnectionError:
+            logging.warning('FAILED TO RETRIEVE PLAYER: %s', url)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.error('FAILED TO BUILD PLAYER: %s', url, exc_info=True)
+        return False, None
 
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--ignore-certificate-errors')
+    def build_player(self, url: str) -> Player | None:
+        """
+        Builds a Player from the Url Site
+        Args:
+            url: Site Url
 
-        browser = webdriver.Chrome(options=options)
-        browser.get(url)
-        player_result: dict = browser.execute_script('return window.__espnfitt__')
-        browser.quit()
+        Returns: Player or None when the page has no athlete or position, a position missing
+        from the Database is logged and left empty
+        Raises: ConnectionError when the page could not be retrieved
+        """
 
+        get_metrics().increment('players.built')
+        with get_metrics().timer(PLAYER_BUILD):
+            player_result = get_payload_fetcher().fetch(url)
+        if player_result is None:
+            raise ConnectionError(f"Player page could not be retrieved: {url}")
         player_info = player_result.get('page', {}).get('content', {}).get('player', {}).get(
             'plyrHdr', {}).get('ath', {})
 
@@ -58,8 +238,11 @@ class PlayerHelper:
             position_code = player_info.get('posAbv')
             if position_code:
                 pos_code_repo = PositionCodeRepository(self.maker)
-                code: Position = pos_code_repo.get_position_code(code=position_code)
-                player = Player(name=player_info.get('dspNm'), url=url, position_id=code.id)
+                code: Position | None = pos_code_repo.get_position_code(code=position_code)
+                if code is None:
+                    logging.warning('UNKNOWN POSITION %s FOR PLAYER: %s', position_code, url)
+                player = Player(name=player_info.get('dspNm'), url=url,
+                                position_id=code.id if code else None)
                 player_repo = PlayerRepository(self.maker)
                 player_repo.save(player)
                 return player
@@ -0,0 +1,108 @@
+"""
+Poll Scheduler waking games at kickoff and polling each at a cadence set by its state.
+"""
+
+import heapq
+
+PHASE_PRE = 'pre'
+PHASE_IN = 'in'
+PHASE_HALFTIME = 'halftime'
+PHASE_POST = 'post'
+
+# Seconds between polls of a game by phase.
+DEFAULT_CADENCE = {
+    PHASE_PRE: 120.0,
+    PHASE_IN: 60.0,
+    PHASE_HALFTIME: 300.0,
+    PHASE_POST: 300.0,
+}
+DEFAULT_LEAD = 300.0
+DEFAULT_STABLE_POLLS = 2
+
+
+class PollScheduler:
+    """
+    Min heap of the next poll time of each game.
+    Games sleep until shortly before kickoff, are then polled at the cadence of their phase and
+    dropped once their final box score has stayed unchanged for stable_polls polls, which
+    catches the stat corrections made right after the final whistle.
+    """
+
+    cadence: dict[str, float]
+    kickoffs: dict[int, float]
+    lead: float
+    stable_polls: int
+
+    def __init__(self, cadence: dict[str, float] | None = None, *,
+                 kickoffs: dict[int, float] | None = None, lead: float = DEFAULT_LEAD,
+                 stable_polls: int = DEFAULT_STABLE_POLLS) -> None:
+        """
+        Constructor.
+        Args:
+            cadence: Seconds between polls by phase, missing phases use the defaults
+            kickoffs: Kickoff times in epoch seconds by Game ID
+            lead: Seconds before kickoff of the first poll
+            stable_polls: Unchanged final polls before a game is dropped
+        """
+        self.cadence = {**DEFAULT_CADENCE, **(cadence or {})}
+        self.kickoffs = kickoffs or {}
+        self.lead = lead
+        self.stable_polls = max(stable_polls, 1)
+        self._heap: list[tuple[float, int]] = []
+        self._stable: dict[int, int] = {}
+
+    def add(self, game_id: int, now: float) -> None:
+        """
+        Schedules the first poll of a game, right away when the kickoff is unknown or near.
+        Args:
+            game_id: Game ID
+            now: Current time in epoch seconds
+        """
+        kickoff = self.kickoffs.get(game_id)
+        due = now if kickoff is None else max(now, kickoff - self.lead)
+        heapq.heappush(self._heap, (due, game_id))
+
+    def next_due(self) -> float | None:
+        """
+        Returns the time of the earliest poll.
+
+        Returns: Epoch seconds or None when no game is scheduled
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[int]:
+        """
+        Removes and returns the games due for a poll.
+        Args:
+            now: Current time in epoch seconds
+
+        Returns: Game IDs
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def reschedule(self, game_id: int, phase: str, now: float, changed: bool) -> bool:
+        """
+        Schedules the next poll of a polled game.
+        Args:
+            game_id: Game ID
+            phase: Phase seen by the poll
+            now: Current time in epoch seconds
+            changed: The poll found changed statistics
+
+        Returns: False when the game is final and stable and was dropped
+        """
+        if phase == PHASE_POST:
+            stable = 0 if changed else self._stable.get(game_id, 0) + 1
+            if stable >= self.stable_polls:
+                self._stable.pop(game_id, None)
+                return False
+            self._stable[game_id] = stable
+        heapq.heappush(self._heap, (now + self.cadence.get(phase, self.cadence[PHASE_IN]),
+                                    game_id))
+        return True
+
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -0,0 +1,128 @@
+"""
+Adaptive Rate Limiter pacing requests with additive increase and multiplicative decrease.
+"""
+
+import threading
+import time
+from typing import Callable
+
+DEFAULT_RATE = 2.0
+DEFAULT_MIN_RATE = 0.25
+DEFAULT_MAX_RATE = 20.0
+DEFAULT_INCREASE = 0.5
+DEFAULT_DECREASE = 0.5
+
+# Status codes signalling the site is overloaded or limiting us.
+THROTTLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class AdaptiveRateLimiter:
+    """
+    Paces requests to a requests per second rate shared by every thread and task in the process.
+    Each healthy response raises the rate so it grows by about `increase` requests per second
+    every second, each throttled or failed response cuts it by the `decrease` factor. Cuts are
+    applied at most once per request interval so a burst of failures from requests already in
+    flight only counts once.
+    """
+
+    rate: float
+    min_rate: float
+    max_rate: float
+    increase: float
+    decrease: float
+
+    def __init__(self, rate: float = DEFAULT_RATE, *, min_rate: float = DEFAULT_MIN_RATE,
+                 max_rate: float = DEFAULT_MAX_RATE, increase: float = DEFAULT_INCREASE,
+                 decrease: float = DEFAULT_DECREASE,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Constructor.
+        Args:
+            rate: Initial requests per second
+            min_rate: Lowest requests per second
+            max_rate: Highest requests per second
+            increase: Requests per second added per second of healthy responses
+            decrease: Factor applied to the rate on a throttled or failed response
+            clock: Monotonic clock in seconds
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next_slot = clock()
+        self._last_decrease = float('-inf')
+
+    def reserve(self) -> float:
+        """
+        Reserves the next request slot.
+
+        Returns: Seconds to wait before sending the request
+        """
+        with self._lock:
+            now = self._clock()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + 1 / self.rate
+            return slot - now
+
+    def acquire(self) -> None:
+        """
+        Blocks until the next request slot.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def record_success(self) -> None:
+        """
+        Records a healthy response, raising the rate additively.
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def record_failure(self, retry_after: float | None = None) -> bool:
+        """
+        Records a throttled or failed response, cutting the rate multiplicatively.
+        Args:
+            retry_after: Seconds the site asked us to wait before the next request
+
+        Returns: True when the rate was cut
+        """
+        with self._lock:
+            now = self._clock()
+            if retry_after:
+                self._next_slot = max(self._next_slot, now + retry_after)
+            if now - self._last_decrease < 1 / self.rate:
+                return False
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            return True
+
+
+_DEFAULT_LIMITER: AdaptiveRateLimiter | None = None
+_DEFAULT_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """
+    Returns the process wide Rate Limiter, creating it on first use.
+    Returns: Adaptive Rate Limiter
+    """
+    global _DEFAULT_LIMITER  # pylint: disable=global-statement
+    with _DEFAULT_LIMITER_LOCK:
+        if _DEFAULT_LIMITER is None:
+            _DEFAULT_LIMITER = AdaptiveRateLimiter()
+        return _DEFAULT_LIMITER
+
+
+def set_rate_limiter(limiter: AdaptiveRateLimiter | None) -> None:
+    """
+    Replaces the process wide Rate Limiter.
+    Args:
+        limiter: Adaptive Rate Limiter or None to reset
+    """
+    global _DEFAULT_LIMITER  # pylint: disable=global-statement
+    with _DEFAULT_LIMITER_LOCK:
+        _DEFAULT_LIMITER = limiter
@@ -2,24 +2,37 @@
 Schedule Module for Converting Schedule Entries from the listing.
 """
 
+from datetime import datetime
+
+from sqlalchemy import insert
 from sqlalchemy.orm import sessionmaker
 from football_data.models import Schedule, Team
-from football_data.repositories import TeamRepository, ScheduleRepository
-from selenium import webdriver
+from football_data.repositories import TeamRepository, ScheduleRepository, TypeCodeRepository
+
+from helpers.metrics import SCHEDULE, get_metrics
+from helpers.payload import get_payload_fetcher
 
 
 class ScheduleHelper:
     """
     Helper Class for working with Schedules.
+    After preload() Teams and Schedules are resolved from maps of the week instead of one
+    query each, and new Schedules are held until flush() inserts them together.
     """
 
     maker: sessionmaker
+    teams: dict[str, Team] | None
+    schedules: dict[tuple[int, int], Schedule] | None
+    pending: list[Schedule]
 
     def __init__(self, maker: sessionmaker):
         """
         Constructor
         """
         self.maker = maker
+        self.teams = None
+        self.schedules = None
+        self.pending = []
 
     @staticmethod
     def get_schedule(week_number: int, year_value: int, type_code: str) -> dict | None:
@@ -35,16 +48,102 @@ class ScheduleHelper:
         """
         schedule_url = f"https://www.espn.com/nfl/schedule/_/week/{week_number}" \
                        + f"/year/{year_value}/seasontype/{type_code}"
+        return get_payload_fetcher().fetch(schedule_url)
+
+    @staticmethod
+    def get_kickoffs(schedule: dict) -> dict[int, float]:
+        """
+        Reads the kickoff time of every event in the Schedule payload.
+        Args:
+            schedule: Schedule payload
+
+        Returns: Kickoff times in epoch seconds by Game ID
+        """
+        events: dict = schedule.get('page', {}).get('content', {}).get('events', {})
+        kickoffs = {}
+        for day in events.values():
+            for event_item in day:
+                date = event_item.get('date', '').replace('Z', '+00:00')
+                try:
+                    kickoff = datetime.fromisoformat(date)
+                except ValueError:
+                    continue
+                kickoffs[int(event_item.get('id', 0))] = kickoff.timestamp()
+        return kickoffs
+
+    def get_games(self, year: int, week: int,
+                  type_code: str) -> dict[int, tuple[Schedule, Schedule | None]]:
+        """
+        Retrieves the home Schedule entries for the week paired with the away Schedule.
+        Args:
+            year: Year Value
+            week: Week Number
+            type_code: Type Code (1,2,3)
+
+        Returns: Home and Away Schedules by Game ID
+        """
+        type_item = TypeCodeRepository(self.maker).get_type_code(code=type_code)
+        if not type_item:
+            return {}
+
+        repo = ScheduleRepository(self.maker)
+        with get_metrics().timer(SCHEDULE):
+            schedules = [schedule for schedule in repo.get_schedules(year=year, week=week)
+                         if schedule.type_id == type_item.id]
+        by_team = {(schedule.game_id, schedule.team_id): schedule for schedule in schedules}
+
+        games = {}
+        for schedule in schedules:
+            if schedule.is_home is True:
+                games[schedule.game_id] = (
+                    schedule, by_team.get((schedule.game_id, schedule.opponent_id)))
+        return games
+
+    def preload(self, year: int, week: int) -> None:
+        """
+        Loads every Team and the Schedules of the week in one query each.
+        Args:
+            year: Year Value
+            week: Week Number
+        """
+        self.teams = {team.code: team for team in TeamRepository(self.maker).get_teams()}
+        self.schedules = {(schedule.game_id, schedule.team_id): schedule for schedule
+                          in ScheduleRepository(self.maker).get_schedules(year=year, week=week)}
+        self.pending = []
+
+    def flush(self) -> None:
+        """
+        Inserts the Schedules created since the preload with one multi row insert and reads
+        back their IDs.
+        """
+        if not self.pending:
+            return
+        columns = [column.name for column in Schedule.__table__.columns if column.name != 'id']
+        with self.maker() as session:
+            session.execute(insert(Schedule.__table__),
+                            [{column: getattr(schedule, column) for column in columns}
+                             for schedule in self.pending])
+            session.commit()
+
+        for year, week in {(item.year_value, item.week_number) for item in self.pending}:
+            ids = {(schedule.game_id, schedule.team_id): schedule.id for schedule
+                   in ScheduleRepository(self.maker).get_schedules(year=year, week=week)}
+            for schedule in self.pending:
+                if (schedule.year_value, schedule.week_number) == (year, week):
+                    schedule.id = ids.get((schedule.game_id, schedule.team_id))
+        self.pending = []
 
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--ignore-certificate-errors')
+    def get_team(self, team_code: str) -> Team | None:
+        """
+        Retrieves a Team by code from the preloaded map or the Database.
+        Args:
+            team_code: Team Code
 
-        browser = webdriver.Chrome(options=options)
-        browser.get(schedule_url)
-        schedule_result: dict = browser.execute_script('return window.__espnfitt__')
-        browser.quit()
-        return schedule_result
+        Returns: Team
+        """
+        if self.teams is not None:
+            return self.teams.get(team_code)
+        return TeamRepository(self.maker).get_team(code=team_code)
 
     def resolve_teams(self, event_item: dict) -> dict:
         """
@@ -59,12 +158,13 @@ class ScheduleHelper:
         for team in teams:
             team_code = team.get('abbrev')
             if team_code:
-                repo = TeamRepository(self.maker)
-                team_item = repo.get_team(code=team_code)
+                team_item = self.get_team(team_code)
                 if not team_item:
                     team_item = Team(code=team_code, name=team.get('displayName'),
                                      url=team.get('links'))
-                    repo.save(team_item)
+                    TeamRepository(self.maker).save(team_item)
+                    if self.teams is not None:
+                        self.teams[team_code] = team_item
                 if team.get('isHome', False) is True:
                     result['home_team'] = team_item
                 else:
@@ -89,13 +189,20 @@ class ScheduleHelper:
         Returns: Schedule
         """
 
-        repo = ScheduleRepository(self.maker)
-        schedule = repo.get_schedule(team_id=team_id, game_id=game_id)
+        if self.schedules is not None:
+            schedule = self.schedules.get((game_id, team_id))
+        else:
+            schedule = ScheduleRepository(self.maker).get_schedule(team_id=team_id,
+                                                                   game_id=game_id)
         if not schedule:
             schedule = Schedule(team_id=team_id, opponent_id=opponent_id, game_id=game_id,
                                 week_number=week, year_value=year, url=url, type_id=type_id,
                                 is_home=is_home)
-            repo.save(schedule)
+            if self.schedules is not None:
+                self.schedules[(game_id, team_id)] = schedule
+                self.pending.append(schedule)
+            else:
+                ScheduleRepository(self.maker).save(schedule)
         return schedule
 
     def convert_event(self, event_item: dict, type_id: int, week: int, year: int) -> list[Schedule]:
@@ -120,7 +227,35 @@ class ScheduleHelper:
             home_schedule = self.resolve_schedule(home_team.id, away_team.id, game_id, year, week,
                                                   url, True, type_id)
             away_schedule = self.resolve_schedule(away_team.id, home_team.id, game_id, year, week,
-                                                  url, True, type_id)
+                                                  url, False, type_id)
             schedules.append(home_schedule)
             schedules.append(away_schedule)
         return schedules
+
+    def convert_schedule(self, schedule: dict, type_id: int, week: int,
+                         year: int) -> list[Schedule]:
+        """
+        Converts every event in the Schedule payload to schedule items, resolving the Teams and
+        Schedules from a preload of the week and inserting the new Schedules together.
+        Args:
+            schedule: Schedule payload
+            type_id: Schedule Type
+            week: Week Number
+            year: Year value
+
+        Returns: List of Schedule
+        """
+        events: dict = schedule.get('page', {}).get('content', {}).get('events', {})
+        schedules = []
+        with get_metrics().timer(SCHEDULE):
+            self.preload(year, week)
+            try:
+                for day in events.values():
+                    for event_item in day:
+                        schedules.extend(self.convert_event(event_item, type_id, week, year))
+                self.flush()
+            finally:
+                self.teams = None
+                self.schedules = None
+                self.pending = []
+        return schedules
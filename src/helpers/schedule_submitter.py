@@ -0,0 +1,109 @@
+"""
+Submits Schedule entries to the web service in batches over the pooled HTTP Client.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import requests
+
+from helpers.http_client import HttpClient, get_http_client
+from helpers.metrics import get_metrics
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_WORKERS = 4
+DEFAULT_ATTEMPTS = 3
+
+
+def chunk_entries(entries: list[dict], size: int) -> Iterator[list[dict]]:
+    """
+    Splits the entries into chunks.
+    Args:
+        entries: Schedule entries
+        size: Entries per chunk
+
+    Returns: Chunks of entries
+    """
+    for start in range(0, len(entries), size):
+        yield entries[start:start + size]
+
+
+class ScheduleSubmitter:
+    """
+    Posts Schedule entries as JSON arrays to the batch endpoint of the web service.
+    Chunks are sent concurrently so their round trips overlap, reusing the keep-alive
+    connections of the client. The endpoint answers a chunk with the gameIds it could not
+    store under "failed"; only those entries, or every entry of a chunk that was rejected as a
+    whole, are submitted again.
+    """
+
+    url: str
+    batch_size: int
+    workers: int
+    attempts: int
+    client: HttpClient
+
+    def __init__(self, url: str, *, batch_size: int = DEFAULT_BATCH_SIZE,
+                 workers: int = DEFAULT_WORKERS, attempts: int = DEFAULT_ATTEMPTS,
+                 client: HttpClient | None = None) -> None:
+        """
+        Constructor.
+        Args:
+            url: Batch endpoint Url
+            batch_size: Entries per request
+            workers: Requests in flight at once
+            attempts: Rounds of submission before giving up on an entry
+            client: HTTP Client, defaults to the process wide client
+        """
+        self.url = url
+        self.batch_size = max(batch_size, 1)
+        self.workers = max(workers, 1)
+        self.attempts = max(attempts, 1)
+        self.client = client if client is not None else get_http_client()
+
+    def post_chunk(self, chunk: list[dict]) -> list[dict]:
+        """
+        Posts a chunk of entries.
+        Args:
+            chunk: Schedule entries
+
+        Returns: Entries that failed to store
+        """
+        try:
+            response = self.client.post(self.url, json=chunk)
+        except requests.RequestException as error:
+            logging.warning('SCHEDULE BATCH FAILED TO POST: %s', error)
+            return chunk
+        if response.status_code != 200:
+            logging.warning('SCHEDULE BATCH FAILED TO POST: %s', response.status_code)
+            return chunk
+        try:
+            failed = set(response.json().get('failed', []))
+        except (ValueError, AttributeError):
+            failed = set()
+        return [entry for entry in chunk if entry.get('gameId') in failed]
+
+    def submit(self, entries: list[dict]) -> list[dict]:
+        """
+        Submits the entries, resubmitting the failed ones.
+        Args:
+            entries: Schedule entries
+
+        Returns: Entries that still failed after every attempt
+        """
+        metrics = get_metrics()
+        pending = entries
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for attempt in range(self.attempts):
+                if not pending:
+                    break
+                if attempt:
+                    logging.info('RESUBMITTING %d FAILED SCHEDULE ENTRIES', len(pending))
+                    metrics.increment('schedule.resubmitted', len(pending))
+                chunks = list(chunk_entries(pending, self.batch_size))
+                metrics.increment('schedule.batches', len(chunks))
+                pending = [entry for failed in executor.map(self.post_chunk, chunks)
+                           for entry in failed]
+        metrics.increment('schedule.submitted', len(entries) - len(pending))
+        return pending
@@ -0,0 +1,115 @@
+"""
+Column oriented batch of Statistics.
+"""
+
+from array import array
+from typing import Iterable, Iterator
+
+from football_data.models import Statistic
+
+# Player and Team IDs start at 1, so 0 marks a missing ID in the integer columns.
+MISSING_ID = 0
+
+
+class StatBatch:
+    """
+    Statistics held in parallel typed arrays instead of one ORM object per value.
+    Statistic objects are only created when the batch is iterated, rows for bulk inserts are
+    read straight from the columns.
+    """
+
+    statistic_code_id: array
+    schedule_id: array
+    value: array
+    category_id: array
+    player_id: array
+    team_id: array
+
+    def __init__(self) -> None:
+        """
+        Constructor.
+        """
+        self.statistic_code_id = array('q')
+        self.schedule_id = array('q')
+        self.value = array('d')
+        self.category_id = array('q')
+        self.player_id = array('q')
+        self.team_id = array('q')
+
+    @staticmethod
+    def from_statistics(stats: Iterable[Statistic]) -> 'StatBatch':
+        """
+        Builds a batch from Statistic objects.
+        Args:
+            stats: Statistics
+
+        Returns: Stat Batch
+        """
+        batch = StatBatch()
+        for stat in stats:
+            batch.append(stat.statistic_code_id, stat.schedule_id, stat.value, stat.category_id,
+                         player_id=stat.player_id, team_id=stat.team_id)
+        return batch
+
+    def append(self, statistic_code_id: int, schedule_id: int, value: float, category_id: int, *,
+               player_id: int | None = None, team_id: int | None = None) -> None:
+        """
+        Appends a Statistic to the batch.
+        Args:
+            statistic_code_id: Statistic Code ID
+            schedule_id: Schedule ID
+            value: Statistic Value
+            category_id: Statistic Category ID
+            player_id: Player ID for player statistics
+            team_id: Team ID for team statistics
+        """
+        self.statistic_code_id.append(statistic_code_id)
+        self.schedule_id.append(schedule_id)
+        self.value.append(value)
+        self.category_id.append(category_id)
+        self.player_id.append(player_id or MISSING_ID)
+        self.team_id.append(team_id or MISSING_ID)
+
+    def extend(self, other: 'StatBatch') -> None:
+        """
+        Appends every Statistic of another batch.
+        Args:
+            other: Stat Batch
+        """
+        self.statistic_code_id.extend(other.statistic_code_id)
+        self.schedule_id.extend(other.schedule_id)
+        self.value.extend(other.value)
+        self.category_id.extend(other.category_id)
+        self.player_id.extend(other.player_id)
+        self.team_id.extend(other.team_id)
+
+    def rows(self) -> Iterator[dict]:
+        """
+        Yields the column values of each Statistic for Core inserts.
+
+        Returns: Column Values
+        """
+        for code_id, schedule_id, value, category_id, player_id, team_id in zip(
+                self.statistic_code_id, self.schedule_id, self.value, self.category_id,
+                self.player_id, self.team_id):
+            yield {'statistic_code_id': code_id,
+                   'schedule_id': schedule_id,
+                   'value': value,
+                   'category_id': category_id,
+                   'player_id': player_id or None,
+                   'team_id': team_id or None}
+
+    def to_statistics(self) -> list[Statistic]:
+        """
+        Converts the batch to Statistic objects.
+
+        Returns: List of Statistics
+        """
+        return list(self)
+
+    def __iter__(self) -> Iterator[Statistic]:
+        for row in self.rows():
+            yield Statistic(**row)
+
+    def __len__(self) -> int:
+        return len(self.statistic_code_id)
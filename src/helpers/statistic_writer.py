@@ -0,0 +1,266 @@
+"""
+Statistic Writer for persisting Statistics in bulk.
+"""
+
+import csv
+import io
+import logging
+from itertools import chain, islice
+from typing import Iterable, Iterator
+
+from football_data.models import Statistic
+from sqlalchemy import Connection, Index, delete, func, insert, literal_column, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex
+
+from helpers.metrics import PERSIST, get_metrics
+from helpers.stat_batch import StatBatch
+
+DEFAULT_CHUNK_SIZE = 1000
+STATISTIC_COLUMNS = ('statistic_code_id', 'schedule_id', 'value', 'category_id', 'player_id',
+                     'team_id')
+COPY_DRIVERS = ('psycopg2', 'psycopg')
+
+# Statistics, a Stat Batch or a stream of Stat Batches.
+StatisticStream = Iterable[Statistic | StatBatch] | StatBatch
+
+# A Statistic is unique per game schedule, player or team, code and category. The index is
+# attached to the statistics table so new databases create it with the table. Literal zeros keep
+# the expressions identical to the index for ON CONFLICT inference.
+NATURAL_KEY_INDEX = Index('ux_statistics_natural_key',
+                          Statistic.schedule_id,
+                          func.coalesce(Statistic.player_id, literal_column('0')),
+                          func.coalesce(Statistic.team_id, literal_column('0')),
+                          Statistic.statistic_code_id,
+                          Statistic.category_id,
+                          unique=True)
+
+
+def migrate_statistics(connection: Connection) -> int:
+    """
+    Removes duplicate Statistics, keeping the latest row of each natural key, and creates the
+    natural key index. Databases loaded before the index existed may hold duplicates, which
+    the index cannot be created over. Run once per schema version by the schema bootstrap.
+    Args:
+        connection: Database Connection in a transaction
+
+    Returns: Number of duplicate Statistics removed
+    """
+    table = Statistic.__table__
+    latest = select(func.max(table.c.id)).group_by(*NATURAL_KEY_INDEX.expressions)
+    removed = connection.execute(delete(table).where(table.c.id.not_in(latest))).rowcount
+    if removed:
+        logging.info('REMOVED %s DUPLICATE STATISTICS', removed)
+    # Expression indexes are not reflected on every dialect, so rely on IF NOT EXISTS.
+    connection.execute(CreateIndex(NATURAL_KEY_INDEX, if_not_exists=True))
+    return removed
+
+
+def to_row(stat: Statistic) -> dict:
+    """
+    Converts a Statistic to a column dictionary for Core inserts.
+    Args:
+        stat: Statistic
+
+    Returns: Column Values
+    """
+    return {column: getattr(stat, column) for column in STATISTIC_COLUMNS}
+
+
+def get_natural_key(row: dict) -> tuple:
+    """
+    Returns the natural key of a Statistic row.
+    Args:
+        row: Column Values
+
+    Returns: Schedule, Player, Team, Statistic Code and Category
+    """
+    return (row['schedule_id'], row['player_id'] or 0, row['team_id'] or 0,
+            row['statistic_code_id'], row['category_id'])
+
+
+def iter_rows(stats: StatisticStream) -> Iterator[dict]:
+    """
+    Converts the Statistics to rows. Stat Batches are read from their columns without
+    creating Statistic objects, so a stream of batches can be mixed with Statistics.
+    Args:
+        stats: Statistics, a Stat Batch or a stream of Stat Batches
+
+    Returns: Column Values
+    """
+    if isinstance(stats, StatBatch):
+        return stats.rows()
+    return chain.from_iterable(
+        stat.rows() if isinstance(stat, StatBatch) else (to_row(stat),) for stat in stats)
+
+
+def chunk_rows(stats: StatisticStream, chunk_size: int) -> Iterator[list[dict]]:
+    """
+    Converts the Statistics to rows in chunks.
+    Args:
+        stats: Statistics, a Stat Batch or a stream of Stat Batches
+        chunk_size: Rows per chunk
+
+    Returns: Chunks of Column Values
+    """
+    rows = iter_rows(stats)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class StatisticWriter:
+    """
+    Writes Statistics with multi row inserts, using COPY on PostgreSQL.
+    Each call to write or upsert runs in a single transaction.
+    """
+
+    maker: sessionmaker
+    chunk_size: int
+    use_copy: bool
+
+    def __init__(self, maker: sessionmaker, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 use_copy: bool = True) -> None:
+        """
+        Constructor.
+        Args:
+            maker: Session Maker
+            chunk_size: Rows sent per statement
+            use_copy: Use COPY when the database driver supports it
+        """
+        self.maker = maker
+        self.chunk_size = chunk_size
+        self.use_copy = use_copy
+
+    def supports_copy(self, connection: Connection) -> bool:
+        """
+        Determines if COPY can be used on the connection.
+        Args:
+            connection: Database Connection
+
+        Returns: True for PostgreSQL psycopg connections
+        """
+        dialect = connection.dialect
+        return self.use_copy and dialect.name == 'postgresql' and dialect.driver in COPY_DRIVERS
+
+    def write(self, stats: StatisticStream) -> int:
+        """
+        Writes the Statistics in a single transaction.
+        Args:
+            stats: Statistics or Stat Batch
+
+        Returns: Number of Statistics written
+        """
+        with self.maker() as session:
+            with session.begin():
+                connection = session.connection()
+                if self.supports_copy(connection):
+                    return self.copy_rows(connection, stats)
+                return self.insert_rows(connection, stats)
+
+    def insert_rows(self, connection: Connection, stats: StatisticStream) -> int:
+        """
+        Inserts the Statistics with executemany in chunks.
+        Args:
+            connection: Database Connection
+            stats: Statistics or Stat Batch
+
+        Returns: Number of Statistics written
+        """
+        count = 0
+        statement = insert(Statistic.__table__)
+        metrics = get_metrics()
+        for chunk in chunk_rows(stats, self.chunk_size):
+            with metrics.timer(PERSIST):
+                connection.execute(statement, chunk)
+            count += len(chunk)
+        metrics.increment('statistics.written', count)
+        return count
+
+    def copy_rows(self, connection: Connection, stats: StatisticStream) -> int:
+        """
+        Streams the Statistics to PostgreSQL with COPY in chunks.
+        Args:
+            connection: Database Connection
+            stats: Statistics or Stat Batch
+
+        Returns: Number of Statistics written
+        """
+        table = Statistic.__table__.name
+        sql = f"COPY {table} ({', '.join(STATISTIC_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+        driver_connection = connection.connection.driver_connection
+        count = 0
+        metrics = get_metrics()
+        with driver_connection.cursor() as cursor:
+            for chunk in chunk_rows(stats, self.chunk_size):
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in chunk:
+                    writer.writerow(['' if row[column] is None else row[column]
+                                     for column in STATISTIC_COLUMNS])
+                buffer.seek(0)
+                with metrics.timer(PERSIST):
+                    if connection.dialect.driver == 'psycopg2':
+                        cursor.copy_expert(sql, buffer)
+                    else:
+                        with cursor.copy(sql) as copy:
+                            copy.write(buffer.getvalue())
+                count += len(chunk)
+        metrics.increment('statistics.written', count)
+        return count
+
+    def create_index(self) -> None:
+        """
+        Removes duplicate Statistics and creates the unique natural key index used by upserts
+        when it does not exist. The schema bootstrap already does this once per database.
+        """
+        with self.maker() as session:
+            with session.begin():
+                migrate_statistics(session.connection())
+
+    def upsert(self, stats: StatisticStream) -> int:
+        """
+        Inserts the Statistics, replacing the value of existing Statistics with the same
+        schedule, player or team, code and category, in a single transaction.
+        Args:
+            stats: Statistics or Stat Batch
+
+        Returns: Number of Statistics written
+        """
+        with self.maker() as session:
+            with session.begin():
+                connection = session.connection()
+                statement = self.build_upsert(connection.dialect.name)
+                count = 0
+                metrics = get_metrics()
+                for chunk in chunk_rows(stats, self.chunk_size):
+                    # Rows sharing a key in one statement conflict with each other, keep the last.
+                    rows = list({get_natural_key(row): row for row in chunk}.values())
+                    with metrics.timer(PERSIST):
+                        connection.execute(statement, rows)
+                    count += len(rows)
+                metrics.increment('statistics.written', count)
+                return count
+
+    @staticmethod
+    def build_upsert(dialect_name: str):
+        """
+        Builds the upsert statement for the database dialect.
+        Args:
+            dialect_name: Dialect Name
+
+        Returns: Insert Statement
+        Raises: ValueError when the dialect has no upsert
+        """
+        table = Statistic.__table__
+        if dialect_name == 'postgresql':
+            statement = postgresql.insert(table)
+            return statement.on_conflict_do_update(
+                index_elements=list(NATURAL_KEY_INDEX.expressions),
+                set_={'value': statement.excluded.value})
+        if dialect_name == 'sqlite':
+            return insert(table).prefix_with('OR REPLACE')
+        raise ValueError(f"Upsert is not supported for {dialect_name}")
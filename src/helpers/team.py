@@ -3,9 +3,14 @@ Team Helper Class for retrieving statistics.
 """
 
 from sqlalchemy.orm import sessionmaker
-from football_data.models import StatisticCode, Statistic, StatisticCategory
+from football_data.models import StatisticCode, Statistic, StatisticCategory, Schedule
 from football_data.repositories import StatisticCodeRepository, StatisticCategoryRepository
-from selenium import webdriver
+
+from helpers.codes import StatisticCodeIndex
+from helpers.payload import get_payload_fetcher
+from helpers.stat_batch import StatBatch
+
+TEAM_GROUPING = 'team'
 
 
 class MatchUpHelper:
@@ -14,6 +19,7 @@ class MatchUpHelper:
     """
     maker: sessionmaker
     codes: list[StatisticCode]
+    code_index: StatisticCodeIndex
     category: StatisticCategory
     translations: dict
 
@@ -22,7 +28,8 @@ class MatchUpHelper:
 
         cat_repo = StatisticCategoryRepository(maker)
         code_repo = StatisticCodeRepository(maker)
-        self.codes = code_repo.get_statistic_codes(grouping='team')
+        self.codes = code_repo.get_statistic_codes(grouping=TEAM_GROUPING)
+        self.code_index = StatisticCodeIndex(self.codes)
         self.category = cat_repo.get_statistic_category(code='T')
         self.translations = {
             'completionAttempts': ['PC', 'PA'],
@@ -50,22 +57,17 @@ class MatchUpHelper:
         }
 
     @staticmethod
-    def get_match_up(game_id: str) -> dict | None:
+    def get_match_up(game_id: str, *, refresh: bool = False) -> dict | None:
         """
         Retrieves the Match up data.
         Args:
             game_id: Game Id
+            refresh: Retrieve the page instead of reading the cached payload
 
         Returns: Match Up Data Dictionary
         """
         url = f"https://www.espn.com/nfl/matchup/_/gameId/{game_id}"
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--ignore-certificate-errors')
-
-        browser = webdriver.Chrome(options=options)
-        browser.get(url)
-        return browser.execute_script('return window.__espnfitt__')
+        return get_payload_fetcher().fetch(url, refresh=refresh)
 
     @staticmethod
     def convert_value(value: str) -> float:
@@ -90,13 +92,7 @@ class MatchUpHelper:
 
         Returns: Statistic Code
         """
-
-        result = list(
-            filter(lambda x:
-                   str(x.code).upper() == code.upper(), self.codes))
-        if result:
-            return result[0]
-        return None
+        return self.code_index.get(TEAM_GROUPING, code)
 
     def build_statistic(self, values: dict, code: str, team_id: int,
                         schedule_id: int) -> Statistic | None:
@@ -119,57 +115,79 @@ class MatchUpHelper:
                          statistic_code_id=code_value.id, value=entry_value)
 
     def build_split_statistic(self, values: dict, codes: list[str], team_id: int,
-                              schedule_id: int) -> list[Statistic]:
+                              schedule_id: int, batch: StatBatch | None = None) -> StatBatch:
         """
-        Creates a list of Statistics from a stat value needing split.
+        Creates the Statistics from a stat value needing split.
         Args:
             values: statistic value entry
             codes: Codes in order of split
             team_id: Team ID
             schedule_id: Schedule ID
+            batch: Stat Batch to append to, one is created when not provided
 
-        Returns:
-
+        Returns: Stat Batch
         """
+        batch = batch if batch is not None else StatBatch()
         entry_value = values.get('d', '')
         if not entry_value:
-            return []
+            return batch
 
         split_values = entry_value.split('-')
         if len(split_values) != len(codes):
-            return []
+            return batch
 
-        stats = []
         for split_value in split_values:
             code_item = self.get_statistic_code(codes[split_values.index(split_value)])
             if code_item:
-                stats.append(Statistic(team_id=team_id, schedule_id=schedule_id,
-                                       statistic_code_id=code_item.id,
-                                       value=self.convert_value(split_value),
-                                       category_id=self.category.id))
+                batch.append(code_item.id, schedule_id, self.convert_value(split_value),
+                             self.category.id, team_id=team_id)
 
-        return stats
+        return batch
 
-    def generate_stats(self, team_id: int, schedule_id: int, entries: dict) -> list[Statistic]:
+    def generate_stats(self, team_id: int, schedule_id: int, entries: dict,
+                       batch: StatBatch | None = None) -> StatBatch:
         """
         Generates the Statistic entries for provided team and schedule id
         Args:
             team_id: Team Id
             schedule_id: Schedule id
             entries: Stats entries
+            batch: Stat Batch to append to, one is created when not provided
 
-        Returns: List of statistics
+        Returns: Stat Batch
         """
-        stats = []
+        batch = batch if batch is not None else StatBatch()
         for key in entries:
             translation = self.translations.get(key, [])
             values = dict(entries[key])
             if len(translation) > 1:
-                stats.extend(self.build_split_statistic(values, translation, team_id, schedule_id))
-            else:
-                if len(translation) == 1:
-                    stat = self.build_statistic(values, translation[0], team_id, schedule_id)
-                    if stat:
-                        stats.append(stat)
-
-        return stats
+                self.build_split_statistic(values, translation, team_id, schedule_id, batch)
+            elif len(translation) == 1:
+                code_value = self.get_statistic_code(translation[0])
+                if code_value:
+                    batch.append(code_value.id, schedule_id,
+                                 self.convert_value(values.get('d', '')), self.category.id,
+                                 team_id=team_id)
+
+        return batch
+
+    def build_statistics(self, match_up: dict, schedule: Schedule,
+                         opponent_schedule: Schedule | None) -> StatBatch:
+        """
+        Generates the Statistic entries for both teams from the Match up payload.
+        Args:
+            match_up: Match Up payload
+            schedule: Home team Schedule
+            opponent_schedule: Away team Schedule, the home Schedule is used when not present
+
+        Returns: Stat Batch
+        """
+        team_stats = match_up.get('page', {}).get('content', {}).get('gamepackage', {}).get(
+            'tmStats', {})
+        opponent_schedule_id = opponent_schedule.id if opponent_schedule else schedule.id
+
+        batch = self.generate_stats(schedule.team_id, schedule.id,
+                                    team_stats.get('home', {}).get('s', {}))
+        self.generate_stats(schedule.opponent_id, opponent_schedule_id,
+                            team_stats.get('away', {}).get('s', {}), batch)
+        return batch
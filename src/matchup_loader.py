@@ -4,26 +4,26 @@ Script for loading matchup statistics.
 
 import argparse
 import logging
-from urllib.parse import urljoin
-import requests
-from pyquery import PyQuery
-from sqlalchemy import create_engine, URL
 from sqlalchemy.orm import sessionmaker
 
-from football_data.models import Team, StatisticCode, StatisticCategory, Statistic, Schedule, \
-    TypeCode
-from football_data.repositories import TeamRepository, StatisticRepository, StatisticCodeRepository, \
-    StatisticCategoryRepository, ScheduleRepository, TypeCodeRepository
+from football_data.models import Schedule
 
-from helpers.box_score import BoxscoreHelper
-from helpers.team import MatchupHelper
+from helpers.cache import PayloadCache
+from helpers.database import DEFAULT_POOL_SIZE, DbHelper
+from helpers.fetch_engine import MATCHUP, FetchEngine, FetchResult, hash_payload
+from helpers.journal import LoadJournal
+from helpers.metrics import BUILD, Metrics, get_metrics
+from helpers.payload import PayloadFetcher, set_payload_fetcher
+from helpers.rate_limit import AdaptiveRateLimiter, set_rate_limiter
+from helpers.schedule import ScheduleHelper
+from helpers.statistic_writer import StatisticWriter
+from helpers.team import MatchUpHelper
 
 logging.basicConfig(level=logging.INFO)
 
-API_BASE_URL = 'http://k3-main:30082'
 
-
-def build_maker(server: str, database: str, user: str, password: str) -> sessionmaker:
+def build_maker(server: str, database: str, user: str, password: str, *,
+                pool_size: int = DEFAULT_POOL_SIZE) -> sessionmaker:
     """
     Creates a Session Maker for the Stats DB.
     Args:
@@ -31,61 +31,31 @@ def build_maker(server: str, database: str, user: str, password: str) -> session
         database: Database
         user: User
         password: Password
+        pool_size: Connections kept open
 
     Returns: Session Maker
     """
-
-    url = URL.create('postgresql', username=user, password=password, host=server, database=database)
-    engine = create_engine(url)
-    Team.metadata.create_all(bind=engine)
-    Statistic.metadata.create_all(bind=engine)
-    Schedule.metadata.create_all(bind=engine)
-    StatisticCategory.metadata.create_all(bind=engine)
-    StatisticCode.metadata.create_all(bind=engine)
-    TypeCode.metadata.create_all(bind=engine)
-    return sessionmaker(bind=engine, expire_on_commit=False)
+    return DbHelper.create_session_maker(server, database, user, password, pool_size=pool_size)
 
 
-def get_schedules(maker: sessionmaker, year: int, week: int, type_code: str) -> list[Schedule]:
+def load_matchup(helper: MatchUpHelper, writer: StatisticWriter, match_up: dict,
+                 schedule: Schedule, opponent_schedule: Schedule | None) -> int:
     """
-    Retrieves a listing of Schedule items from the API.
+    Builds and saves the team statistics for a game's match up.
 
     Args:
-        maker (sessionmaker): Session Maer
-        year (int): year value
-        week (int): week value
-        type_code (str): type code
+        helper (MatchUpHelper): Match Up Helper
+        writer (StatisticWriter): Statistic Writer
+        match_up (dict): Match Up payload
+        schedule (Schedule): Home Schedule
+        opponent_schedule (Schedule): Away Schedule
 
     Returns:
-        list: list of Schedules
-    """
-
-    repo = ScheduleRepository(maker)
-    schedules = repo.get_schedules(year=year, week=week)
-
-    type_repo = TypeCodeRepository(maker)
-    type_code = type_repo.get_type_code(code=type_code)
-
-    return list(filter(lambda x: x.type_id == type_code.id, schedules))
-
-
-def get_matchup_page(game_id: str) -> str | None:
+        int: Number of statistics saved
     """
-    Retrieves the Stat page from the Web
-
-    Args:
-        game_id (str): Game Id to retrieve
-
-    Returns:
-        str: Boxscore page html
-    """
-
-    url = 'https://www.espn.com/nfl/matchup/_/gameId/' + str(game_id)
-    response = requests.get(url)
-
-    if response.status_code == 200:
-        return response.text
-    return None
+    with get_metrics().timer(BUILD):
+        stats = helper.build_statistics(match_up, schedule, opponent_schedule)
+    return writer.upsert(stats)
 
 
 def main(arguments: dict) -> None:
@@ -101,32 +71,54 @@ def main(arguments: dict) -> None:
     db_password = arguments.get('password', '')
     db_server = arguments.get('server', '')
     database = arguments.get('database', '')
-    year_value = int(arguments.get('year', 0))
-    week_number = int(arguments.get('week', 0))
-    type_code = arguments.get('type', '')
-
-    maker = build_maker(db_server, database, db_user, db_password)
-
-    schedules = get_schedules(maker, year_value, week_number, type_code)
-    stat_helper = BoxscoreHelper(API_BASE_URL)
-
-    for schedule in schedules:
-        if schedule.is_home is True:
-            logging.info('PULLING MATCHUP STATS FOR GAMEID: %s', schedule.game_id)
-            stat_page_html = get_matchup_page(schedule.game_id)
-            if stat_page_html:
-                # COMPILE AND LOAD STATS
-                matchup_helper = MatchupHelper(stat_page_html, API_BASE_URL)
-                logging.info('LOADING MATCHUP STATS FOR GAME: %s', schedule.game_id)
-                stats = matchup_helper.build_team_stats(schedule.team_id, schedule.opponent_id,
-                                                        schedule.game_id)
-                if stats:
-                    logging.info('SENDING STATS TO API')
-                    stat_helper.add_statistic(stats)
-                    logging.info('FINISHED SENDING STATS TO API')
-                else:
-                    logging.warning('NO STATS FOUND FOR GAME: %s', schedule.game_id)
-                logging.info('FINISHED LOADING STATS FOR GAME ID: %s', schedule.game_id)
+    cache_dir = arguments.get('cache_dir')
+
+    maker = build_maker(db_server, database, db_user, db_password,
+                        pool_size=int(arguments.get('pool_size') or DEFAULT_POOL_SIZE))
+    set_payload_fetcher(PayloadFetcher(cache=PayloadCache(cache_dir) if cache_dir else None))
+    set_rate_limiter(AdaptiveRateLimiter(float(arguments.get('rate') or 2),
+                                         max_rate=float(arguments.get('max_rate') or 20)))
+
+    games = ScheduleHelper(maker).get_games(int(arguments.get('year', 0)),
+                                            int(arguments.get('week', 0)),
+                                            str(arguments.get('type', '')))
+    matchup_helper = MatchUpHelper(maker)
+    writer = StatisticWriter(maker)
+    journal = LoadJournal(arguments['journal']) if arguments.get('journal') else None
+    refresh = bool(arguments.get('refresh'))
+    game_ids = journal.get_pending(MATCHUP, games) if journal and not refresh else list(games)
+    if journal:
+        logging.info('SKIPPING %s COMPLETED GAMES', len(games) - len(game_ids))
+
+    def process(result: FetchResult) -> None:
+        if not result.payload:
+            logging.warning('NO MATCHUP FOUND FOR GAME: %s', result.game_id)
+            return
+        digest = hash_payload(result.payload, MATCHUP)
+        if journal and journal.is_unchanged(MATCHUP, result.game_id, digest):
+            logging.info('SKIPPING UNCHANGED MATCHUP FOR GAME: %s', result.game_id)
+            get_metrics().increment('games.unchanged')
+            return
+        schedule, opponent_schedule = games[result.game_id]
+        logging.info('LOADING MATCHUP STATS FOR GAME: %s', result.game_id)
+        with Metrics.game(result.game_id):
+            count = load_matchup(matchup_helper, writer, result.payload, schedule,
+                                 opponent_schedule)
+        if not count:
+            logging.warning('NO STATS FOUND FOR GAME: %s', result.game_id)
+        elif journal:
+            journal.mark_complete(MATCHUP, result.game_id, count)
+            journal.record_hash(MATCHUP, result.game_id, digest)
+        logging.info('FINISHED LOADING STATS FOR GAME ID: %s', result.game_id)
+
+    logging.info('PULLING MATCHUP STATS FOR %s GAMES', len(game_ids))
+    engine = FetchEngine(max_per_host=int(arguments.get('concurrency') or 4),
+                         timeout=float(arguments.get('timeout') or 90), refresh=refresh)
+    engine.run(game_ids, [MATCHUP], process)
+    if journal:
+        journal.close()
+    if arguments.get('metrics_dir'):
+        get_metrics().export(arguments['metrics_dir'])
     logging.info('DONE')
 
 
@@ -139,6 +131,21 @@ if __name__ == '__main__':
     parser.add_argument('-d', '--database', type=str, help='Database Name')
     parser.add_argument('-u', '--user', type=str, help='Username')
     parser.add_argument('-p', '--password', type=str, help='Password')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                        help='Database connections kept open')
+    parser.add_argument('-c', '--cache-dir', type=str, help='Payload Cache Directory')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Concurrent page requests per host')
+    parser.add_argument('--timeout', type=float, default=90, help='Seconds allowed per page')
+    parser.add_argument('-j', '--journal', type=str,
+                        help='Load Journal File used to resume interrupted loads')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Reload completed games, skipping those with unchanged payloads')
+    parser.add_argument('--rate', type=float, default=2,
+                        help='Initial requests per second, adjusted to the responses')
+    parser.add_argument('--max-rate', type=float, default=20, help='Maximum requests per second')
+    parser.add_argument('-m', '--metrics-dir', type=str,
+                        help='Directory for the metrics.json and metrics.prom summaries')
 
     args = parser.parse_args()
 
@@ -148,6 +155,15 @@ if __name__ == '__main__':
         'type': args.type,
         'user_name': args.user,
         'password': args.password,
+        'pool_size': args.pool_size,
         'server': args.server,
-        'database': args.database
+        'database': args.database,
+        'cache_dir': args.cache_dir,
+        'concurrency': args.concurrency,
+        'timeout': args.timeout,
+        'journal': args.journal,
+        'refresh': args.refresh,
+        'metrics_dir': args.metrics_dir,
+        'rate': args.rate,
+        'max_rate': args.max_rate
     })
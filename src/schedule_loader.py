@@ -2,46 +2,124 @@
 Script to Load Schedule Entries to the Database.
 """
 
-from helpers.schedule import ScheduleHelper
-import requests
 import argparse
 import logging
-from urllib.parse import urljoin
-import os
+
+from helpers.fetch_engine import SCHEDULE, hash_payload
+from helpers.http_client import get_http_client
+from helpers.journal import LoadJournal, build_week_key
+from helpers.metrics import get_metrics
+from helpers.schedule import ScheduleHelper
+from helpers.schedule_submitter import DEFAULT_WORKERS, ScheduleSubmitter
 
 API_URL = 'http://k3-main:30082/api/schedule'
+BATCH_API_URL = f'{API_URL}/batch'
 
 logging.basicConfig(level=logging.INFO)
 
-def main(args:dict) -> None:
+
+def build_schedule_entries(schedule: dict, week: int, year: int, type_code: str) -> list[dict]:
+    """
+    Builds the Schedule entries posted to the web service from the Schedule payload.
+
+    Args:
+        schedule (dict): Schedule payload
+        week (int): Week Value
+        year (int): Year Value
+        type_code (str): Type Code
+
+    Returns:
+        list: Schedule entries
+    """
+    events: dict = schedule.get('page', {}).get('content', {}).get('events', {})
+    entries = []
+    for day in events.values():
+        for event in day:
+            teams = {team.get('isHome', False) is True: team.get('abbrev')
+                     for team in event.get('teams', [])}
+            if len(teams) != 2:
+                continue
+            entries.append({
+                'gameId': int(event.get('id', 0)),
+                'week': week,
+                'year': year,
+                'typeCode': type_code,
+                'homeTeam': teams[True],
+                'awayTeam': teams[False],
+                'url': event.get('link', '')
+            })
+    return entries
+
+
+def post_entries(entries: list[dict], args: dict) -> int:
+    """
+    Posts the Schedule entries to the web service.
+
+    Args:
+        entries (list): Schedule entries
+        args (dict): Arguments
+
+    Returns:
+        int: Number of entries that failed to post
+    """
+    failures = 0
+    if args.get('batch_size'):
+        submitter = ScheduleSubmitter(BATCH_API_URL, batch_size=int(args['batch_size']),
+                                      workers=int(args.get('workers') or DEFAULT_WORKERS))
+        for entry in submitter.submit(entries):
+            failures += 1
+            logging.warning('SCHEDULE FAILED TO POST: %s', entry.get('gameId'))
+        return failures
+
+    client = get_http_client()
+    for entry in entries:
+        schedule_response = client.post(API_URL, json=entry)
+        if schedule_response.status_code != 200:
+            failures += 1
+            logging.warning('SCHEDULE MAY HAVE FAILED TO POST: %s : %s',
+                            entry.get('gameId'), schedule_response.status_code)
+        else:
+            get_metrics().increment('schedule.submitted')
+    return failures
+
+
+def main(args: dict) -> None:
     """
     Main Function for pulling Schedule Entries from the system
 
     Args:
         args (dict): Arguments
     """
-    
-    schedule_url = 'https://www.espn.com/nfl/schedule/_/week/' + str(args.get('week')) + '/year/' + str(args.get('year')) + '/seasontype/' + str(args.get('type'))
+    week = int(args.get('week', 0))
+    year = int(args.get('year', 0))
+    type_code = str(args.get('type', ''))
+    journal = LoadJournal(args['journal']) if args.get('journal') else None
+    week_key = build_week_key(year, week, type_code)
 
-    'https://www.espn.com/nfl/schedule/_/week/1/year/2022/seasontype/2'
+    if journal and not args.get('refresh') and journal.is_complete(SCHEDULE, week_key):
+        logging.info('SKIPPING COMPLETED SCHEDULE FOR %s WEEK %s TYPE %s', year, week, type_code)
+        schedule = None
+    else:
+        logging.info('RETRIEVING SCHEDULE..')
+        schedule = ScheduleHelper.get_schedule(week, year, type_code)
 
-    logging.info('RETRIEVING SCHEDULE..')
-    response = requests.get(schedule_url)
-    
-    if response.status_code == 200:
+    digest = hash_payload(schedule, SCHEDULE) if schedule else ''
+    if schedule and journal and journal.is_unchanged(SCHEDULE, week_key, digest):
+        logging.info('SKIPPING UNCHANGED SCHEDULE FOR %s WEEK %s TYPE %s', year, week, type_code)
+    elif schedule:
         logging.info('BUILDING SCHEDULE ENTRIES')
-        helper = ScheduleHelper(response.text)
-        entries = helper.get_schedule_entries(int(args.get('week')), int(args.get('year')), str(args.get('type')))
+        entries = build_schedule_entries(schedule, week, year, type_code)
         logging.info('WRITING TO WEB SERVICE')
-        if entries:
-            for entry in entries:
-                
-                schedule_response = requests.post(API_URL, json=entry)
-                if schedule_response.status_code != 200:
-                    logging.warning(f"SCHEDULE MAY HAVE FAILED TO POST: {entry.get('gameId')} : {schedule_response.status_code}")
-        
+        failures = post_entries(entries, args)
+        if journal and not failures:
+            journal.mark_complete(SCHEDULE, week_key, len(entries))
+            journal.record_hash(SCHEDULE, week_key, digest)
+
+    if journal:
+        journal.close()
+    if args.get('metrics_dir'):
+        get_metrics().export(args['metrics_dir'])
     logging.info('DONE')
-        
 
 
 if __name__ == '__main__':
@@ -49,12 +127,26 @@ if __name__ == '__main__':
     argparser.add_argument('-y', '--year', type=int, help='Year Value')
     argparser.add_argument('-w', '--week', type=int, help='Week Value')
     argparser.add_argument('-t', '--type', type=str, help='Schedule Type (1,2,3)')
-    
-    args = argparser.parse_args()
-    
+    argparser.add_argument('-b', '--batch-size', type=int,
+                           help='Post the entries to the batch endpoint in chunks of this size')
+    argparser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                           help='Batches in flight at once')
+    argparser.add_argument('-j', '--journal', type=str,
+                           help='Load Journal File used to skip weeks already posted')
+    argparser.add_argument('--refresh', action='store_true',
+                           help='Post completed weeks again unless their payload is unchanged')
+    argparser.add_argument('-m', '--metrics-dir', type=str,
+                           help='Directory for the metrics.json and metrics.prom summaries')
+
+    arguments = argparser.parse_args()
+
     main({
-        'week': args.week,
-        'year': args.year,
-        'type': args.type
+        'week': arguments.week,
+        'year': arguments.year,
+        'type': arguments.type,
+        'batch_size': arguments.batch_size,
+        'workers': arguments.workers,
+        'journal': arguments.journal,
+        'refresh': arguments.refresh,
+        'metrics_dir': arguments.metrics_dir
     })
-    
@@ -4,177 +4,140 @@ Script for loading statistics.
 
 import argparse
 import logging
-from typing import Callable
-from urllib.parse import urljoin
 
-import requests
-from pyquery import PyQuery as pq
-
-from helpers.box_score import BoxscoreHelper
-from helpers.player import PlayerHelper
+from football_data.models import Schedule
+from football_data.repositories import StatisticCodeRepository
+
+from helpers.box_score import BoxScoreHelper
+from helpers.cache import PayloadCache
+from helpers.database import DEFAULT_POOL_SIZE, DbHelper
+from helpers.fetch_engine import BOX_SCORE, FetchEngine, FetchResult, hash_payload
+from helpers.journal import LoadJournal
+from helpers.live import LivePoller
+from helpers.metrics import BUILD, Metrics, get_metrics
+from helpers.payload import PayloadFetcher, set_payload_fetcher
+from helpers.rate_limit import AdaptiveRateLimiter, set_rate_limiter
+from helpers.player import PlayerCache
+from helpers.poll_scheduler import DEFAULT_CADENCE, PHASE_IN, PollScheduler
+from helpers.schedule import ScheduleHelper
+from helpers.statistic_writer import StatisticWriter
 
 logging.basicConfig(level=logging.INFO)
 
-API_BASE_URL = 'http://k3-main:30082'
-
-HOME_WRAPPER = 'div.gamepackage-home-wrap'
-AWAY_WRAPPER = 'div.gamepackage-away-wrap'
-
 
-def get_schedules(year: int, week: int, type_code: str) -> list | None:
+def load_box_score(helper: BoxScoreHelper, writer: StatisticWriter, box_score: dict,
+                   schedule: Schedule, opponent_schedule: Schedule | None) -> int:
     """
-    Retrieves a listing of Schedule items from the API.
+    Builds and saves the statistics for a game's box score.
 
     Args:
-        year (int): year value
-        week (int): week value
-        type_code (str): type code
+        helper (BoxScoreHelper): Box Score Helper
+        writer (StatisticWriter): Statistic Writer
+        box_score (dict): Box Score payload
+        schedule (Schedule): Home Schedule
+        opponent_schedule (Schedule): Away Schedule
 
     Returns:
-        list: list of Schedules
+        int: Number of statistics saved
     """
-    params = {
-        'week': week,
-        'year': year,
-        'typeCode': type_code
-    }
-    url = urljoin(API_BASE_URL, '/api/schedules')
-    success = False
-    max_attempts = 5
-    count = 0
-
-    while not success and count <= max_attempts:
-        try:
-            response = requests.get(url, params=params, timeout=60)
-            if (response.status_code == 200):
-                success = True
-                return response.json()
-            else:
-                success = False
-                count = count + 1
-        except TimeoutError:
-            success = False
-            count = count + 1
-    return None
-
-
-def get_stat_page(game_id: str) -> str | None:
-    """
-    Retrieves the Stat page from the Web
+    away_schedule_id = opponent_schedule.id if opponent_schedule else schedule.id
+    # Player pages are fetched before the write transaction opens, never while it is open.
+    helper.preload_players(box_score)
+    stats = helper.iter_statistics(box_score, schedule.id, away_schedule_id)
+    return writer.upsert(get_metrics().time_iter(BUILD, stats))
 
-    Args:
-        game_id (str): Game Id to retrieve
 
-    Returns:
-        str: Boxscore page html
+def build_scheduler(arguments: dict) -> PollScheduler:
     """
-
-    url = 'https://www.espn.com/nfl/boxscore/_/gameId/' + str(game_id)
-    response = requests.get(url)
-
-    if response.status_code == 200:
-        return response.text
-    return None
-
-
-def process_stats(stats: list) -> int:
-    """
-    Processes list of stats into the API.
+    Builds the live Poll Scheduler with the kickoff times of the week's schedule.
 
     Args:
-        stats (list): Stats to load
+        arguments (dict): Argument Dictionary.
 
     Returns:
-        int: errors
-    """
-    helper = BoxscoreHelper(API_BASE_URL)
-    for stat in stats:
-        # Add the player
-        player_helper = PlayerHelper(stat.get('playerUrl'), API_BASE_URL)
-        player = player_helper.build_player()
-        if player:
-            player_helper.add_player_information(player)
-    # Submit the Stats
-    helper.add_statistic(stats)
-
-
-def load_stats(document: pq, stat_sections: tuple, game_id: int, team_id: int, method: Callable) -> list:
-    """
-    Loads the Stats Section from the Stats Section Locator, game, team and helper function to use.
-
-    Args:
-        document (pq): PyQuery Document
-        stat_sections (tuple): Stats Section Locator (Identifier, Wrapper)
-        game_id (int): Game Id
-        team_id (int): Team Id
-        method (function): Helper Method
+        PollScheduler: Poll Scheduler
     """
+    schedule = ScheduleHelper.get_schedule(int(arguments.get('week', 0)),
+                                           int(arguments.get('year', 0)),
+                                           str(arguments.get('type', '')))
+    if not schedule:
+        logging.warning('NO KICKOFF TIMES FOUND, POLLING EVERY GAME FROM THE START')
+    return PollScheduler({PHASE_IN: float(arguments.get('interval') or DEFAULT_CADENCE[PHASE_IN])},
+                         kickoffs=ScheduleHelper.get_kickoffs(schedule) if schedule else None)
 
-    stat_section = document(stat_sections[0])
-    stat_document = pq(stat_section)
 
-    wrapper = stat_document(stat_sections[1])
-
-    stats = method(team_id, game_id, wrapper)
-    return stats
-
-
-def main(args: dict) -> None:
+def main(arguments: dict) -> None:
     """
     Main Function
 
     Args:
-        args (dict): Argument Dictionary.
+        arguments (dict): Argument Dictionary.
     """
 
     logging.info('GETTING SCHEDULES')
-
-    schedules = get_schedules(int(args.get('year')), int(
-        args.get('week')), str(args.get('type')))
-    helper = BoxscoreHelper(API_BASE_URL)
-    for schedule in schedules:
-        if schedule.get('HomeGame', False) is True:
-            game_id = schedule.get('gameId')
-            logging.info(f"PULLING STATS FOR GAMEID: {game_id}")
-
-            stat_page_html = get_stat_page(schedule.get('gameId'))
-            if stat_page_html:
-                document = pq(stat_page_html)
-                team_id = int(schedule.get('teamId'))
-                opponent_id = int(schedule.get('opponentId'))
-
-                stats_categories = [
-                    ('#gamepackage-punting',
-                     helper.build_punting_statistics, 'PUNTING'),
-                    ('#gamepackage-kicking',
-                     helper.build_kicking_statistics, 'KICKING'),
-                    ('#gamepackage-puntReturns',
-                     helper.build_punt_return_statistics, 'PUNT RETURN'),
-                    ('#gamepackage-kickReturns',
-                     helper.build_kick_return_statistics, 'KICK RETURN'),
-                    ('#gamepackage-defensive',
-                     helper.build_defensive_statistics, 'DEFENSICE'),
-                    ('#gamepackage-interceptions',
-                     helper.build_interception_statistics, 'INTERCEPTION'),
-                    ('#gamepackage-fumbles', helper.build_fumble_statistics, 'FUMBLE'),
-                    ('#gamepackage-receiving',
-                     helper.build_receiving_statistics, 'RECEIVING'),
-                    ('#gamepackage-rushing',
-                     helper.build_rushing_statistics, 'RUSHING'),
-                    ('#gamepackage-passing', helper.build_passing_statistics, 'PASSING')
-                ]
-
-                # COMPILE AND LOAD THE STATS
-                for category in stats_categories:
-                    logging.info(f"LOADING {category[2]} STATS TO API")
-                    process_stats(load_stats(
-                        document, (category[0], HOME_WRAPPER), game_id, team_id, category[1]))
-                    process_stats(load_stats(
-                        document, (category[0], AWAY_WRAPPER), game_id, opponent_id, category[1]))
-                    logging.info(
-                        f"FINISHED LOADING {category[2]} STATS TO API")
-                logging.info(
-                    f"FINISHED PULLING STATS FOR GAMEID: {schedule.get('gameId')}")
+    maker = DbHelper.create_session_maker(arguments.get('server', ''),
+                                          arguments.get('database', ''),
+                                          arguments.get('user_name', ''),
+                                          arguments.get('password', ''),
+                                          pool_size=int(arguments.get('pool_size')
+                                                        or DEFAULT_POOL_SIZE))
+    cache_dir = arguments.get('cache_dir')
+    set_payload_fetcher(PayloadFetcher(cache=PayloadCache(cache_dir) if cache_dir else None))
+    set_rate_limiter(AdaptiveRateLimiter(float(arguments.get('rate') or 2),
+                                         max_rate=float(arguments.get('max_rate') or 20)))
+
+    games = ScheduleHelper(maker).get_games(int(arguments.get('year', 0)),
+                                            int(arguments.get('week', 0)),
+                                            str(arguments.get('type', '')))
+    codes = StatisticCodeRepository(maker).get_statistic_codes()
+    player_cache = PlayerCache()
+    helper = BoxScoreHelper(maker, codes, player_cache)
+    writer = StatisticWriter(maker)
+    journal = LoadJournal(arguments['journal']) if arguments.get('journal') else None
+    refresh = bool(arguments.get('refresh'))
+    game_ids = journal.get_pending(BOX_SCORE, games) if journal and not refresh else list(games)
+    if journal:
+        logging.info('SKIPPING %s COMPLETED GAMES', len(games) - len(game_ids))
+
+    def process(result: FetchResult) -> None:
+        if not result.payload:
+            logging.warning('NO BOX SCORE FOUND FOR GAME: %s', result.game_id)
+            return
+        digest = hash_payload(result.payload, BOX_SCORE)
+        if journal and journal.is_unchanged(BOX_SCORE, result.game_id, digest):
+            logging.info('SKIPPING UNCHANGED BOX SCORE FOR GAMEID: %s', result.game_id)
+            get_metrics().increment('games.unchanged')
+            return
+        schedule, opponent_schedule = games[result.game_id]
+        logging.info('LOADING STATS FOR GAMEID: %s', result.game_id)
+        with Metrics.game(result.game_id):
+            count = load_box_score(helper, writer, result.payload, schedule, opponent_schedule)
+        if helper.unresolved:
+            # The game is retried by the next run once its athletes can be resolved.
+            logging.warning('%s ATHLETES UNRESOLVED, NOT COMPLETING GAMEID: %s',
+                            len(helper.unresolved), result.game_id)
+        elif journal and count:
+            journal.mark_complete(BOX_SCORE, result.game_id, count)
+            journal.record_hash(BOX_SCORE, result.game_id, digest)
+        logging.info('FINISHED LOADING %s STATS FOR GAMEID: %s', count, result.game_id)
+
+    live = bool(arguments.get('live'))
+    # Live polls must see every update, so they never read cached pages.
+    engine = FetchEngine(max_per_host=int(arguments.get('concurrency') or 4),
+                         timeout=float(arguments.get('timeout') or 90), refresh=refresh or live)
+    if live:
+        logging.info('POLLING STATS FOR %s GAMES', len(games))
+        # A refresh polls the games the journal completed as well.
+        LivePoller(helper, writer, games, engine=engine, scheduler=build_scheduler(arguments),
+                   journal=None if refresh else journal).run()
+    else:
+        logging.info('PULLING STATS FOR %s GAMES', len(game_ids))
+        engine.run(game_ids, [BOX_SCORE], process)
+    if journal:
+        journal.close()
+    if arguments.get('metrics_dir'):
+        get_metrics().export(arguments['metrics_dir'])
+    logging.info('PLAYER CACHE HITS: %s MISSES: %s', player_cache.hits, player_cache.misses)
     logging.info('DONE')
 
 
@@ -184,11 +147,49 @@ if __name__ == '__main__':
     argparser.add_argument('-w', '--week', type=int, help='Week Value')
     argparser.add_argument('-t', '--type', type=str,
                            help='Schedule Type (1,2,3)')
+    argparser.add_argument('-s', '--server', type=str, help='DB Server')
+    argparser.add_argument('-d', '--database', type=str, help='Database Name')
+    argparser.add_argument('-u', '--user', type=str, help='Username')
+    argparser.add_argument('-p', '--password', type=str, help='Password')
+    argparser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                           help='Database connections kept open')
+    argparser.add_argument('-c', '--cache-dir', type=str, help='Payload Cache Directory')
+    argparser.add_argument('--concurrency', type=int, default=4,
+                           help='Concurrent page requests per host')
+    argparser.add_argument('--timeout', type=float, default=90, help='Seconds allowed per page')
+    argparser.add_argument('-j', '--journal', type=str,
+                           help='Load Journal File used to resume interrupted loads')
+    argparser.add_argument('--refresh', action='store_true',
+                           help='Reload completed games, skipping those with unchanged payloads')
+    argparser.add_argument('--live', action='store_true',
+                           help='Poll the games until they are final, writing changed stats only')
+    argparser.add_argument('--interval', type=float, default=DEFAULT_CADENCE[PHASE_IN],
+                           help='Seconds between live polls of a game in progress')
+    argparser.add_argument('--rate', type=float, default=2,
+                           help='Initial requests per second, adjusted to the responses')
+    argparser.add_argument('--max-rate', type=float, default=20, help='Maximum requests per second')
+    argparser.add_argument('-m', '--metrics-dir', type=str,
+                           help='Directory for the metrics.json and metrics.prom summaries')
 
     args = argparser.parse_args()
 
     main({
         'week': args.week,
         'year': args.year,
-        'type': args.type
+        'type': args.type,
+        'user_name': args.user,
+        'password': args.password,
+        'pool_size': args.pool_size,
+        'server': args.server,
+        'database': args.database,
+        'cache_dir': args.cache_dir,
+        'concurrency': args.concurrency,
+        'timeout': args.timeout,
+        'journal': args.journal,
+        'refresh': args.refresh,
+        'live': args.live,
+        'interval': args.interval,
+        'metrics_dir': args.metrics_dir,
+        'rate': args.rate,
+        'max_rate': args.max_rate
     })
@@ -2,13 +2,17 @@
 Tests for the Box score helper.
 """
 
+import json
+
 from assertpy import assert_that
 from football_data.models import Player, Statistic, StatisticCode, StatisticCategory
 from football_data.repositories import StatisticCodeRepository
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select
 from sqlalchemy.orm import sessionmaker
 
 from src.helpers.box_score import BoxScoreHelper
+from helpers.payload import set_payload_fetcher
+from helpers.statistic_writer import StatisticWriter
 
 
 def build_maker() -> sessionmaker:
@@ -746,3 +750,208 @@ def test_build_kicking_stats():
     assert_that(filter_by_code(results, codes, 'LONG', 51)).is_not_empty()
     assert_that(filter_by_code(results, codes, 'XPA', 1)).is_not_empty()
     assert_that(filter_by_code(results, codes, 'XPM', 1)).is_not_empty()
+
+
+def test_build_statistics():
+    """
+    Tests building the statistics for both teams from the box score payload.
+    """
+    maker = build_maker()
+    with open('./tests/test_files/boxscore.json', 'r', encoding='utf-8') as input_file:
+        payload = json.load(input_file)
+
+    stat_code_repo = StatisticCodeRepository(maker)
+    stat_code_repo.save(StatisticCode(code='YDS', description='Rushing Yards', grouping='rushing'))
+    stat_code_repo.save(StatisticCode(code='REC', description='Receptions', grouping='receiving'))
+    for code in ['PA', 'PC']:
+        stat_code_repo.save(StatisticCode(code=code, description=code, grouping='passing'))
+    for code in ['FGA', 'FGM', 'XPA', 'XPM']:
+        stat_code_repo.save(StatisticCode(code=code, description=code, grouping='kicking'))
+    stat_code_repo.save(StatisticCategory(code='O', description='Offense'))
+    stat_code_repo.save(StatisticCategory(code='D', description='Defense'))
+    stat_code_repo.save(StatisticCategory(code='S', description='Special Teams'))
+
+    box_scores = payload['page']['content']['gamepackage']['bxscr']
+    urls = {athlete['athlt']['lnk'] for box_score in box_scores
+            for section in box_score['stats'] for athlete in section.get('athlts', [])}
+    for url in urls:
+        stat_code_repo.save(Player(name=url, url=url))
+
+    codes = stat_code_repo.get_statistic_codes()
+    helper = BoxScoreHelper(maker, codes)
+    results = helper.build_statistics(payload, 1, 2)
+
+    # Taysom Hill rushed for 81 yards for the Saints, the away team.
+    assert_that(filter_by_code(results, codes, 'YDS', 81.0)).extracting('schedule_id') \
+        .contains_only(2)
+    assert_that(filter_by_code(results, codes, 'PA', 34.0)).is_not_empty()
+    assert_that(filter_by_code(results, codes, 'FGM', 2.0)).is_not_empty()
+    assert_that(results).extracting('schedule_id').contains(1, 2)
+
+    # The streamed statistics match the built ones, one batch per athlete row.
+    batches = list(helper.iter_statistics(payload, 1, 2))
+    assert_that(len(batches)).is_greater_than(2)
+    assert_that([stat.value for batch in batches for stat in batch]) \
+        .is_equal_to([stat.value for stat in results])
+
+
+def test_section_plan_reused_and_maps_duplicate_labels():
+    """
+    Tests a section plan is compiled once and a repeated label is persisted under the code of
+    its stat key, while a repeat without a distinct code keeps the value of its first column.
+    """
+    maker = build_maker()
+    stat_code_repo = StatisticCodeRepository(maker)
+    stat_code_repo.save(StatisticCode(code='YDS', description='Yards', grouping='rushing'))
+    stat_code_repo.save(StatisticCode(code='longRushing', description='Long',
+                                      grouping='rushing'))
+    stat_code_repo.save(StatisticCategory(code='O', description='Offense'))
+    stat_code_repo.save(Player(name='Taysom Hill',
+                               url='http://www.espn.com/nfl/player/_/id/2468609/taysom-hill'))
+    codes = stat_code_repo.get_statistic_codes()
+    section = {
+        "athlts": [{
+            "athlt": {"lnk": "http://www.espn.com/nfl/player/_/id/2468609/taysom-hill"},
+            "stats": ["81", "12", "5"]
+        }],
+        "lbls": ["YDS", "YDS", "YDS"],
+        "keys": ["rushingYards", "longRushing", "rushingYardsAfterContact"],
+        "type": "rushing"
+    }
+    helper = BoxScoreHelper(maker, codes)
+    writer = StatisticWriter(maker)
+    writer.create_index()
+    writer.upsert(helper.build_rushing_stats(section, 1))
+    writer.upsert(helper.build_rushing_stats(section, 2))
+
+    with maker() as session:
+        rows = session.execute(select(Statistic.schedule_id, StatisticCode.code, Statistic.value)
+                               .join(StatisticCode,
+                                     StatisticCode.id == Statistic.statistic_code_id)
+                               .order_by(Statistic.schedule_id, StatisticCode.code)).all()
+    assert_that([tuple(row) for row in rows]).is_equal_to([
+        (1, 'YDS', 81.0), (1, 'longRushing', 12.0), (2, 'YDS', 81.0), (2, 'longRushing', 12.0)])
+    assert_that(helper.plans).is_length(1)
+
+
+def test_build_kicking_stats_missing_compound_codes():
+    """
+    Tests compound columns without Statistic Codes are skipped.
+    """
+    maker = build_maker()
+    stat_code_repo = StatisticCodeRepository(maker)
+    stat_code_repo.save(StatisticCode(code='FGM', description='Field Goals', grouping='kicking'))
+    stat_code_repo.save(StatisticCategory(code='S', description='Special Teams'))
+    stat_code_repo.save(Player(name='Wil Lutz',
+                               url='http://www.espn.com/nfl/player/_/id/2985659/wil-lutz'))
+    codes = stat_code_repo.get_statistic_codes()
+    section = {
+        "athlts": [{
+            "athlt": {"lnk": "http://www.espn.com/nfl/player/_/id/2985659/wil-lutz"},
+            "stats": ["2/3", "67.0", "51", "1/1", "7"]
+        }],
+        "lbls": ["FG", "PCT", "LONG", "XP", "PTS"],
+        "type": "kicking"
+    }
+    helper = BoxScoreHelper(maker, codes)
+    results = helper.build_kicking_stats(section, 1)
+
+    assert_that(results).is_length(1)
+    assert_that(filter_by_code(results, codes, 'FGM', 2.0)).is_not_empty()
+
+
+class MockFetcher:
+    """
+    Payload Fetcher stand in whose pages can never be retrieved.
+    """
+
+    def __init__(self) -> None:
+        self.urls = []
+
+    def fetch(self, url: str, **_kwargs) -> dict | None:
+        self.urls.append(url)
+        return None
+
+
+def test_iter_statistics_lists_unresolved_athletes():
+    """
+    Tests athletes without a Player are skipped and listed as unresolved, and their pages are
+    only fetched by the preload, never while the Statistics stream.
+    """
+    maker = build_maker()
+    stat_code_repo = StatisticCodeRepository(maker)
+    stat_code_repo.save(StatisticCode(code='YDS', description='Yards', grouping='rushing'))
+    stat_code_repo.save(StatisticCategory(code='O', description='Offense'))
+    stat_code_repo.save(Player(name='Taysom Hill',
+                               url='http://www.espn.com/nfl/player/_/id/2468609/taysom-hill'))
+    codes = stat_code_repo.get_statistic_codes()
+    payload = {'page': {'content': {'gamepackage': {'bxscr': [{
+        'tm': {'hm': True},
+        'stats': [{
+            'athlts': [
+                {'athlt': {'lnk': 'http://www.espn.com/nfl/player/_/id/2468609/taysom-hill'},
+                 'stats': ['81']},
+                {'athlt': {'lnk': 'http://www.espn.com/nfl/player/_/id/1/unknown'},
+                 'stats': ['12']}
+            ],
+            'lbls': ['YDS'],
+            'type': 'rushing'
+        }]
+    }]}}}}
+    helper = BoxScoreHelper(maker, codes)
+    fetcher = MockFetcher()
+    set_payload_fetcher(fetcher)
+    try:
+        streamed = [stat for batch in helper.iter_statistics(payload, 1, 2) for stat in batch]
+        fetched = list(fetcher.urls)
+        results = helper.build_statistics(payload, 1, 2)
+    finally:
+        set_payload_fetcher(None)
+
+    assert_that(fetched).is_empty()
+    assert_that(fetcher.urls).is_equal_to(['http://www.espn.com/nfl/player/_/id/1/unknown'])
+    assert_that(streamed).extracting('value').is_equal_to([81.0])
+    assert_that(results).extracting('value').is_equal_to([81.0])
+    assert_that(helper.unresolved).is_equal_to(['http://www.espn.com/nfl/player/_/id/1/unknown'])
+
+
+class MockAthleteFetcher:
+    """
+    Payload Fetcher stand in returning player pages without an athlete.
+    """
+
+    @staticmethod
+    def fetch(_url: str, **_kwargs) -> dict | None:
+        return {'page': {'content': {'player': {}}}}
+
+
+def test_iter_statistics_skips_athletes_without_player_page():
+    """
+    Tests athletes whose page has no athlete are skipped without leaving the game unresolved.
+    """
+    maker = build_maker()
+    stat_code_repo = StatisticCodeRepository(maker)
+    stat_code_repo.save(StatisticCode(code='YDS', description='Yards', grouping='rushing'))
+    stat_code_repo.save(StatisticCategory(code='O', description='Offense'))
+    codes = stat_code_repo.get_statistic_codes()
+    payload = {'page': {'content': {'gamepackage': {'bxscr': [{
+        'tm': {'hm': True},
+        'stats': [{
+            'athlts': [
+                {'athlt': {'lnk': 'http://www.espn.com/nfl/player/_/id/1/retired'},
+                 'stats': ['12']},
+                {'athlt': {}, 'stats': ['3']}
+            ],
+            'lbls': ['YDS'],
+            'type': 'rushing'
+        }]
+    }]}}}}
+    helper = BoxScoreHelper(maker, codes)
+    set_payload_fetcher(MockAthleteFetcher())
+    try:
+        results = helper.build_statistics(payload, 1, 2)
+    finally:
+        set_payload_fetcher(None)
+
+    assert_that(results).is_empty()
+    assert_that(helper.unresolved).is_empty()
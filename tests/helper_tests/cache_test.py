@@ -0,0 +1,140 @@
+"""
+Tests for the Payload Cache.
+"""
+
+import json
+import time
+
+from assertpy import assert_that
+
+from helpers.cache import PayloadCache, build_cache_key, get_game_state
+from helpers.fetch_engine import BOX_SCORE, FetchEngine
+from helpers.payload import PayloadFetcher
+
+BOX_SCORE_URL = 'https://www.espn.com/nfl/boxscore/_/gameId/401437650'
+
+
+def load_payload(name: str) -> dict:
+    """
+    Loads a recorded payload from the test files.
+    Args:
+        name: File name
+
+    Returns: Payload
+    """
+    with open(f"./tests/test_files/{name}", 'r', encoding='utf-8') as input_file:
+        return json.load(input_file)
+
+
+def build_game(state: str) -> dict:
+    """
+    Builds a minimal game payload in the provided state.
+    """
+    return {'page': {'content': {'gamepackage': {'gmStrp': {'status': {'state': state}}}}}}
+
+
+class MockFetcher(PayloadFetcher):
+    """
+    Payload Fetcher returning a fixed payload without network access.
+    """
+
+    def __init__(self, payload: dict, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.payload = payload
+        self.calls = 0
+
+    def fetch_page(self, url: str) -> dict | None:
+        self.calls += 1
+        return self.payload
+
+
+def test_build_cache_key():
+    """
+    Tests building keys from the known page urls.
+    """
+    assert_that(build_cache_key(BOX_SCORE_URL)).is_equal_to('boxscore-401437650')
+    assert_that(build_cache_key('https://www.espn.com/nfl/matchup/_/gameId/401437650')) \
+        .is_equal_to('matchup-401437650')
+    assert_that(build_cache_key('https://www.espn.com/nfl/player/_/id/3918298/josh-allen')) \
+        .is_equal_to('player-3918298')
+    assert_that(build_cache_key(
+        'https://www.espn.com/nfl/schedule/_/week/1/year/2022/seasontype/2')) \
+        .is_equal_to('schedule-2022-1-2')
+
+
+def test_get_game_state():
+    """
+    Tests reading the game state from the recorded payloads.
+    """
+    assert_that(get_game_state(load_payload('boxscore.json'))).is_equal_to('post')
+    assert_that(get_game_state(load_payload('schedule.json'))).is_equal_to('post')
+    assert_that(get_game_state({'page': {'content': {'player': {}}}})).is_none()
+
+
+def test_final_game_cached_indefinitely(tmp_path):
+    """
+    Tests a completed game never expires.
+    """
+    cache = PayloadCache(str(tmp_path))
+    cache.put(BOX_SCORE_URL, build_game('post'))
+
+    with open(cache.get_path(BOX_SCORE_URL), 'r', encoding='utf-8') as cache_file:
+        assert_that(json.load(cache_file).get('expires')).is_none()
+    assert_that(cache.get(BOX_SCORE_URL)).is_equal_to(build_game('post'))
+
+
+def test_live_game_expires(tmp_path):
+    """
+    Tests a game in progress expires after the live ttl.
+    """
+    cache = PayloadCache(str(tmp_path), live_ttl=-1)
+    cache.put(BOX_SCORE_URL, build_game('in'))
+    assert_that(cache.get(BOX_SCORE_URL)).is_none()
+
+    cache = PayloadCache(str(tmp_path), live_ttl=60)
+    cache.put(BOX_SCORE_URL, build_game('in'))
+    with open(cache.get_path(BOX_SCORE_URL), 'r', encoding='utf-8') as cache_file:
+        assert_that(json.load(cache_file).get('expires')).is_greater_than(time.time())
+
+
+def test_invalidate(tmp_path):
+    """
+    Tests removing a cached entry.
+    """
+    cache = PayloadCache(str(tmp_path))
+    cache.put(BOX_SCORE_URL, build_game('post'))
+    cache.invalidate(BOX_SCORE_URL)
+    cache.invalidate(BOX_SCORE_URL)
+    assert_that(cache.get(BOX_SCORE_URL)).is_none()
+
+
+def test_fetcher_uses_cache(tmp_path):
+    """
+    Tests the fetcher only retrieves the page once when cached.
+    """
+    fetcher = MockFetcher(build_game('post'), cache=PayloadCache(str(tmp_path)))
+
+    assert_that(fetcher.fetch(BOX_SCORE_URL)).is_equal_to(build_game('post'))
+    assert_that(fetcher.fetch(BOX_SCORE_URL)).is_equal_to(build_game('post'))
+    assert_that(fetcher.calls).is_equal_to(1)
+
+
+def test_refresh_bypasses_cache(tmp_path):
+    """
+    Tests refreshing retrieves a final game again and replaces the cached payload, so stat
+    corrections are seen.
+    """
+    fetcher = MockFetcher(build_game('post'), cache=PayloadCache(str(tmp_path)))
+    fetcher.fetch(BOX_SCORE_URL)
+    corrected = build_game('post')
+    corrected['page']['content']['gamepackage']['bxscr'] = [{'corrected': True}]
+    fetcher.payload = corrected
+    results = []
+
+    FetchEngine(fetcher=fetcher).run([401437650], [BOX_SCORE], results.append)
+    FetchEngine(fetcher=fetcher, refresh=True).run([401437650], [BOX_SCORE], results.append)
+
+    assert_that([result.payload for result in results]).is_equal_to([build_game('post'),
+                                                                      corrected])
+    assert_that(fetcher.calls).is_equal_to(2)
+    assert_that(fetcher.fetch(BOX_SCORE_URL)).is_equal_to(corrected)
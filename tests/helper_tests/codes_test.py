@@ -0,0 +1,44 @@
+"""
+Tests for the Statistic Code Index.
+"""
+
+from assertpy import assert_that
+from football_data.models import StatisticCode
+
+from helpers.codes import StatisticCodeIndex, normalize_code
+
+
+def test_normalize_code():
+    """
+    Tests spaces are removed and the value upper cased.
+    """
+    assert_that(normalize_code('In 20')).is_equal_to('IN20')
+    assert_that(normalize_code('qb hts')).is_equal_to('QBHTS')
+
+
+def test_get_by_group_and_code():
+    """
+    Tests codes are matched by grouping and normalized code.
+    """
+    rushing = StatisticCode(id=1, code='YDS', description='Rushing Yards', grouping='rushing')
+    receiving = StatisticCode(id=2, code='YDS', description='Receiving Yards',
+                              grouping='receiving')
+    punting = StatisticCode(id=3, code='IN20', description='Inside 20', grouping='punting')
+    index = StatisticCodeIndex([rushing, receiving, punting])
+
+    assert_that(index.get('rushing', 'YDS')).is_same_as(rushing)
+    assert_that(index.get('receiving', 'yds')).is_same_as(receiving)
+    assert_that(index.get('punting', 'In 20')).is_same_as(punting)
+    assert_that(index.get('passing', 'YDS')).is_none()
+
+
+def test_first_code_wins():
+    """
+    Tests duplicate codes resolve to the first code in the listing.
+    """
+    first = StatisticCode(id=1, code='TD', description='Touchdowns', grouping='general')
+    second = StatisticCode(id=2, code='td', description='Touchdowns', grouping='general')
+    index = StatisticCodeIndex([first, second])
+
+    assert_that(len(index)).is_equal_to(1)
+    assert_that(index.get('general', 'TD')).is_same_as(first)
@@ -0,0 +1,117 @@
+"""
+Tests for the Database Helper.
+"""
+
+from assertpy import assert_that
+from football_data.models import Statistic, Team
+from football_data.repositories import TeamRepository
+from sqlalchemy import event, select
+
+from helpers.database import DbHelper, get_schema_version
+from helpers.statistic_writer import StatisticWriter
+
+
+def record_statements(maker) -> list[str]:
+    """
+    Records the statements executed by the engine of the Session Maker.
+    """
+    statements = []
+    event.listen(maker.kw['bind'], 'before_cursor_execute',
+                 lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_get_session_maker_is_cached(tmp_path):
+    """
+    Tests the Session Maker is created once per database with every table.
+    """
+    url = f'sqlite:///{tmp_path}/stats.db'
+    try:
+        maker = DbHelper.get_session_maker(url)
+
+        assert_that(DbHelper.get_session_maker(url)).is_same_as(maker)
+        TeamRepository(maker).save(Team(code='KC', name='Kansas City Chiefs', url=''))
+        assert_that(TeamRepository(maker).get_teams()).is_length(1)
+    finally:
+        DbHelper.dispose()
+
+
+def test_bootstrap_schema_skips_current_schema(tmp_path):
+    """
+    Tests the tables are only created when the stored schema version differs.
+    """
+    url = f'sqlite:///{tmp_path}/stats.db'
+    try:
+        engine = DbHelper.get_session_maker(url).kw['bind']
+        DbHelper.dispose()
+        maker = DbHelper.get_session_maker(url)
+        statements = record_statements(maker)
+
+        assert_that(DbHelper.bootstrap_schema(engine)).is_false()
+        assert_that(DbHelper.bootstrap_schema(maker.kw['bind'])).is_false()
+        assert_that([statement for statement in statements if 'CREATE' in statement]).is_empty()
+    finally:
+        DbHelper.dispose()
+
+
+def test_bootstrap_schema_updates_version(tmp_path):
+    """
+    Tests an outdated schema version is replaced after creating the tables.
+    """
+    url = f'sqlite:///{tmp_path}/stats.db'
+    try:
+        engine = DbHelper.get_session_maker(url).kw['bind']
+        with engine.begin() as connection:
+            connection.exec_driver_sql("UPDATE schema_version SET version = 'old'")
+
+        assert_that(DbHelper.bootstrap_schema(engine)).is_true()
+        with engine.connect() as connection:
+            version = connection.exec_driver_sql('SELECT version FROM schema_version').scalar()
+        assert_that(version).is_equal_to(get_schema_version())
+    finally:
+        DbHelper.dispose()
+
+
+def test_bootstrap_schema_removes_duplicate_statistics(tmp_path):
+    """
+    Tests a database loaded before the natural key index keeps the latest duplicate Statistic
+    and gets the index once its schema is bootstrapped.
+    """
+    url = f'sqlite:///{tmp_path}/stats.db'
+    try:
+        maker = DbHelper.get_session_maker(url)
+        engine = maker.kw['bind']
+        with engine.begin() as connection:
+            connection.exec_driver_sql('DROP INDEX ux_statistics_natural_key')
+            connection.exec_driver_sql("UPDATE schema_version SET version = 'old'")
+        StatisticWriter(maker).write([Statistic(statistic_code_id=1, schedule_id=1, value=value,
+                                                category_id=1, player_id=1)
+                                      for value in (1.0, 2.0, 3.0)])
+
+        assert_that(DbHelper.bootstrap_schema(engine)).is_true()
+        StatisticWriter(maker).upsert([Statistic(statistic_code_id=2, schedule_id=1, value=4.0,
+                                                 category_id=1, player_id=1)])
+        with maker() as session:
+            values = session.scalars(select(Statistic.value).order_by(Statistic.id)).all()
+        assert_that(values).is_equal_to([3.0, 4.0])
+        with engine.connect() as connection:
+            indexes = connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index'").scalars().all()
+        assert_that(indexes).contains('ux_statistics_natural_key')
+    finally:
+        DbHelper.dispose()
+
+
+def test_get_session_maker_without_bootstrap(tmp_path):
+    """
+    Tests a worker Session Maker leaves the schema to the process that bootstrapped it.
+    """
+    url = f'sqlite:///{tmp_path}/stats.db'
+    try:
+        maker = DbHelper.get_session_maker(url, bootstrap=False)
+        with maker.kw['bind'].connect() as connection:
+            tables = connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'table'").scalars().all()
+        assert_that(tables).is_empty()
+    finally:
+        DbHelper.dispose()
@@ -0,0 +1,128 @@
+"""
+Tests for the Driver Pool.
+"""
+
+import subprocess
+import sys
+
+from assertpy import assert_that
+
+from helpers.driver import DriverPool, get_driver_pool, set_driver_pool
+
+
+class MockDriver:
+    """
+    Stand in for a Chrome Web Driver.
+    """
+
+    def __init__(self) -> None:
+        self.urls = []
+        self.quit_called = False
+
+    def get(self, url: str) -> None:
+        self.urls.append(url)
+
+    def execute_script(self, script: str) -> dict:
+        return {'script': script, 'url': self.urls[-1]}
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+class MockFactory:
+    """
+    Driver factory recording the drivers it creates.
+    """
+
+    def __init__(self) -> None:
+        self.drivers = []
+
+    def __call__(self) -> MockDriver:
+        driver = MockDriver()
+        self.drivers.append(driver)
+        return driver
+
+
+def test_fetch_payload_reuses_driver():
+    """
+    Tests a browser is reused across page fetches.
+    """
+    factory = MockFactory()
+    pool = DriverPool(size=1, max_pages=10, max_rss_mb=0, factory=factory)
+
+    first = pool.fetch_payload('http://test/1')
+    second = pool.fetch_payload('http://test/2')
+
+    assert_that(factory.drivers).is_length(1)
+    assert_that(first).is_equal_to({'script': 'return window.__espnfitt__',
+                                    'url': 'http://test/1'})
+    assert_that(second.get('url')).is_equal_to('http://test/2')
+
+
+def test_driver_recycled_after_max_pages():
+    """
+    Tests a browser is quit and replaced after serving the maximum pages.
+    """
+    factory = MockFactory()
+    pool = DriverPool(size=1, max_pages=2, max_rss_mb=0, factory=factory)
+
+    for index in range(3):
+        pool.fetch_payload(f"http://test/{index}")
+
+    assert_that(factory.drivers).is_length(2)
+    assert_that(factory.drivers[0].quit_called).is_true()
+    assert_that(factory.drivers[1].quit_called).is_false()
+
+
+def test_driver_discarded_on_error():
+    """
+    Tests a browser raising while checked out is not returned to the pool.
+    """
+    factory = MockFactory()
+    pool = DriverPool(size=1, max_pages=10, max_rss_mb=0, factory=factory)
+
+    try:
+        with pool.driver():
+            raise ValueError('Page Failed')
+    except ValueError:
+        pass
+
+    pool.fetch_payload('http://test/1')
+    assert_that(factory.drivers).is_length(2)
+    assert_that(factory.drivers[0].quit_called).is_true()
+
+
+def test_warm_and_close():
+    """
+    Tests warming the pool launches browsers and closing quits them.
+    """
+    factory = MockFactory()
+    pool = DriverPool(size=2, max_pages=10, max_rss_mb=0, factory=factory)
+    pool.warm()
+    assert_that(factory.drivers).is_length(2)
+
+    pool.close()
+    assert_that([driver.quit_called for driver in factory.drivers]).does_not_contain(False)
+
+
+def test_set_driver_pool():
+    """
+    Tests replacing the process wide pool.
+    """
+    pool = DriverPool(factory=MockFactory())
+    set_driver_pool(pool)
+    try:
+        assert_that(get_driver_pool()).is_same_as(pool)
+    finally:
+        set_driver_pool(None)
+
+
+def test_import_defers_selenium():
+    """
+    Tests Selenium is only imported once a browser is created.
+    """
+    result = subprocess.run([sys.executable, '-c', 'import sys, helpers.payload; '
+                             'print("selenium" in sys.modules)'],
+                            cwd='./src', capture_output=True, text=True, check=True)
+
+    assert_that(result.stdout.strip()).is_equal_to('False')
@@ -0,0 +1,136 @@
+"""
+Tests for the Fetch Engine.
+"""
+
+import json
+import threading
+import time
+
+from assertpy import assert_that
+
+from helpers.fetch_engine import BOX_SCORE, MATCHUP, FetchEngine, FetchResult, hash_payload
+
+
+class MockFetcher:
+    """
+    Payload Fetcher stand in tracking concurrent requests.
+    """
+
+    def __init__(self, delay: float = 0.05, fail_url: str = '') -> None:
+        self.delay = delay
+        self.fail_url = fail_url
+        self.starts = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def fetch(self, url: str, **_kwargs) -> dict | None:
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.starts.append(time.monotonic())
+        try:
+            time.sleep(self.delay)
+            if url == self.fail_url:
+                raise ValueError('Page Failed')
+            return {'url': url}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_run_fetches_all_pages():
+    """
+    Tests every page type is retrieved for every game.
+    """
+    fetcher = MockFetcher()
+    engine = FetchEngine(fetcher=fetcher, max_per_host=8)
+    results: list[FetchResult] = []
+
+    engine.run([1, 2, 3], [BOX_SCORE, MATCHUP], results.append)
+
+    assert_that(results).is_length(6)
+    assert_that([(result.game_id, result.page_type) for result in results]) \
+        .contains((1, BOX_SCORE), (3, MATCHUP))
+    assert_that(results[0].payload.get('url')).contains('espn.com/nfl/')
+
+
+def test_run_caps_concurrency_per_host():
+    """
+    Tests the number of concurrent requests to a host is capped.
+    """
+    fetcher = MockFetcher()
+    engine = FetchEngine(fetcher=fetcher, max_per_host=2)
+
+    engine.run(range(6), [BOX_SCORE], lambda result: None)
+
+    assert_that(fetcher.max_active).is_greater_than(1).is_less_than_or_equal_to(2)
+
+
+def test_run_handles_failures_and_timeouts():
+    """
+    Tests failed and timed out pages are reported without a payload.
+    """
+    fetcher = MockFetcher(delay=0.2,
+                          fail_url='https://www.espn.com/nfl/boxscore/_/gameId/1')
+    engine = FetchEngine(fetcher=fetcher, timeout=1)
+    results: list[FetchResult] = []
+    engine.run([1, 2], [BOX_SCORE], results.append)
+    assert_that([result for result in results if result.payload is None]).is_length(1)
+
+    engine = FetchEngine(fetcher=MockFetcher(delay=0.5), timeout=0.05)
+    results = []
+    engine.run([1], [MATCHUP], results.append)
+    assert_that([result.payload for result in results]).contains_only(None)
+
+
+def test_run_timeouts_keep_their_slot():
+    """
+    Tests a timed out request keeps counting against the host cap until its thread finishes.
+    """
+    fetcher = MockFetcher(delay=0.2)
+    engine = FetchEngine(fetcher=fetcher, max_per_host=1, timeout=0.02)
+    results: list[FetchResult] = []
+
+    engine.run(range(3), [BOX_SCORE], results.append)
+
+    assert_that([result.payload for result in results]).contains_only(None)
+    assert_that(fetcher.max_active).is_equal_to(1)
+
+
+def test_run_callbacks_do_not_block_fetches():
+    """
+    Tests slow callbacks run off the event loop and a failing callback does not stop the others.
+    """
+    fetcher = MockFetcher()
+    engine = FetchEngine(fetcher=fetcher, max_per_host=2)
+    processed = []
+
+    def callback(result: FetchResult) -> None:
+        time.sleep(0.2)
+        if result.game_id == 1:
+            raise ValueError('Load Failed')
+        processed.append(result.game_id)
+
+    engine.run(range(6), [BOX_SCORE], callback)
+
+    assert_that(max(fetcher.starts) - min(fetcher.starts)).is_less_than(0.2)
+    assert_that(sorted(processed)).is_equal_to([0, 2, 3, 4, 5])
+
+
+def test_hash_payload_covers_statistics_subtree():
+    """
+    Tests the payload hash ignores key order and parts outside the statistics.
+    """
+    with open('./tests/test_files/boxscore.json', 'r', encoding='utf-8') as input_file:
+        payload = json.load(input_file)
+    digest = hash_payload(payload, BOX_SCORE)
+
+    reordered = json.loads(json.dumps(payload, sort_keys=True))
+    reordered['page']['meta'] = {'generated': time.time()}
+    assert_that(hash_payload(reordered, BOX_SCORE)).is_equal_to(digest)
+    assert_that(hash_payload(payload, MATCHUP)).is_not_equal_to(digest)
+
+    payload['page']['content']['gamepackage']['bxscr'][0]['stats'][0]['athlts'][0]['stats'][0] \
+        = '999'
+    assert_that(hash_payload(payload, BOX_SCORE)).is_not_equal_to(digest)
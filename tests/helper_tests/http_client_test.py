@@ -0,0 +1,83 @@
+"""
+Tests for the HTTP Client.
+"""
+
+import pytest
+import requests
+import responses
+from assertpy import assert_that
+
+from helpers.http_client import HttpClient, RetryBudget
+
+API_URL = 'http://localhost/api/schedule'
+
+
+class MockSleep:
+    """
+    Sleep stand in recording the delays.
+    """
+
+    def __init__(self) -> None:
+        self.delays = []
+
+    def __call__(self, delay: float) -> None:
+        self.delays.append(delay)
+
+
+@responses.activate
+def test_get_retries_retryable_status():
+    """
+    Tests GET requests are retried with backoff until they succeed.
+    """
+    responses.get(API_URL, status=503)
+    responses.get(API_URL, status=503, headers={'Retry-After': '2'})
+    responses.get(API_URL, json={'ok': True})
+    sleep = MockSleep()
+    client = HttpClient(backoff=1, sleep=sleep)
+
+    response = client.get(API_URL)
+
+    assert_that(response.status_code).is_equal_to(200)
+    assert_that(sleep.delays).is_length(2)
+    assert_that(sleep.delays[0]).is_between(0, 1)
+    assert_that(sleep.delays[1]).is_equal_to(2)
+
+
+@responses.activate
+def test_post_not_retried_by_default():
+    """
+    Tests POST requests are only retried when requested.
+    """
+    responses.post(API_URL, status=503)
+    responses.post(API_URL, status=200)
+    client = HttpClient(sleep=MockSleep())
+
+    assert_that(client.post(API_URL, json={}).status_code).is_equal_to(503)
+    assert_that(client.post(API_URL, json={}, retry=True).status_code).is_equal_to(200)
+
+
+@responses.activate
+def test_connection_error_raised_after_retries():
+    """
+    Tests connection errors are raised once the retries are used up.
+    """
+    responses.get(API_URL, body=requests.ConnectionError('refused'))
+    sleep = MockSleep()
+    client = HttpClient(max_retries=2, sleep=sleep)
+
+    with pytest.raises(requests.ConnectionError):
+        client.get(API_URL)
+    assert_that(sleep.delays).is_length(2)
+
+
+def test_retry_budget():
+    """
+    Tests the retry budget allows the reserve plus a fraction of the requests.
+    """
+    budget = RetryBudget(ratio=0.5, min_retries=1)
+
+    assert_that(budget.withdraw()).is_true()
+    assert_that(budget.withdraw()).is_false()
+    budget.deposit()
+    budget.deposit()
+    assert_that(budget.withdraw()).is_true()
@@ -0,0 +1,57 @@
+"""
+Tests for the Load Journal.
+"""
+
+from assertpy import assert_that
+
+from helpers.journal import LoadJournal, build_week_key
+
+
+def test_mark_complete(tmp_path):
+    """
+    Tests completed items are recorded per stage.
+    """
+    with LoadJournal(str(tmp_path / 'journal.db')) as journal:
+        journal.mark_complete('boxscore', 401437650, 120)
+        journal.mark_complete('schedule', build_week_key(2022, 1, '2'))
+
+        assert_that(journal.is_complete('boxscore', 401437650)).is_true()
+        assert_that(journal.is_complete('matchup', 401437650)).is_false()
+        assert_that(journal.is_complete('schedule', '2022-1-2')).is_true()
+        assert_that(journal.get_completed('boxscore', [401437650, 401437651])) \
+            .is_equal_to({'401437650'})
+        assert_that(journal.get_pending('boxscore', [401437651, 401437650])) \
+            .is_equal_to([401437651])
+
+
+def test_journal_survives_restart(tmp_path):
+    """
+    Tests completed items are read back after the journal is reopened.
+    """
+    path = str(tmp_path / 'journal.db')
+    with LoadJournal(path) as journal:
+        journal.mark_complete('matchup', 1)
+        journal.mark_complete('matchup', 1)
+        journal.mark_complete('boxscore', 2)
+
+    with LoadJournal(path) as journal:
+        assert_that(journal.get_completed('matchup', range(3))).is_equal_to({'1'})
+        journal.reset('matchup')
+        assert_that(journal.is_complete('matchup', 1)).is_false()
+        assert_that(journal.is_complete('boxscore', 2)).is_true()
+
+
+def test_payload_hash_survives_reset(tmp_path):
+    """
+    Tests payload hashes are compared per stage and kept when completions are reset.
+    """
+    with LoadJournal(str(tmp_path / 'journal.db')) as journal:
+        assert_that(journal.is_unchanged('boxscore', 1, 'abc')).is_false()
+        journal.record_hash('boxscore', 1, 'abc')
+        journal.mark_complete('boxscore', 1, 10)
+        journal.reset()
+
+        assert_that(journal.get_hash('boxscore', 1)).is_equal_to('abc')
+        assert_that(journal.is_unchanged('boxscore', 1, 'abc')).is_true()
+        assert_that(journal.is_unchanged('boxscore', 1, 'def')).is_false()
+        assert_that(journal.is_unchanged('matchup', 1, 'abc')).is_false()
@@ -0,0 +1,216 @@
+"""
+Tests for the Live Poller.
+"""
+
+from types import SimpleNamespace
+
+from assertpy import assert_that
+from football_data.models import Statistic
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from helpers.fetch_engine import BOX_SCORE, FetchResult
+from helpers.journal import LoadJournal
+from helpers.live import LivePoller, StatisticSnapshot, get_game_phase
+from helpers.poll_scheduler import PollScheduler
+from helpers.stat_batch import StatBatch
+from helpers.statistic_writer import StatisticWriter
+
+
+def build_payload(state: str, values: list[float]) -> dict:
+    """
+    Builds a game page payload carrying the player statistic values.
+    """
+    return {'page': {'content': {'gamepackage': {'gmStrp': {'statusState': state}}}},
+            'values': values}
+
+
+class MockHelper:
+    """
+    Box Score Helper stand in building one Statistic per payload value.
+    """
+
+    unresolved = []
+
+    @staticmethod
+    def preload_players(_box_score: dict) -> None:
+        pass
+
+    @staticmethod
+    def iter_statistics(box_score: dict, schedule_id: int, _away_schedule_id: int):
+        batch = StatBatch()
+        for index, value in enumerate(box_score['values']):
+            batch.append(1, schedule_id, value, 1, player_id=index + 1)
+        yield batch
+
+
+class MockEngine:
+    """
+    Fetch Engine stand in returning the next scripted payload of each game.
+    """
+
+    def __init__(self, payloads: dict[int, list[dict]]) -> None:
+        self.payloads = payloads
+        self.requests = []
+
+    def run(self, game_ids, page_types, callback) -> None:
+        self.requests.append(list(game_ids))
+        for game_id in game_ids:
+            for page_type in page_types:
+                callback(FetchResult(game_id, page_type, self.payloads[game_id].pop(0)))
+
+
+def build_writer(writer_class: type[StatisticWriter] = StatisticWriter) -> StatisticWriter:
+    """
+    Creates a Statistic Writer over an in memory database.
+    """
+    engine = create_engine('sqlite://')
+    Statistic.metadata.create_all(bind=engine)
+    writer = writer_class(sessionmaker(bind=engine, expire_on_commit=False))
+    writer.create_index()
+    return writer
+
+
+def test_get_game_phase():
+    """
+    Tests the game phase is read from the game strip.
+    """
+    halftime = build_payload('in', [])
+    halftime['page']['content']['gamepackage']['gmStrp']['status'] = {'det': 'Halftime'}
+
+    assert_that(get_game_phase(build_payload('in', []))).is_equal_to('in')
+    assert_that(get_game_phase(halftime)).is_equal_to('halftime')
+    assert_that(get_game_phase({})).is_equal_to('')
+
+
+def test_snapshot_diff():
+    """
+    Tests only new and changed Statistics are returned until applied.
+    """
+    snapshot = StatisticSnapshot()
+    first = StatBatch()
+    first.append(1, 1, 5.0, 1, player_id=1)
+    first.append(2, 1, 3.0, 1, player_id=1)
+    snapshot.apply(snapshot.diff(first))
+
+    second = StatBatch()
+    second.append(1, 1, 5.0, 1, player_id=1)
+    second.append(2, 1, 4.0, 1, player_id=1)
+    second.append(3, 1, 1.0, 1, team_id=2)
+    changed = list(snapshot.diff(second).rows())
+
+    assert_that(changed).extracting('statistic_code_id').is_equal_to([2, 3])
+    assert_that(snapshot.diff(second)).is_length(2)
+    assert_that(snapshot).is_length(2)
+
+
+class MockClock:
+    """
+    Clock advanced by the sleeps it records.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.delays = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, delay: float) -> None:
+        self.delays.append(delay)
+        self.now += delay
+
+
+def test_run_polls_from_kickoff_until_final():
+    """
+    Tests games are polled from shortly before kickoff at the cadence of their phase, only the
+    changed Statistics are written and final games stop being polled once stable.
+    """
+    schedules = {game_id: (SimpleNamespace(id=game_id), None) for game_id in (1, 2)}
+    engine = MockEngine({
+        1: [build_payload('in', [1, 2]), build_payload('in', [1, 3]),
+            build_payload('post', [1, 3])],
+        2: [build_payload('pre', []), build_payload('in', [7]), build_payload('post', [7])]
+    })
+    writer = build_writer()
+    clock = MockClock()
+    scheduler = PollScheduler({'in': 30, 'pre': 120}, kickoffs={2: 1000}, lead=300,
+                              stable_polls=1)
+    poller = LivePoller(MockHelper(), writer, schedules, engine=engine, scheduler=scheduler,
+                        sleep=clock.sleep, clock=clock)
+
+    total = poller.run()
+
+    assert_that(total).is_equal_to(4)
+    assert_that(engine.requests).is_equal_to([[1], [1], [1], [2], [2], [2]])
+    assert_that(clock.delays).is_equal_to([30, 30, 640, 120, 30])
+    with writer.maker() as session:
+        values = session.scalars(select(Statistic.value).order_by(Statistic.schedule_id,
+                                                                  Statistic.player_id)).all()
+    assert_that(values).is_equal_to([1, 3, 7])
+
+
+class FailingWriter(StatisticWriter):
+    """
+    Statistic Writer failing its first write.
+    """
+
+    failures = 1
+
+    def upsert(self, stats) -> int:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('Database Unavailable')
+        return super().upsert(stats)
+
+
+def test_run_retries_failed_writes():
+    """
+    Tests a failed write does not end the session and its changes are written by the next poll.
+    """
+    writer = build_writer(FailingWriter)
+    engine = MockEngine({1: [build_payload('post', [4, 5]), build_payload('post', [4, 5]),
+                             build_payload('post', [4, 5])]})
+    clock = MockClock()
+    poller = LivePoller(MockHelper(), writer, {1: (SimpleNamespace(id=1), None)}, engine=engine,
+                        scheduler=PollScheduler({'post': 60}, stable_polls=1),
+                        sleep=clock.sleep, clock=clock)
+
+    total = poller.run()
+
+    assert_that(total).is_equal_to(2)
+    assert_that(engine.requests).is_equal_to([[1], [1], [1]])
+    with writer.maker() as session:
+        values = session.scalars(select(Statistic.value).order_by(Statistic.player_id)).all()
+    assert_that(values).is_equal_to([4, 5])
+
+
+def test_run_skips_completed_games(tmp_path):
+    """
+    Tests games the journal completed are not polled and games finishing are marked complete.
+    """
+    journal = LoadJournal(str(tmp_path / 'journal.db'))
+    journal.mark_complete(BOX_SCORE, 1, 3)
+    engine = MockEngine({2: [build_payload('post', [5]), build_payload('post', [5])]})
+    writer = build_writer()
+    clock = MockClock()
+    poller = LivePoller(MockHelper(), writer,
+                        {game_id: (SimpleNamespace(id=game_id), None) for game_id in (1, 2)},
+                        engine=engine, scheduler=PollScheduler({'post': 60}, stable_polls=1),
+                        sleep=clock.sleep, clock=clock, journal=journal)
+
+    total = poller.run()
+
+    assert_that(total).is_equal_to(1)
+    assert_that(engine.requests).is_equal_to([[2], [2]])
+    assert_that(journal.is_complete(BOX_SCORE, 2)).is_true()
+    journal.close()
+
+
+def test_default_engine_bypasses_cache():
+    """
+    Tests the poller retrieves pages instead of reading cached payloads.
+    """
+    poller = LivePoller(MockHelper(), build_writer(), {})
+
+    assert_that(poller.engine.refresh).is_true()
@@ -0,0 +1,81 @@
+"""
+Tests for the Metrics.
+"""
+
+import asyncio
+import json
+
+from assertpy import assert_that
+
+from helpers.metrics import Metrics
+
+
+def test_timer_records_run_and_game():
+    """
+    Tests timers are aggregated for the run and attributed to the current game.
+    """
+    metrics = Metrics()
+    with metrics.timer('fetch.http'):
+        pass
+    with Metrics.game(401437650):
+        with metrics.timer('fetch.http'):
+            pass
+    metrics.increment('cache.hits', 2)
+
+    summary = metrics.summary()
+    assert_that(summary['timers']['fetch.http']).has_count(2)
+    assert_that(summary['counters']).is_equal_to({'cache.hits': 2})
+    assert_that(summary['games']).contains_key('401437650')
+    assert_that(summary['games']['401437650']).contains_key('fetch.http')
+
+
+def test_game_inherited_by_threads():
+    """
+    Tests asyncio.to_thread attributes timings to the game of the task.
+    """
+    metrics = Metrics()
+
+    def work():
+        with metrics.timer('fetch.http'):
+            pass
+
+    async def run():
+        with Metrics.game(1):
+            await asyncio.to_thread(work)
+
+    asyncio.run(run())
+    assert_that(metrics.summary()['games']).contains_only('1')
+
+
+def test_time_iter():
+    """
+    Tests time_iter passes the items through and records a single timing.
+    """
+    metrics = Metrics()
+    assert_that(list(metrics.time_iter('build', iter([1, 2, 3])))).is_equal_to([1, 2, 3])
+    assert_that(metrics.summary()['timers']['build']).has_count(1)
+
+
+def test_merge_and_export(tmp_path):
+    """
+    Tests merging worker summaries and exporting JSON and Prometheus text.
+    """
+    worker = Metrics()
+    worker.record('persist', 0.5, game_id=7)
+    worker.increment('statistics.written', 40)
+    metrics = Metrics()
+    metrics.record('persist', 1.5)
+    metrics.merge(worker.summary())
+    metrics.merge(worker.summary())
+
+    metrics.export(str(tmp_path))
+
+    with open(tmp_path / 'metrics.json', 'r', encoding='utf-8') as input_file:
+        summary = json.load(input_file)
+    assert_that(summary['timers']['persist']).is_equal_to({'count': 3, 'total': 2.5, 'max': 1.5})
+    assert_that(summary['games']['7']).is_equal_to({'persist': 1.0})
+
+    text = (tmp_path / 'metrics.prom').read_text(encoding='utf-8')
+    assert_that(text).contains('nfl_scrape_stage_seconds_total{stage="persist"} 2.5')
+    assert_that(text).contains('nfl_scrape_statistics_written_total 80')
+    assert_that(text).contains('nfl_scrape_game_stage_seconds{game_id="7",stage="persist"} 1.0')
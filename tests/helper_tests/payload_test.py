@@ -0,0 +1,143 @@
+"""
+Tests for the Payload Helper.
+"""
+
+import requests
+import responses
+from assertpy import assert_that
+
+from helpers.http_client import HttpClient
+from helpers.payload import PayloadFetcher, extract_payload
+from helpers.rate_limit import AdaptiveRateLimiter
+
+PAGE_URL = 'https://www.espn.com/nfl/boxscore/_/gameId/401437650'
+
+
+class MockPool:
+    """
+    Driver Pool stand in recording browser fallbacks.
+    """
+
+    def __init__(self) -> None:
+        self.urls = []
+
+    def fetch_payload(self, url: str) -> dict:
+        self.urls.append(url)
+        return {'source': 'browser'}
+
+
+def build_fetcher(pool: MockPool) -> PayloadFetcher:
+    """
+    Builds a Payload Fetcher with a Rate Limiter and retries that do not slow the tests down.
+    """
+    return PayloadFetcher(pool=pool, limiter=AdaptiveRateLimiter(1000, max_rate=1000),
+                          client=HttpClient(backoff=0))
+
+
+def build_html(script: str) -> str:
+    """
+    Builds a page wrapping the provided inline script.
+    Args:
+        script: Script body
+
+    Returns: HTML
+    """
+    return f"<html><head><script>{script}</script></head><body></body></html>"
+
+
+def test_extract_payload():
+    """
+    Tests extracting the payload from the inline script.
+    """
+    html = build_html(
+        "window['__espnfitt__']={\"page\":{\"content\":{\"text\":\"a};b\"}}};")
+    result = extract_payload(html)
+    assert_that(result).is_equal_to({'page': {'content': {'text': 'a};b'}}})
+
+
+def test_extract_payload_attribute_assignment():
+    """
+    Tests extracting the payload assigned as an attribute.
+    """
+    html = build_html('window.__espnfitt__ = {"page": {}};')
+    assert_that(extract_payload(html)).is_equal_to({'page': {}})
+
+
+def test_extract_payload_not_present():
+    """
+    Tests a page without the payload.
+    """
+    assert_that(extract_payload(build_html('var x = 1;'))).is_none()
+
+
+def test_extract_payload_invalid_json():
+    """
+    Tests a truncated payload.
+    """
+    assert_that(extract_payload(build_html("window['__espnfitt__']={\"page\":"))).is_none()
+
+
+@responses.activate
+def test_fetch_without_browser():
+    """
+    Tests the payload is returned from the HTML without using the browser.
+    """
+    responses.get(PAGE_URL, body=build_html("window['__espnfitt__']={\"page\":{}};"))
+    pool = MockPool()
+    fetcher = build_fetcher(pool)
+
+    assert_that(fetcher.fetch(PAGE_URL)).is_equal_to({'page': {}})
+    assert_that(pool.urls).is_empty()
+
+
+@responses.activate
+def test_fetch_falls_back_to_browser():
+    """
+    Tests the browser is used when the payload cannot be extracted.
+    """
+    responses.get(PAGE_URL, body=build_html('var x = 1;'))
+    pool = MockPool()
+    fetcher = build_fetcher(pool)
+
+    assert_that(fetcher.fetch(PAGE_URL)).is_equal_to({'source': 'browser'})
+    assert_that(pool.urls).contains(PAGE_URL)
+
+
+@responses.activate
+def test_fetch_error_status_skips_browser():
+    """
+    Tests a page returning an error is not retried in the browser.
+    """
+    responses.get(PAGE_URL, status=404)
+    pool = MockPool()
+    fetcher = build_fetcher(pool)
+
+    assert_that(fetcher.fetch(PAGE_URL)).is_none()
+    assert_that(pool.urls).is_empty()
+
+
+@responses.activate
+def test_fetch_connection_error_skips_browser():
+    """
+    Tests a page that cannot be connected to is not retried in the browser.
+    """
+    responses.get(PAGE_URL, body=requests.ConnectionError('Connection Refused'))
+    pool = MockPool()
+    fetcher = build_fetcher(pool)
+
+    assert_that(fetcher.fetch(PAGE_URL)).is_none()
+    assert_that(pool.urls).is_empty()
+
+
+@responses.activate
+def test_fetch_throttled_reduces_rate():
+    """
+    Tests a throttled response is retried, cutting the request rate before the healthy
+    response raises it.
+    """
+    responses.get(PAGE_URL, status=429, headers={'Retry-After': '0'})
+    responses.get(PAGE_URL, body=build_html("window['__espnfitt__']={\"page\":{}};"))
+    fetcher = build_fetcher(MockPool())
+
+    assert_that(fetcher.fetch_html(PAGE_URL)).contains('__espnfitt__')
+    assert_that(fetcher.limiter.rate).is_between(500, 501)
@@ -3,7 +3,8 @@ Player Helper Tests
 """
 
 from assertpy import assert_that
-from helpers.player import PlayerHelper
+from helpers.payload import set_payload_fetcher
+from helpers.player import PlayerCache, PlayerHelper
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine, select
 from football_data.models import Player, Position
@@ -68,3 +69,168 @@ def test_resolve_player_not_present():
     items = list(session.scalars(select(Player)).all())
     assert_that(items).is_not_empty().is_length(2)
     assert_that(result).is_not_none()
+
+
+def test_resolve_player_uses_cache():
+    """
+    Tests a resolved Player is served from the cache.
+    """
+    maker = build_maker()
+    player_repo = PlayerRepository(maker)
+    player_repo.save(Player(id=1, name='Josh Allen',
+                            url='https://www.espn.com/nfl/player/_/id/3918298/josh-allen'))
+
+    cache = PlayerCache()
+    helper = PlayerHelper(maker, cache)
+    helper.resolve_player('https://www.espn.com/nfl/player/_/id/3918298/josh-allen')
+    result = PlayerHelper(maker, cache).resolve_player(
+        'https://www.espn.com/nfl/player/_/id/3918298/josh-allen')
+
+    assert_that(result).is_not_none()
+    assert_that(result.id).is_equal_to(1)
+    assert_that(cache.hits).is_equal_to(1)
+    assert_that(cache.misses).is_equal_to(1)
+
+
+def test_player_cache_negative_entry():
+    """
+    Tests an unresolved Url is cached without a Player.
+    """
+    cache = PlayerCache()
+    cache.put('https://www.espn.com/nfl/player/_/id/1/missing', None)
+
+    assert_that(cache.lookup('https://www.espn.com/nfl/player/_/id/1/missing')) \
+        .is_equal_to((True, None))
+    assert_that(cache.lookup('https://www.espn.com/nfl/player/_/id/2/other')) \
+        .is_equal_to((False, None))
+
+
+def test_player_cache_evicts_least_recently_used():
+    """
+    Tests the cache is bounded to the maximum size.
+    """
+    cache = PlayerCache(max_size=2)
+    cache.put('a', Player(name='A', url='a'))
+    cache.put('b', Player(name='B', url='b'))
+    cache.lookup('a')
+    cache.put('c', Player(name='C', url='c'))
+
+    assert_that(len(cache)).is_equal_to(2)
+    assert_that(cache.lookup('b')[0]).is_false()
+    assert_that(cache.lookup('a')[0]).is_true()
+
+
+class MockPlayerHelper(PlayerHelper):
+    """
+    Player Helper building Players without retrieving their pages.
+    """
+
+    def __init__(self, maker: sessionmaker, cache: PlayerCache | None = None) -> None:
+        super().__init__(maker, cache)
+        self.built = []
+
+    def build_player(self, url: str) -> Player | None:
+        self.built.append(url)
+        if url.endswith('unknown'):
+            return None
+        if url.endswith('broken'):
+            raise ValueError('Position Not Found')
+        return Player(name='Rookie', url=url)
+
+
+def test_resolve_players():
+    """
+    Tests resolving a batch of Players, building only the missing ones.
+    """
+    maker = build_maker()
+    player_repo = PlayerRepository(maker)
+    player_repo.save(Player(name='Josh Allen', url='http://test/josh-allen'))
+    player_repo.save(Player(name='Stefon Diggs', url='http://test/stefon-diggs'))
+
+    cache = PlayerCache()
+    helper = MockPlayerHelper(maker, cache)
+    result = helper.resolve_players(['http://test/josh-allen', 'http://test/stefon-diggs',
+                                     'http://test/rookie', 'http://test/josh-allen',
+                                     'http://test/unknown', ''])
+
+    assert_that(result).is_length(4)
+    assert_that(result['http://test/josh-allen'].name).is_equal_to('Josh Allen')
+    assert_that(result['http://test/rookie'].name).is_equal_to('Rookie')
+    assert_that(result['http://test/unknown']).is_none()
+    assert_that(helper.built).contains_only('http://test/rookie', 'http://test/unknown')
+    assert_that(len(cache)).is_equal_to(4)
+
+    helper.resolve_players(['http://test/rookie', 'http://test/unknown'])
+    assert_that(helper.built).is_length(2)
+
+
+class MockFetcher:
+    """
+    Payload Fetcher stand in failing the pages of Urls ending in failed, returning a long snapper
+    for Urls ending in rookie and pages without an athlete otherwise.
+    """
+
+    @staticmethod
+    def fetch(url: str, **_kwargs) -> dict | None:
+        if url.endswith('failed'):
+            return None
+        if url.endswith('rookie'):
+            return {'page': {'content': {'player': {'plyrHdr': {'ath': {
+                'dspNm': 'Rookie', 'posAbv': 'LS'}}}}}}
+        return {'page': {'content': {'player': {}}}}
+
+
+def test_resolve_players_retries_failed_pages():
+    """
+    Tests a page without an athlete is cached as unresolved while a page that could not be
+    retrieved is left out of the cache to be retried.
+    """
+    cache = PlayerCache()
+    helper = PlayerHelper(build_maker(), cache)
+    set_payload_fetcher(MockFetcher())
+    try:
+        result = helper.resolve_players(['http://test/failed', 'http://test/retired'])
+        single = helper.resolve_player('http://test/other-failed')
+    finally:
+        set_payload_fetcher(None)
+
+    assert_that(result).is_equal_to({'http://test/failed': None, 'http://test/retired': None})
+    assert_that(single).is_none()
+    assert_that(cache.lookup('http://test/retired')).is_equal_to((True, None))
+    assert_that(cache.lookup('http://test/failed')[0]).is_false()
+    assert_that(cache.lookup('http://test/other-failed')[0]).is_false()
+
+
+def test_resolve_players_isolates_build_failures():
+    """
+    Tests a Player failing to build is left unresolved and uncached without stopping the others.
+    """
+    cache = PlayerCache()
+    helper = MockPlayerHelper(build_maker(), cache)
+
+    result = helper.resolve_players(['http://test/broken', 'http://test/rookie'])
+
+    assert_that(result['http://test/broken']).is_none()
+    assert_that(result['http://test/rookie'].name).is_equal_to('Rookie')
+    assert_that(cache.lookup('http://test/broken')[0]).is_false()
+    assert_that(cache.lookup('http://test/rookie')[0]).is_true()
+
+
+def test_build_player_unknown_position():
+    """
+    Tests a Player whose position is not in the Database is saved without one.
+    """
+    maker = build_maker()
+    cache = PlayerCache()
+    helper = PlayerHelper(maker, cache)
+    set_payload_fetcher(MockFetcher())
+    try:
+        player = helper.resolve_player('http://test/rookie')
+    finally:
+        set_payload_fetcher(None)
+
+    assert_that(player).is_not_none()
+    assert_that(player.position_id).is_none()
+    assert_that(PlayerRepository(maker).get_player(url='http://test/rookie').name) \
+        .is_equal_to('Rookie')
+    assert_that(cache.lookup('http://test/rookie')[1]).is_same_as(player)
@@ -0,0 +1,50 @@
+"""
+Tests for the Poll Scheduler.
+"""
+
+from assertpy import assert_that
+
+from helpers.poll_scheduler import PollScheduler
+
+
+def test_add_waits_for_kickoff():
+    """
+    Tests games wake shortly before kickoff and right away without a kickoff time.
+    """
+    scheduler = PollScheduler(kickoffs={1: 1000, 2: 100}, lead=300)
+    for game_id in (1, 2, 3):
+        scheduler.add(game_id, 200)
+
+    assert_that(scheduler.next_due()).is_equal_to(200)
+    assert_that(sorted(scheduler.pop_due(200))).is_equal_to([2, 3])
+    assert_that(scheduler.pop_due(699)).is_empty()
+    assert_that(scheduler.pop_due(700)).is_equal_to([1])
+    assert_that(scheduler.next_due()).is_none()
+
+
+def test_reschedule_uses_phase_cadence():
+    """
+    Tests the next poll follows the cadence of the phase.
+    """
+    scheduler = PollScheduler({'pre': 120, 'in': 30, 'halftime': 600})
+    scheduler.reschedule(1, 'pre', 0, False)
+    scheduler.reschedule(2, 'in', 0, True)
+    scheduler.reschedule(3, 'halftime', 0, False)
+
+    assert_that(scheduler.pop_due(30)).is_equal_to([2])
+    assert_that(scheduler.pop_due(120)).is_equal_to([1])
+    assert_that(scheduler.pop_due(600)).is_equal_to([3])
+
+
+def test_reschedule_drops_stable_final_games():
+    """
+    Tests final games are polled until unchanged for the stable poll count.
+    """
+    scheduler = PollScheduler({'post': 60}, stable_polls=2)
+
+    assert_that(scheduler.reschedule(1, 'post', 0, True)).is_true()
+    assert_that(scheduler.reschedule(1, 'post', 60, False)).is_true()
+    assert_that(scheduler.reschedule(1, 'post', 120, True)).is_true()
+    assert_that(scheduler.reschedule(1, 'post', 180, False)).is_true()
+    assert_that(scheduler.reschedule(1, 'post', 240, False)).is_false()
+    assert_that(scheduler).is_length(4)
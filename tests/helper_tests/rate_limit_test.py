@@ -0,0 +1,88 @@
+"""
+Tests for the Adaptive Rate Limiter.
+"""
+
+import threading
+
+from assertpy import assert_that
+
+from helpers.rate_limit import AdaptiveRateLimiter
+
+
+class MockClock:
+    """
+    Clock stand in advanced by the tests.
+    """
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_reserve_paces_requests():
+    """
+    Tests request slots are spaced by the rate.
+    """
+    limiter = AdaptiveRateLimiter(4, clock=MockClock())
+
+    assert_that([limiter.reserve() for _ in range(3)]).is_equal_to([0, 0.25, 0.5])
+
+
+def test_additive_increase_multiplicative_decrease():
+    """
+    Tests healthy responses raise the rate up to the maximum and failures halve it once per
+    request interval.
+    """
+    clock = MockClock()
+    limiter = AdaptiveRateLimiter(2, max_rate=3, increase=1, clock=clock)
+
+    limiter.record_success()
+    assert_that(limiter.rate).is_equal_to(2.5)
+    for _ in range(10):
+        limiter.record_success()
+    assert_that(limiter.rate).is_equal_to(3)
+
+    assert_that(limiter.record_failure()).is_true()
+    assert_that(limiter.record_failure()).is_false()
+    assert_that(limiter.rate).is_equal_to(1.5)
+
+    clock.now += 1
+    limiter.record_failure()
+    assert_that(limiter.rate).is_equal_to(0.75)
+
+
+def test_retry_after_delays_next_slot():
+    """
+    Tests a Retry-After delay pushes back the next request.
+    """
+    clock = MockClock()
+    limiter = AdaptiveRateLimiter(10, min_rate=10, clock=clock)
+
+    limiter.record_failure(retry_after=5)
+
+    assert_that(limiter.reserve()).is_equal_to(5)
+
+
+def test_shared_between_threads():
+    """
+    Tests concurrent reservations receive distinct slots.
+    """
+    limiter = AdaptiveRateLimiter(10, clock=MockClock())
+    delays = []
+    lock = threading.Lock()
+
+    def reserve():
+        delay = limiter.reserve()
+        with lock:
+            delays.append(delay)
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert_that(sorted(round(delay, 6) for delay in delays)) \
+        .is_equal_to([round(index / 10, 6) for index in range(8)])
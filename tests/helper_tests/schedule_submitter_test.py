@@ -0,0 +1,80 @@
+"""
+Tests for the Schedule Submitter.
+"""
+
+import json
+
+import responses
+from assertpy import assert_that
+
+from helpers.http_client import HttpClient
+from helpers.schedule_submitter import ScheduleSubmitter, chunk_entries
+
+BATCH_URL = 'http://localhost/api/schedule/batch'
+
+
+def build_entries(count: int) -> list[dict]:
+    """
+    Builds Schedule entries.
+    """
+    return [{'gameId': game_id, 'week': 1, 'year': 2022, 'typeCode': '2', 'homeTeam': 'KC',
+             'awayTeam': 'LV', 'url': ''} for game_id in range(1, count + 1)]
+
+
+def test_chunk_entries():
+    """
+    Tests entries are split into chunks of the batch size.
+    """
+    chunks = list(chunk_entries(build_entries(5), 2))
+
+    assert_that([len(chunk) for chunk in chunks]).is_equal_to([2, 2, 1])
+
+
+@responses.activate
+def test_submit_batches_entries():
+    """
+    Tests entries are posted as JSON arrays in chunks.
+    """
+    responses.post(BATCH_URL, json={'failed': []})
+    submitter = ScheduleSubmitter(BATCH_URL, batch_size=3, workers=2,
+                                  client=HttpClient(backoff=0))
+
+    failed = submitter.submit(build_entries(7))
+
+    assert_that(failed).is_empty()
+    bodies = [json.loads(call.request.body) for call in responses.calls]
+    assert_that(sorted(len(body) for body in bodies)).is_equal_to([1, 3, 3])
+    assert_that(sorted(entry['gameId'] for body in bodies for entry in body)) \
+        .is_equal_to(list(range(1, 8)))
+
+
+@responses.activate
+def test_submit_retries_only_failed_entries():
+    """
+    Tests only the entries reported as failed are submitted again.
+    """
+    responses.post(BATCH_URL, json={'failed': [2]})
+    responses.post(BATCH_URL, json={'failed': []})
+    submitter = ScheduleSubmitter(BATCH_URL, batch_size=5, client=HttpClient(backoff=0))
+
+    failed = submitter.submit(build_entries(3))
+
+    assert_that(failed).is_empty()
+    assert_that(responses.calls).is_length(2)
+    assert_that(json.loads(responses.calls[1].request.body)).is_length(1)
+    assert_that(json.loads(responses.calls[1].request.body)[0]['gameId']).is_equal_to(2)
+
+
+@responses.activate
+def test_submit_returns_entries_failing_every_attempt():
+    """
+    Tests a rejected chunk is resubmitted whole and returned once the attempts run out.
+    """
+    responses.post(BATCH_URL, status=400)
+    submitter = ScheduleSubmitter(BATCH_URL, batch_size=5, attempts=2,
+                                  client=HttpClient(backoff=0))
+
+    failed = submitter.submit(build_entries(2))
+
+    assert_that([entry['gameId'] for entry in failed]).is_equal_to([1, 2])
+    assert_that(responses.calls).is_length(2)
@@ -4,10 +4,11 @@ Schedule Helper Tests
 
 from src.helpers.schedule import ScheduleHelper
 from assertpy import assert_that
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event as sql_event
 from sqlalchemy.orm import sessionmaker
 from football_data.models import Team, Schedule
-from football_data.repositories import TeamRepository
+from football_data.repositories import ScheduleRepository, TeamRepository
+
 import json
 
 
@@ -61,3 +62,58 @@ def test_convert_event_no_teams():
     helper = ScheduleHelper(maker)
     result = helper.convert_event(event, 1, 1, 2022)
     assert_that(result).is_empty()
+
+
+def test_convert_schedule():
+    """
+    Tests converting every event in the Schedule payload.
+    """
+    with open('./tests/test_files/schedule.json', 'r', encoding='utf-8') as input_file:
+        payload = json.load(input_file)
+    maker = create_maker()
+
+    helper = ScheduleHelper(maker)
+    result = helper.convert_schedule(payload, 2, 1, 2022)
+
+    events = [event for day in payload['page']['content']['events'].values() for event in day]
+    assert_that(result).is_length(len(events) * 2)
+    assert_that(list(filter(lambda x: x.is_home, result))).is_length(len(events))
+
+
+def test_convert_schedule_inserts_missing_only():
+    """
+    Tests converting the Schedule again reuses the stored entries and inserts them in bulk.
+    """
+    with open('./tests/test_files/schedule.json', 'r', encoding='utf-8') as input_file:
+        payload = json.load(input_file)
+    maker = create_maker()
+    statements = []
+    sql_event.listen(maker.kw['bind'], 'before_cursor_execute',
+                     lambda *args: statements.append(args[2]))
+
+    helper = ScheduleHelper(maker)
+    first = helper.convert_schedule(payload, 2, 1, 2022)
+    inserts = [statement for statement in statements if statement.startswith('INSERT')]
+    selects = [statement for statement in statements if statement.startswith('SELECT')]
+    second = helper.convert_schedule(payload, 2, 1, 2022)
+
+    assert_that(first).extracting('id').does_not_contain(None)
+    assert_that(second).extracting('id').is_equal_to([schedule.id for schedule in first])
+    assert_that(ScheduleRepository(maker).get_schedules(year=2022, week=1)) \
+        .is_length(len(first))
+    assert_that(selects).is_length(3)
+    assert_that([statement for statement in inserts if 'INTO schedule' in statement]) \
+        .is_length(1)
+
+
+def test_get_kickoffs():
+    """
+    Tests the kickoff time of every event is read from the Schedule payload.
+    """
+    with open('./tests/test_files/schedule.json', 'r', encoding='utf-8') as input_file:
+        payload = json.load(input_file)
+
+    kickoffs = ScheduleHelper.get_kickoffs(payload)
+
+    assert_that(kickoffs).contains_key(401437654, 401437650)
+    assert_that(kickoffs[401437650]).is_equal_to(1662915600.0)
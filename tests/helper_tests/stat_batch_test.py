@@ -0,0 +1,61 @@
+"""
+Tests for the Stat Batch.
+"""
+
+from assertpy import assert_that
+from football_data.models import Statistic
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from helpers.stat_batch import StatBatch
+from helpers.statistic_writer import StatisticWriter
+
+
+def build_batch() -> StatBatch:
+    """
+    Builds a batch with a player and a team statistic.
+    """
+    batch = StatBatch()
+    batch.append(1, 10, 81.0, 1, player_id=5)
+    batch.append(2, 10, 33.0, 4, team_id=7)
+    return batch
+
+
+def test_rows():
+    """
+    Tests rows are read from the columns with missing ids as None.
+    """
+    rows = list(build_batch().rows())
+
+    assert_that(rows).is_length(2)
+    assert_that(rows[0]).is_equal_to({'statistic_code_id': 1, 'schedule_id': 10, 'value': 81.0,
+                                      'category_id': 1, 'player_id': 5, 'team_id': None})
+    assert_that(rows[1]).has_player_id(None).has_team_id(7)
+
+
+def test_to_statistics_and_extend():
+    """
+    Tests converting to Statistics and combining batches.
+    """
+    batch = build_batch()
+    batch.extend(StatBatch.from_statistics(
+        [Statistic(statistic_code_id=3, schedule_id=11, value=2.0, category_id=1, player_id=6)]))
+
+    stats = batch.to_statistics()
+
+    assert_that(batch).is_length(3)
+    assert_that(stats).extracting('statistic_code_id').is_equal_to([1, 2, 3])
+    assert_that(stats).extracting('team_id').is_equal_to([None, 7, None])
+
+
+def test_writer_accepts_batch():
+    """
+    Tests the Statistic Writer inserts a batch without converting it.
+    """
+    engine = create_engine('sqlite://')
+    Statistic.metadata.create_all(bind=engine)
+    maker = sessionmaker(bind=engine, expire_on_commit=False)
+
+    assert_that(StatisticWriter(maker).upsert(build_batch())).is_equal_to(2)
+    with maker() as session:
+        assert_that(session.scalar(select(func.count()).select_from(Statistic))).is_equal_to(2)
@@ -0,0 +1,148 @@
+"""
+Tests for the Statistic Writer.
+"""
+
+import pytest
+from assertpy import assert_that
+from football_data.models import Statistic
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from helpers.stat_batch import StatBatch
+from helpers.statistic_writer import StatisticWriter, chunk_rows
+
+
+def build_maker() -> sessionmaker:
+    """
+    Creates the Session Maker
+    """
+    engine = create_engine('sqlite://')
+    Statistic.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def build_stats(count: int):
+    """
+    Generates Player Statistics.
+    """
+    for index in range(count):
+        yield Statistic(statistic_code_id=index % 10, schedule_id=1, value=float(index),
+                        category_id=1, player_id=index)
+
+
+def count_stats(maker: sessionmaker) -> int:
+    """
+    Counts the saved Statistics.
+    """
+    with maker() as session:
+        return session.scalar(select(func.count()).select_from(Statistic))
+
+
+def test_chunk_rows():
+    """
+    Tests Statistics are converted to rows in chunks.
+    """
+    chunks = list(chunk_rows(build_stats(5), 2))
+    assert_that([len(chunk) for chunk in chunks]).is_equal_to([2, 2, 1])
+    assert_that(chunks[0][1]).is_equal_to({'statistic_code_id': 1, 'schedule_id': 1,
+                                           'value': 1.0, 'category_id': 1, 'player_id': 1,
+                                           'team_id': None})
+
+
+def test_chunk_rows_streamed_batches():
+    """
+    Tests a stream of Stat Batches is chunked across batch boundaries.
+    """
+    def stream():
+        for index in range(3):
+            yield StatBatch.from_statistics(build_stats(index + 1))
+
+    chunks = list(chunk_rows(stream(), 4))
+    assert_that([len(chunk) for chunk in chunks]).is_equal_to([4, 2])
+    assert_that(chunks[1][1]).contains_entry({'value': 2.0}, {'player_id': 2})
+
+
+def test_write():
+    """
+    Tests writing Statistics across several chunks.
+    """
+    maker = build_maker()
+    writer = StatisticWriter(maker, chunk_size=100)
+
+    assert_that(writer.write(build_stats(250))).is_equal_to(250)
+    assert_that(count_stats(maker)).is_equal_to(250)
+
+    with maker() as session:
+        stat = session.scalars(select(Statistic).where(Statistic.player_id == 42)).first()
+    assert_that(stat.value).is_equal_to(42.0)
+    assert_that(stat.team_id).is_none()
+
+
+def test_write_empty():
+    """
+    Tests writing no Statistics.
+    """
+    maker = build_maker()
+    assert_that(StatisticWriter(maker).write([])).is_zero()
+    assert_that(count_stats(maker)).is_zero()
+
+
+def test_write_rolls_back_on_failure():
+    """
+    Tests a failure part way through leaves no Statistics behind.
+    """
+    maker = build_maker()
+
+    def failing_stats():
+        yield from build_stats(5)
+        raise ValueError('Build Failed')
+
+    try:
+        StatisticWriter(maker, chunk_size=2).write(failing_stats())
+    except ValueError:
+        pass
+    assert_that(count_stats(maker)).is_zero()
+
+
+def test_upsert_replaces_existing_values():
+    """
+    Tests upserting replaces the value of Statistics with the same natural key.
+    """
+    maker = build_maker()
+    writer = StatisticWriter(maker, chunk_size=3)
+    writer.create_index()
+    writer.create_index()
+
+    writer.upsert(build_stats(5))
+    writer.upsert([Statistic(statistic_code_id=2, schedule_id=1, value=99.0, category_id=1,
+                             player_id=2),
+                   Statistic(statistic_code_id=1, schedule_id=1, value=7.0, category_id=1,
+                             team_id=3)])
+
+    with maker() as session:
+        stats = list(session.scalars(select(Statistic)).all())
+    assert_that(stats).is_length(6)
+    assert_that([stat.value for stat in stats if stat.player_id == 2]).is_equal_to([99.0])
+    assert_that([stat.value for stat in stats if stat.team_id == 3]).is_equal_to([7.0])
+
+
+def test_upsert_duplicate_keys_in_batch():
+    """
+    Tests the last Statistic wins when a batch repeats a natural key.
+    """
+    maker = build_maker()
+    writer = StatisticWriter(maker)
+    count = writer.upsert([Statistic(statistic_code_id=1, schedule_id=1, value=value,
+                                     category_id=1, team_id=1) for value in (1.0, 2.0)])
+
+    assert_that(count).is_equal_to(1)
+    with maker() as session:
+        assert_that(list(session.scalars(select(Statistic.value)))).is_equal_to([2.0])
+
+
+def test_build_upsert_unsupported_dialect():
+    """
+    Tests building an upsert for a dialect without one is rejected.
+    """
+    with pytest.raises(ValueError, match='mysql'):
+        StatisticWriter.build_upsert('mysql')
@@ -165,3 +165,27 @@ def test_convert_value_time():
     """
 
     assert_that(MatchUpHelper.convert_value('1:10')).is_equal_to(70)
+
+
+def test_build_statistics():
+    """
+    Tests building the statistics for both teams from the match up payload.
+    """
+    maker = build_maker()
+    load_stats_codes(maker)
+    repo = StatisticCodeRepository(maker)
+    repo.save(StatisticCategory(code='T', description='Team'))
+    payload = {'page': {'content': {'gamepackage': load_test_file()}}}
+    helper = MatchUpHelper(maker)
+
+    schedule = Schedule(id=1, team_id=10, opponent_id=20, year_value=2022, week_number=1,
+                        game_id=1, url='', type_id=2, is_home=True)
+    opponent = Schedule(id=2, team_id=20, opponent_id=10, year_value=2022, week_number=1,
+                        game_id=1, url='', type_id=2, is_home=False)
+    result = helper.build_statistics(payload, schedule, opponent)
+
+    assert_that(result).is_length(52)
+    assert_that(list(filter(lambda x: x.team_id == 10 and x.schedule_id == 1, result))) \
+        .is_length(26)
+    assert_that(list(filter(lambda x: x.team_id == 20 and x.schedule_id == 2, result))) \
+        .is_length(26)
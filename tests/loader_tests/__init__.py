@@ -0,0 +1,7 @@
+"""
+Test Initialization
+"""
+
+import sys
+
+sys.path.append('./src')
\ No newline at end of file
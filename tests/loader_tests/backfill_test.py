@@ -0,0 +1,236 @@
+"""
+Tests for the Backfill Script.
+"""
+
+import csv
+import json
+from concurrent.futures import Future
+
+import pytest
+from assertpy import assert_that
+from football_data.models import Schedule, StatisticCategory, StatisticCode, TypeCode
+from football_data.repositories import StatisticCodeRepository, TypeCodeRepository
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import backfill
+from helpers.fetch_engine import BOX_SCORE, MATCHUP
+from helpers.journal import LoadJournal, build_week_key
+from helpers.metrics import Metrics, set_metrics
+from helpers.payload import set_payload_fetcher
+
+TEST_FILES = './tests/test_files'
+
+
+class MockFetcher:
+    """
+    Payload Fetcher stand in returning the test Schedule and Match Up, failing the pages listed.
+    """
+
+    def __init__(self, failing: tuple[str, ...] = ()) -> None:
+        self.failing = failing
+        self.urls = []
+
+    def fetch(self, url: str, **_kwargs) -> dict | None:
+        self.urls.append(url)
+        if any(f'/{page}/' in url for page in self.failing):
+            raise RuntimeError(f'Failed to fetch {url}')
+        name = 'schedule.json' if '/schedule/' in url else 'matchup.json'
+        with open(f'{TEST_FILES}/{name}', 'r', encoding='utf-8') as input_file:
+            return json.load(input_file)
+
+
+class InlineExecutor:
+    """
+    Process Pool stand in running the initializer and every job in the calling thread.
+    """
+
+    def __init__(self, max_workers=None, initializer=None, initargs=()) -> None:
+        self.max_workers = max_workers
+        if initializer:
+            initializer(*initargs)
+
+    def __enter__(self) -> 'InlineExecutor':
+        return self
+
+    def __exit__(self, *_args) -> None:
+        pass
+
+    @staticmethod
+    def submit(job, *job_args) -> Future:
+        future = Future()
+        try:
+            future.set_result(job(*job_args))
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            future.set_exception(error)
+        return future
+
+
+class RecordingExecutor:
+    """
+    Process Pool stand in recording the submitted jobs without running them.
+    """
+
+    def __init__(self) -> None:
+        self.jobs = []
+
+    def submit(self, job, *job_args) -> Future:
+        self.jobs.append((job, *job_args))
+        return Future()
+
+
+def build_maker() -> sessionmaker:
+    """
+    Creates an in memory Session Maker with the Schedule Type and Team Statistic Codes.
+    """
+    engine = create_engine('sqlite://')
+    Schedule.metadata.create_all(bind=engine)
+    maker = sessionmaker(bind=engine, expire_on_commit=False)
+    TypeCodeRepository(maker).save(TypeCode(code='2', description='Regular Season'))
+    repo = StatisticCodeRepository(maker)
+    repo.save(StatisticCategory(code='T', description='Team'))
+    with open(f'{TEST_FILES}/team_statistic_codes.csv', 'r', encoding='utf-8') as input_file:
+        for item in csv.DictReader(input_file):
+            repo.save(StatisticCode(code=item.get('code', ''),
+                                    description=item.get('description', ''),
+                                    grouping=item.get('grouping', '')))
+    return maker
+
+
+@pytest.fixture(name='fetcher')
+def fetcher_fixture():
+    """
+    Installs the stand in Payload Fetcher.
+    """
+    fetcher = MockFetcher()
+    set_payload_fetcher(fetcher)
+    yield fetcher
+    set_payload_fetcher(None)
+    set_metrics(Metrics())
+
+
+@pytest.fixture(name='worker')
+def worker_fixture(fetcher, tmp_path, monkeypatch):  # pylint: disable=unused-argument
+    """
+    Installs a Worker over an in memory database with a journal.
+    """
+    worker = backfill.Worker(build_maker(), LoadJournal(str(tmp_path / 'journal.db')))
+    monkeypatch.setattr(backfill, '_WORKER', worker)
+    yield worker
+    worker.journal.close()
+
+
+def test_parse_range():
+    """
+    Tests parsing values and inclusive ranges.
+    """
+    assert_that(backfill.parse_range('2018-2020,2022')).is_equal_to([2018, 2019, 2020, 2022])
+    assert_that(backfill.parse_range(' 1, 3-4 ,')).is_equal_to([1, 3, 4])
+    assert_that(backfill.parse_range('5-5')).is_equal_to([5])
+    assert_that(backfill.parse_range('')).is_empty()
+
+
+@pytest.mark.parametrize('value', ['a', '2018-x', '1-', '2020-2018'])
+def test_parse_range_invalid(value):
+    """
+    Tests values that are not numbers and ranges ending before they start are rejected.
+    """
+    with pytest.raises(ValueError):
+        backfill.parse_range(value)
+
+
+def test_build_weeks():
+    """
+    Tests every week is expanded for every type, in year then type order.
+    """
+    weeks = backfill.build_weeks([2021, 2022], [1, 2], ['2', '3'])
+
+    assert_that(weeks).is_equal_to([
+        (2021, 1, '2'), (2021, 2, '2'), (2021, 1, '3'), (2021, 2, '3'),
+        (2022, 1, '2'), (2022, 2, '2'), (2022, 1, '3'), (2022, 2, '3')])
+
+
+def test_run_schedule_job_skips_journaled_weeks(worker, fetcher):
+    """
+    Tests a stored week is journaled and listed from the database by the next run.
+    """
+    game_ids = backfill.run_schedule_job(2022, 1, '2')
+    listed = backfill.run_schedule_job(2022, 1, '2')
+
+    assert_that(game_ids).is_not_empty().is_sorted()
+    assert_that(listed).is_equal_to(game_ids)
+    assert_that(fetcher.urls).is_length(1)
+    assert_that(worker.journal.is_complete(backfill.SCHEDULE,
+                                           build_week_key(2022, 1, '2'))).is_true()
+
+
+def test_run_schedule_job_unknown_type(worker):
+    """
+    Tests a week of an unknown Schedule Type loads nothing.
+    """
+    assert_that(backfill.run_schedule_job(2022, 1, '9')).is_empty()
+    assert_that(worker.journal.is_complete(backfill.SCHEDULE,
+                                           build_week_key(2022, 1, '9'))).is_false()
+
+
+def test_run_game_job_skips_journaled_games(worker, fetcher):
+    """
+    Tests a loaded game is journaled and skipped by the next run without fetching it.
+    """
+    game_id = backfill.run_schedule_job(2022, 1, '2')[0]
+
+    count = backfill.run_game_job(MATCHUP, 2022, 1, '2', game_id)
+    skipped = backfill.run_game_job(MATCHUP, 2022, 1, '2', game_id)
+
+    assert_that(count).is_positive()
+    assert_that(skipped).is_zero()
+    assert_that([url for url in fetcher.urls if '/matchup/' in url]).is_length(1)
+    assert_that(worker.journal.is_complete(MATCHUP, game_id)).is_true()
+
+
+def test_run_game_job_unknown_game(worker, fetcher):
+    """
+    Tests a game without a Schedule is not fetched or journaled.
+    """
+    assert_that(backfill.run_game_job(MATCHUP, 2022, 1, '2', 1)).is_zero()
+    assert_that(fetcher.urls).is_empty()
+    assert_that(worker.journal.is_complete(MATCHUP, 1)).is_false()
+
+
+def test_submit_games():
+    """
+    Tests a job is submitted for every game and selected stage.
+    """
+    executor = RecordingExecutor()
+    pending = {}
+    week = (2022, 1, '2')
+
+    backfill.submit_games(executor, pending, week, [10, 11], [backfill.SCHEDULE, MATCHUP])
+    backfill.submit_games(executor, pending, week, [12], [BOX_SCORE, MATCHUP])
+
+    jobs = [(MATCHUP, *week, 10), (MATCHUP, *week, 11), (BOX_SCORE, *week, 12),
+            (MATCHUP, *week, 12)]
+    assert_that(list(pending.values())).is_equal_to(jobs)
+    assert_that(executor.jobs).is_equal_to(
+        [(backfill.run_job, backfill.run_game_job, *job) for job in jobs])
+
+
+def test_main_counts_failed_jobs(worker, fetcher, monkeypatch, tmp_path):
+    """
+    Tests the games of each stored week are loaded and the failed jobs are counted.
+    """
+    fetcher.failing = ('matchup',)
+    monkeypatch.setattr(backfill, 'ProcessPoolExecutor', InlineExecutor)
+    monkeypatch.setattr(backfill, 'init_worker', lambda _arguments: None)
+    monkeypatch.setattr(backfill, 'build_maker', lambda _arguments: worker.maker)
+
+    backfill.main({'years': '2022', 'weeks': '1', 'types': '2',
+                   'stages': [backfill.SCHEDULE, MATCHUP], 'metrics_dir': str(tmp_path)})
+
+    game_ids = backfill.list_games(2022, 1, '2')
+    with open(tmp_path / 'metrics.json', 'r', encoding='utf-8') as input_file:
+        summary = json.load(input_file)
+    assert_that(game_ids).is_not_empty()
+    assert_that(summary['counters']['jobs.failed']).is_equal_to(len(game_ids))
+    assert_that([url for url in fetcher.urls if '/matchup/' in url]).is_length(
+        len(game_ids))
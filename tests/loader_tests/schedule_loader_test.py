@@ -0,0 +1,94 @@
+"""
+Tests for the Schedule Loader.
+"""
+
+import json
+from types import SimpleNamespace
+
+from assertpy import assert_that
+
+import schedule_loader
+from helpers.http_client import set_http_client
+from helpers.metrics import Metrics, set_metrics
+from helpers.payload import set_payload_fetcher
+
+
+class MockFetcher:
+    """
+    Payload Fetcher stand in returning the test Schedule.
+    """
+
+    def __init__(self) -> None:
+        self.urls = []
+
+    def fetch(self, url: str, **_kwargs) -> dict | None:
+        self.urls.append(url)
+        with open('./tests/test_files/schedule.json', 'r', encoding='utf-8') as input_file:
+            return json.load(input_file)
+
+
+class MockClient:
+    """
+    HTTP Client stand in accepting every posted entry.
+    """
+
+    def __init__(self, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.posted = []
+
+    def post(self, _url: str, json: dict | None = None,  # pylint: disable=redefined-outer-name
+             **_kwargs) -> SimpleNamespace:
+        self.posted.append(json)
+        return SimpleNamespace(status_code=self.status_code)
+
+
+def run_loader(arguments: dict, status_code: int = 200) -> tuple[MockFetcher, MockClient]:
+    """
+    Runs the loader against the stand ins.
+    """
+    fetcher = MockFetcher()
+    client = MockClient(status_code)
+    set_payload_fetcher(fetcher)
+    set_http_client(client)
+    try:
+        schedule_loader.main({'week': 1, 'year': 2022, 'type': '2', **arguments})
+    finally:
+        set_payload_fetcher(None)
+        set_http_client(None)
+    return fetcher, client
+
+
+def test_main_exports_metrics(tmp_path):
+    """
+    Tests the posted Schedule entries are counted and the metrics exported.
+    """
+    set_metrics(Metrics())
+    try:
+        _, client = run_loader({'metrics_dir': str(tmp_path)})
+    finally:
+        set_metrics(Metrics())
+
+    with open(tmp_path / 'metrics.json', 'r', encoding='utf-8') as input_file:
+        summary = json.load(input_file)
+    assert_that(client.posted).is_not_empty()
+    assert_that(summary['counters']['schedule.submitted']).is_equal_to(len(client.posted))
+    assert_that(str(tmp_path / 'metrics.prom')).exists()
+
+
+def test_main_skips_posted_weeks(tmp_path):
+    """
+    Tests a week is only posted again once its earlier post failed or its payload changed.
+    """
+    journal = str(tmp_path / 'journal.db')
+
+    _, failed = run_loader({'journal': journal}, status_code=500)
+    _, posted = run_loader({'journal': journal})
+    skipped_fetcher, skipped = run_loader({'journal': journal})
+    refresh_fetcher, refreshed = run_loader({'journal': journal, 'refresh': True})
+
+    assert_that(failed.posted).is_not_empty()
+    assert_that(posted.posted).is_length(len(failed.posted))
+    assert_that(skipped_fetcher.urls).is_empty()
+    assert_that(skipped.posted).is_empty()
+    assert_that(refresh_fetcher.urls).is_length(1)
+    assert_that(refreshed.posted).is_empty()